@@ -0,0 +1,78 @@
+"""
+Benchmark the customer analytics (RFM scores and cohort retention).
+
+Times compact_orders on text dates as they come from the warehouse,
+rfm_scores and cohort_retention on synthetic orders, next to a pandas
+groupby computing the same RFM measures.
+
+    python -m benchmarks.bench_customer_analytics --rows 20000000 --customers 5000000
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.analytics.customer_analytics import cohort_retention, compact_orders, rfm_scores
+
+
+def synthetic_customer_orders(rows: int, customers: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "customer_id": rng.integers(1, customers + 1, rows),
+        "order_date": pd.Timestamp("2022-01-01") + pd.to_timedelta(rng.integers(0, 3 * 365, rows), unit="D"),
+        "total_amount": rng.integers(100, 50_000, rows) / 100,
+    })
+
+
+def _timed(results: dict, name: str, func, *args, **kwargs):
+    started = time.perf_counter()
+    value = func(*args, **kwargs)
+    results[name] = round(time.perf_counter() - started, 3)
+    return value
+
+
+def run(rows: int, customers: int, chunk_size: int) -> dict:
+    df = synthetic_customer_orders(rows, customers)
+    results = {"rows": rows, "customers": customers}
+
+    # The warehouse returns order_date as text, chunk_size rows at a time
+    text_chunks = [
+        df.iloc[start:start + chunk_size].assign(
+            order_date=lambda chunk: chunk["order_date"].dt.strftime("%Y-%m-%d %H:%M:%S.%f")
+        )
+        for start in range(0, min(rows, 10 * chunk_size), chunk_size)
+    ]
+    results["text_rows"] = sum(len(chunk) for chunk in text_chunks)
+    _timed(results, "compact_orders_text", compact_orders, text_chunks)
+
+    orders = _timed(results, "compact_orders_datetimes", compact_orders, [df])
+    rfm = _timed(results, "rfm_scores", rfm_scores, orders)
+    matrix = _timed(results, "cohort_retention", cohort_retention, orders)
+    results["rfm_rows"] = len(rfm)
+    results["cohorts"] = len(matrix)
+
+    _timed(
+        results,
+        "pandas_groupby_rfm_measures",
+        lambda: df.groupby("customer_id").agg(
+            last_order_date=("order_date", "max"),
+            frequency=("order_date", "size"),
+            monetary=("total_amount", "sum"),
+        ),
+    )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=20_000_000)
+    parser.add_argument("--customers", type=int, default=5_000_000)
+    parser.add_argument("--chunk-size", type=int, default=50_000)
+    args = parser.parse_args()
+    print(json.dumps(run(args.rows, args.customers, args.chunk_size), indent=2))
+
+
+if __name__ == "__main__":
+    main()
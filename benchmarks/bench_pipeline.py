@@ -0,0 +1,204 @@
+"""
+Benchmark the whole pipeline and every report on synthetic orders at several scales.
+
+For each scale, writes synthetic raw files (see benchmarks.synthetic_orders)
+to a temporary directory, runs run_pipeline on them into a fresh SQLite
+warehouse and records the per-stage telemetry of the run (wall and CPU
+seconds, rows per second, peak RSS per stage kind), then times every
+registered report of src.analytics.reports against that warehouse with
+the report cache off. The pipeline and every report run in a process of
+their own, so peak RSS is theirs alone.
+
+Results are printed (and with --output written) as JSON. With --baseline,
+they are compared with an earlier result file: stages or reports whose
+throughput dropped, or whose peak RSS grew, by more than --max-ratio are
+listed under "regressions" and the exit status is 1.
+
+    python -m benchmarks.bench_pipeline --scales 10000 100000 1000000 --output bench.json
+    python -m benchmarks.bench_pipeline --baseline bench.json
+"""
+import argparse
+import json
+import platform
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from multiprocessing import get_context
+from pathlib import Path
+from unittest import mock
+
+from benchmarks.synthetic_orders import write_orders
+from src.config import RUN_HISTORY_MAX_RATIO, RUN_HISTORY_MIN_SECONDS
+
+
+def _isolated(workdir: Path) -> ExitStack:
+    """
+    Point every file the pipeline and the reports write at workdir.
+    """
+    stack = ExitStack()
+    for target, value in {
+        "src.warehouse.db.DB_URL": f"sqlite:///{workdir / 'warehouse.db'}",
+        "src.orchestration.pipeline.LOGS_DIR": workdir / "logs",
+        "src.orchestration.pipeline.PROCESSED_DATA_PATH": workdir / "processed" / "orders_clean.csv",
+        "src.orchestration.pipeline.PROCESSED_PARQUET_PATH": workdir / "processed" / "orders_clean",
+        "src.orchestration.pipeline.QUARANTINE_PATH": workdir / "quarantine" / "orders_quarantine.csv",
+        "src.orchestration.pipeline.PROFILE_HISTORY_PATH": workdir / "logs" / "profile_history.jsonl",
+        "src.orchestration.dag.CHECKPOINT_DIR": workdir / "checkpoints",
+        "src.analytics.reports.REPORTS_DIR": workdir / "reports",
+        "src.analytics.frame_reports.REPORTS_DIR": workdir / "reports",
+        "src.analytics.cache.REPORT_CACHE_ENABLED": False,
+    }.items():
+        stack.enter_context(mock.patch(target, value))
+    return stack
+
+
+def run_stages(workdir: str, chunk_size: int | None, workers: int) -> dict:
+    """
+    Run the pipeline on workdir/raw and return its run summary.
+    """
+    from src.orchestration.pipeline import run_pipeline
+
+    workdir = Path(workdir)
+    with _isolated(workdir):
+        run_pipeline(source=workdir / "raw", chunk_size=chunk_size, workers=workers)
+    return json.loads((workdir / "logs" / "run_summary.json").read_text())
+
+
+def run_report(workdir: str, name: str) -> dict:
+    """
+    Write report name from the warehouse in workdir and return its metrics.
+    """
+    from src.analytics.reports import generate_all_reports
+    from src.orchestration.telemetry import measured
+
+    with _isolated(Path(workdir)):
+        cpu_started = time.process_time()
+        result, metrics = measured(lambda: generate_all_reports(reports=[name], workers=1))
+        # The report runs on a pool thread while this one waits; the child
+        # process runs nothing else, so its CPU time is the report's
+        metrics["cpu_seconds"] = time.process_time() - cpu_started
+    timing = result["report_timings"][name]
+    return {**metrics, "rows": timing["rows"], "rows_per_second": None, "timing": timing}
+
+
+def _in_child(func, *args):
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+        return pool.submit(func, *args).result()
+
+
+def run_scale(rows: int, files: int, chunk_size: int | None, workers: int, seed: int) -> dict:
+    from src.analytics.reports import REPORTS
+
+    with tempfile.TemporaryDirectory(prefix="bench_pipeline_") as workdir:
+        started = time.perf_counter()
+        write_orders(Path(workdir) / "raw", rows, files=files, seed=seed)
+        generate_seconds = time.perf_counter() - started
+
+        summary = _in_child(run_stages, workdir, chunk_size, workers)
+        reports = {name: _in_child(run_report, workdir, name) for name in REPORTS}
+
+    # Report throughput is counted in fact rows read, not rows written
+    for metrics in reports.values():
+        metrics["rows_per_second"] = summary["clean_rows"] / metrics["seconds"] if metrics["seconds"] > 0 else None
+    return {
+        "rows": rows,
+        "generate_seconds": round(generate_seconds, 3),
+        "pipeline": {
+            "wall_seconds": summary["wall_seconds"],
+            "raw_rows": summary["raw_rows"],
+            "clean_rows": summary["clean_rows"],
+            "table_counts": summary["table_counts"],
+            "stages": summary["stage_totals"],
+        },
+        "reports": reports,
+    }
+
+
+def _measurements(result: dict) -> dict:
+    """
+    Return {(rows, "stage"|"report", name): metrics} of a benchmark result.
+    """
+    measurements = {}
+    for scale in result["scales"]:
+        for name, metrics in scale["pipeline"]["stages"].items():
+            measurements[(scale["rows"], "stage", name)] = {**metrics, "seconds": metrics.get("wall_seconds")}
+        for name, metrics in scale["reports"].items():
+            measurements[(scale["rows"], "report", name)] = metrics
+    return measurements
+
+
+def find_regressions(result: dict, baseline: dict, max_ratio: float, min_seconds: float) -> list[dict]:
+    """
+    Return the stages and reports of result whose rows per second fell, or
+    whose peak RSS grew, more than max_ratio times against baseline at
+    the same scale. Measurements under min_seconds in both are skipped.
+    """
+    before = _measurements(baseline)
+    regressions = []
+    for key, metrics in _measurements(result).items():
+        old = before.get(key)
+        if old is None or max(metrics.get("seconds") or 0, old.get("seconds") or 0) < min_seconds:
+            continue
+        rows, kind, name = key
+        for metric, ratio in (
+            ("rows_per_second", _ratio(old.get("rows_per_second"), metrics.get("rows_per_second"))),
+            ("peak_rss_bytes", _ratio(metrics.get("peak_rss_bytes"), old.get("peak_rss_bytes"))),
+        ):
+            if ratio is not None and ratio > max_ratio:
+                regressions.append({
+                    "rows": rows,
+                    kind: name,
+                    "metric": metric,
+                    "baseline": old[metric],
+                    "latest": metrics[metric],
+                    "ratio": round(ratio, 3),
+                })
+    return regressions
+
+
+def _ratio(worse, better) -> float | None:
+    return worse / better if worse and better else None
+
+
+def run(scales: list[int], files: int, chunk_size: int | None, workers: int, seed: int) -> dict:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": seed,
+        "files": files,
+        "chunk_size": chunk_size,
+        "workers": workers,
+        "scales": [run_scale(rows, files, chunk_size, workers, seed) for rows in scales],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scales", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--files", type=int, default=2)
+    parser.add_argument("--chunk-size", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, default=None, help="Also write the results to this file")
+    parser.add_argument("--baseline", type=Path, default=None, help="Earlier results to compare with")
+    parser.add_argument("--max-ratio", type=float, default=RUN_HISTORY_MAX_RATIO)
+    parser.add_argument("--min-seconds", type=float, default=RUN_HISTORY_MIN_SECONDS)
+    args = parser.parse_args()
+
+    result = run(args.scales, args.files, args.chunk_size, args.workers, args.seed)
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        result["baseline"] = str(args.baseline)
+        result["regressions"] = find_regressions(result, baseline, args.max_ratio, args.min_seconds)
+    output = json.dumps(result, indent=2)
+    if args.output:
+        args.output.write_text(output + "\n")
+    print(output)
+    if result.get("regressions"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
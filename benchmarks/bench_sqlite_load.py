@@ -0,0 +1,96 @@
+"""
+Benchmark warehouse load paths on SQLite.
+
+Compares the to_sql replace load, the regular batched upsert (one
+transaction per batch) and the sqlite_bulk_load fast path on the same
+synthetic orders, each into a fresh database file.
+
+    python -m benchmarks.bench_sqlite_load --rows 200000
+"""
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine, text
+
+import src.warehouse.db as db
+from src.warehouse.load_to_db import (
+    create_schema,
+    load_dimensions,
+    load_fact_orders,
+    sqlite_bulk_load,
+)
+
+
+def synthetic_orders(rows: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    customer_id = rng.integers(1, max(rows // 20, 2), rows)
+    product_id = rng.integers(1, 500, rows)
+    quantity = rng.integers(1, 10, rows)
+    unit_price = rng.integers(100, 50_000, rows) / 100
+    return pd.DataFrame({
+        "order_id": np.arange(1, rows + 1),
+        "customer_id": customer_id,
+        "customer_name": pd.Categorical([f"Customer {i}" for i in customer_id]),
+        "country": pd.Categorical(np.array(["Germany", "France", "Italy", "Spain"])[customer_id % 4]),
+        "product_id": product_id,
+        "product_name": pd.Categorical([f"Product {i}" for i in product_id]),
+        "category": pd.Categorical(np.array(["Electronics", "Home", "Stationery"])[product_id % 3]),
+        "order_date": pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 365, rows), unit="D"),
+        "quantity": quantity,
+        "unit_price": unit_price,
+        "total_amount": quantity * unit_price,
+    })
+
+
+def _with_secondary_index(url: str) -> None:
+    create_schema()
+    engine = create_engine(url)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_bench_fact_customer ON fact_orders(customer_id)"))
+    engine.dispose()
+
+
+def run(rows: int) -> dict:
+    df = synthetic_orders(rows)
+    results = {"rows": rows}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in ("to_sql_replace", "upsert", "upsert_bulk_load"):
+            url = f"sqlite:///{Path(tmp) / f'{name}.db'}"
+            db.DB_URL = url
+
+            started = time.perf_counter()
+            if name == "to_sql_replace":
+                create_schema()
+                load_dimensions(df, mode="replace")
+                load_fact_orders(df, mode="replace")
+            elif name == "upsert":
+                _with_secondary_index(url)
+                started = time.perf_counter()
+                load_dimensions(df, mode="upsert")
+                load_fact_orders(df, mode="upsert")
+            else:
+                _with_secondary_index(url)
+                started = time.perf_counter()
+                with sqlite_bulk_load() as conn:
+                    load_dimensions(df, mode="upsert", conn=conn)
+                    load_fact_orders(df, mode="upsert", conn=conn)
+            results[name] = round(time.perf_counter() - started, 3)
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=200_000)
+    args = parser.parse_args()
+    print(json.dumps(run(args.rows), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+"""
+Generate synthetic raw order files of any size.
+
+Orders follow the raw schema of data/raw/orders_raw.csv with skewed,
+realistic cardinalities: about ORDERS_PER_CUSTOMER orders per customer
+with a long tail of one-off buyers, a few hundred to 100k products with
+best sellers, 20 countries and 12 categories of uneven size, order volume
+growing over DAYS days, and some customers moving country halfway (new
+SCD2 versions). A small share of rows are resent duplicates, miss a key
+or date, or break a quality rule. The output depends only on the seed
+and the sizes, never on the chunk size used to write it.
+
+    python -m benchmarks.synthetic_orders --rows 10000000 --files 4 --out data/synthetic
+"""
+import argparse
+import json
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+
+from src.utils.io_utils import ChunkedTableWriter
+
+COUNTRIES = [
+    "Germany", "France", "United Kingdom", "Italy", "Spain", "Netherlands",
+    "Poland", "Sweden", "Belgium", "Austria", "Denmark", "Ireland", "Portugal",
+    "Czechia", "Finland", "Norway", "Greece", "Hungary", "Romania", "Switzerland",
+]
+CATEGORIES = [
+    "Electronics", "Home", "Fashion", "Books", "Toys", "Sports", "Beauty",
+    "Garden", "Grocery", "Automotive", "Office", "Pets",
+]
+ORDERS_PER_CUSTOMER = 8
+FIRST_DATE = np.datetime64("2022-01-01")
+DAYS = 3 * 365
+
+# Rows are generated in blocks of this many, each from its own seeded
+# generator, so any row range can be produced independently
+BLOCK_ROWS = 1 << 20
+
+
+def _zipf_weights(n: int, exponent: float) -> np.ndarray:
+    weights = 1.0 / np.arange(1, n + 1) ** exponent
+    return weights / weights.sum()
+
+
+class OrderGenerator:
+    """
+    Deterministic source of synthetic raw orders for a dataset of rows orders.
+
+    Per-customer and per-product attributes are drawn once from seed;
+    orders(start, stop) returns rows [start, stop) of the dataset.
+    """
+
+    def __init__(
+        self,
+        rows: int,
+        seed: int = 0,
+        customers: int | None = None,
+        products: int | None = None,
+        duplicate_rate: float = 0.01,
+        null_rate: float = 0.002,
+        invalid_rate: float = 0.001,
+    ):
+        self.rows = rows
+        self.seed = seed
+        self.customers = customers or max(rows // ORDERS_PER_CUSTOMER, 10)
+        self.products = products or int(min(max(rows // 1000, 200), 100_000))
+        self.duplicate_rate = duplicate_rate
+        self.null_rate = null_rate
+        self.invalid_rate = invalid_rate
+
+        rng = np.random.default_rng([seed, 0])
+        self.customer_country = rng.choice(
+            len(COUNTRIES), self.customers, p=_zipf_weights(len(COUNTRIES), 1.1)
+        ).astype(np.int8)
+        self.product_category = rng.choice(
+            len(CATEGORIES), self.products, p=_zipf_weights(len(CATEGORIES), 0.8)
+        ).astype(np.int8)
+        # Log-normal list prices between roughly 2 and 2,000
+        self.product_price = np.round(np.exp(rng.normal(3.5, 1.1, self.products)).clip(2, 2000), 2)
+
+    def _block(self, block: int) -> pd.DataFrame:
+        start = block * BLOCK_ROWS
+        n = min(BLOCK_ROWS, self.rows - start)
+        rng = np.random.default_rng([self.seed, block + 1])
+
+        # Popularity falls off with the id: a few heavy buyers and best
+        # sellers, many customers with a single order
+        customer_id = (self.customers * rng.random(n) ** 2.5).astype(np.int64) + 1
+        product_id = (self.products * rng.random(n) ** 3).astype(np.int64) + 1
+
+        # Order ids follow time; volume grows linearly over the period
+        position = (start + np.arange(n) + rng.random(n)) / self.rows
+        day = (DAYS * np.sqrt(position)).astype(np.int64).clip(0, DAYS - 1)
+        order_date = FIRST_DATE + day.astype("timedelta64[D]")
+
+        country = self.customer_country[customer_id - 1].astype(np.int64)
+        # Every 50th customer moves to the next country halfway through
+        moved = (customer_id % 50 == 0) & (day >= DAYS // 2)
+        country = np.where(moved, (country + 1) % len(COUNTRIES), country)
+
+        quantity = np.minimum(rng.geometric(0.55, n), 20)
+        discount = np.where(rng.random(n) < 0.15, 0.9, 1.0)
+        unit_price = np.round(self.product_price[product_id - 1] * discount, 2)
+
+        df = pd.DataFrame({
+            "order_id": pd.array(start + np.arange(1, n + 1), dtype="Int64"),
+            "customer_id": pd.array(customer_id, dtype="Int64"),
+            "customer_name": _labels("Customer", customer_id),
+            "country": pd.Categorical.from_codes(country, COUNTRIES),
+            "product_id": pd.array(product_id, dtype="Int64"),
+            "product_name": _labels("Product", product_id),
+            "category": pd.Categorical.from_codes(
+                self.product_category[product_id - 1], CATEGORIES
+            ),
+            "order_date": pd.Series(order_date),
+            "quantity": pd.array(quantity, dtype="Int64"),
+            "unit_price": unit_price,
+        })
+        return self._inject_errors(df, rng)
+
+    def _inject_errors(self, df: pd.DataFrame, rng: np.random.Generator) -> pd.DataFrame:
+        n = len(df)
+        # Resent rows: an exact copy of an order from a few rows earlier
+        duplicates = np.flatnonzero(rng.random(n) < self.duplicate_rate)
+        duplicates = duplicates[duplicates >= 10]
+        if len(duplicates):
+            sources = duplicates - rng.integers(1, 10, len(duplicates))
+            for column in range(df.shape[1]):
+                df.iloc[duplicates, column] = df.iloc[sources, column].to_numpy()
+
+        for column in ("customer_id", "product_id", "order_date"):
+            df.loc[rng.random(n) < self.null_rate / 3, column] = None
+        # Rows that fail the data quality rules and get quarantined
+        invalid = rng.random(n) < self.invalid_rate
+        df.loc[invalid, "quantity"] = 0
+        return df
+
+    def orders(self, start: int = 0, stop: int | None = None) -> pd.DataFrame:
+        """
+        Return rows [start, stop) of the dataset (default: all of it).
+        """
+        stop = self.rows if stop is None else min(stop, self.rows)
+        blocks = [
+            self._block(block)
+            for block in range(start // BLOCK_ROWS, (max(stop, 1) - 1) // BLOCK_ROWS + 1)
+        ]
+        df = pd.concat(blocks, ignore_index=True) if len(blocks) > 1 else blocks[0]
+        offset = (start // BLOCK_ROWS) * BLOCK_ROWS
+        return df.iloc[start - offset:stop - offset].reset_index(drop=True)
+
+    def iter_orders(self, start: int = 0, stop: int | None = None) -> Iterator[pd.DataFrame]:
+        """
+        Yield rows [start, stop) one block at a time.
+        """
+        stop = self.rows if stop is None else min(stop, self.rows)
+        for block_start in range(start - start % BLOCK_ROWS, stop, BLOCK_ROWS):
+            df = self._block(block_start // BLOCK_ROWS)
+            low, high = max(start - block_start, 0), min(stop - block_start, len(df))
+            yield df.iloc[low:high].reset_index(drop=True)
+
+
+def _labels(prefix: str, ids: np.ndarray) -> pd.Categorical:
+    """
+    Return "<prefix> <id>" for every id, formatting each distinct id once.
+    """
+    uniques, codes = np.unique(ids, return_inverse=True)
+    return pd.Categorical.from_codes(codes, [f"{prefix} {i}" for i in uniques])
+
+
+def write_orders(out: Path, rows: int, files: int = 1, fmt: str = "csv", seed: int = 0, **options) -> list[Path]:
+    """
+    Write a dataset of rows synthetic orders to files equal parts under
+    out (orders_0001.csv, ...), one block in memory at a time.
+    """
+    generator = OrderGenerator(rows, seed=seed, **options)
+    out = Path(out)
+    out.mkdir(parents=True, exist_ok=True)
+    paths = []
+    bounds = np.linspace(0, rows, files + 1).astype(np.int64)
+    for number, (start, stop) in enumerate(zip(bounds[:-1], bounds[1:]), start=1):
+        path = out / f"orders_{number:04d}.{fmt}"
+        with ChunkedTableWriter(path, fmt) as writer:
+            for df in generator.iter_orders(int(start), int(stop)):
+                writer.write(df)
+        paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--files", type=int, default=1)
+    parser.add_argument("--out", type=Path, default=Path("data/synthetic"))
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--customers", type=int, default=None)
+    parser.add_argument("--products", type=int, default=None)
+    parser.add_argument("--duplicate-rate", type=float, default=0.01)
+    parser.add_argument("--null-rate", type=float, default=0.002)
+    parser.add_argument("--invalid-rate", type=float, default=0.001)
+    args = parser.parse_args()
+    paths = write_orders(
+        args.out,
+        args.rows,
+        files=args.files,
+        fmt=args.format,
+        seed=args.seed,
+        customers=args.customers,
+        products=args.products,
+        duplicate_rate=args.duplicate_rate,
+        null_rate=args.null_rate,
+        invalid_rate=args.invalid_rate,
+    )
+    print(json.dumps({"rows": args.rows, "files": [str(path) for path in paths]}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -7,7 +7,7 @@ ORDER BY revenue DESC
 LIMIT 10;
 
 -- Monthly revenue
-SELECT substr(order_date, 1, 7) AS year_month,
+SELECT year_month,
        SUM(total_amount) AS revenue
 FROM fact_orders
 GROUP BY year_month
@@ -1,11 +1,84 @@
--- Schema for the fact_orders table
+-- Warehouse schema (see TABLES in src/warehouse/load_to_db.py and the
+-- versioned migrations in src/warehouse/migrations.py)
+
+CREATE TABLE IF NOT EXISTS dim_customers (
+    customer_key INTEGER PRIMARY KEY,
+    customer_id INTEGER NOT NULL,
+    customer_name TEXT,
+    country TEXT,
+    row_hash INTEGER NOT NULL,
+    valid_from TEXT NOT NULL,
+    valid_to TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS ux_dim_customers_current
+ON dim_customers (customer_id) WHERE valid_to IS NULL;
+
+CREATE TABLE IF NOT EXISTS dim_products (
+    product_key INTEGER PRIMARY KEY,
+    product_id INTEGER NOT NULL,
+    product_name TEXT,
+    category TEXT,
+    row_hash INTEGER NOT NULL,
+    valid_from TEXT NOT NULL,
+    valid_to TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS ux_dim_products_current
+ON dim_products (product_id) WHERE valid_to IS NULL;
 
 CREATE TABLE IF NOT EXISTS fact_orders (
     order_id INTEGER PRIMARY KEY,
     customer_id INTEGER,
     product_id INTEGER,
+    customer_key INTEGER,
+    product_key INTEGER,
     order_date TEXT,
+    year_month TEXT,
     quantity INTEGER,
     unit_price REAL,
-    total_amount REAL
+    total_amount REAL,
+    FOREIGN KEY (customer_key) REFERENCES dim_customers(customer_key),
+    FOREIGN KEY (product_key) REFERENCES dim_products(product_key)
+);
+
+-- Covering indexes for the reports
+CREATE INDEX IF NOT EXISTS ix_fact_orders_product_revenue ON fact_orders (product_key, total_amount);
+CREATE INDEX IF NOT EXISTS ix_fact_orders_customer_revenue ON fact_orders (customer_key, total_amount);
+CREATE INDEX IF NOT EXISTS ix_fact_orders_year_month_revenue ON fact_orders (year_month, total_amount);
+CREATE INDEX IF NOT EXISTS ix_fact_orders_order_date ON fact_orders (order_date);
+
+-- Report aggregates, maintained by the loader batch by batch
+CREATE TABLE IF NOT EXISTS agg_revenue_month (
+    year_month TEXT NOT NULL,
+    revenue REAL NOT NULL,
+    order_count INTEGER NOT NULL,
+    PRIMARY KEY (year_month)
+);
+
+CREATE TABLE IF NOT EXISTS agg_revenue_product (
+    year_month TEXT NOT NULL,
+    product_key INTEGER NOT NULL,
+    revenue REAL NOT NULL,
+    order_count INTEGER NOT NULL,
+    PRIMARY KEY (year_month, product_key)
+);
+
+CREATE TABLE IF NOT EXISTS agg_revenue_country (
+    year_month TEXT NOT NULL,
+    country TEXT NOT NULL,
+    revenue REAL NOT NULL,
+    order_count INTEGER NOT NULL,
+    PRIMARY KEY (year_month, country)
+);
+
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    applied_at TEXT NOT NULL
+);
+
+-- Per-table change counters bumped by every load that changes rows
+CREATE TABLE IF NOT EXISTS warehouse_versions (
+    table_name TEXT PRIMARY KEY,
+    version INTEGER NOT NULL,
+    updated_at TEXT NOT NULL
 );
@@ -0,0 +1,205 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+import pandas as pd
+
+from src.config import (
+    REPORT_CACHE_DIR,
+    REPORT_CACHE_ENABLED,
+    REPORT_CACHE_MAX_BYTES,
+    REPORT_CACHE_MAX_ENTRIES,
+)
+from src.utils.logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+INDEX_FILE = "index.json"
+
+
+def cache_key(
+    database: str, query: str, params: dict, version: dict, transform: str | None = None
+) -> str:
+    """
+    Return the cache key of a report query: a hash of the database, the
+    normalized query text, its parameters, the warehouse data version and
+    the name of the transform computing the report from the rows, if any.
+    """
+    payload = {
+        "database": database,
+        "query": " ".join(query.split()),
+        "params": params,
+        "version": version,
+    }
+    if transform is not None:
+        payload["transform"] = transform
+    payload = json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def frame_digest(df: pd.DataFrame) -> str:
+    """
+    Return a content hash of a DataFrame's columns and values.
+    """
+    digest = hashlib.sha256(json.dumps(list(map(str, df.columns))).encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+class ReportCache:
+    """
+    Size-bounded LRU cache of report DataFrames with an on-disk backing store.
+
+    Entries live as pickles in directory, described by an index of their
+    size and last use; the least recently used entries are evicted once
+    there are more than max_entries or they take more than max_bytes.
+    Recently used DataFrames are also kept in memory, so repeated lookups
+    in one process skip the disk. Keys come from cache_key, so a new
+    warehouse data version simply stops matching older entries.
+    """
+
+    def __init__(self, directory=None, max_entries=None, max_bytes=None):
+        self.directory = Path(directory or REPORT_CACHE_DIR)
+        self.max_entries = max_entries or REPORT_CACHE_MAX_ENTRIES
+        self.max_bytes = max_bytes or REPORT_CACHE_MAX_BYTES
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._index = self._load_index()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.directory / f"{key}.pkl"
+
+    def _load_index(self) -> dict:
+        path = self.directory / INDEX_FILE
+        if not path.exists():
+            return {"entries": {}, "outputs": {}}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+        except (OSError, ValueError) as exc:
+            logger.warning("Ignoring unreadable report cache index %s: %s", path, exc)
+            return {"entries": {}, "outputs": {}}
+        # Drop entries whose file was removed behind our back
+        index["entries"] = {
+            key: entry
+            for key, entry in index.get("entries", {}).items()
+            if self._entry_path(key).exists()
+        }
+        index.setdefault("outputs", {})
+        return index
+
+    def _save_index(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / INDEX_FILE
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._index, f, indent=2)
+        os.replace(tmp_path, path)
+
+    def get(self, key: str) -> pd.DataFrame | None:
+        """
+        Return a copy of the cached DataFrame for key, or None on a miss.
+        """
+        with self._lock:
+            entry = self._index["entries"].get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            df = self._memory.get(key)
+            if df is None:
+                try:
+                    df = pd.read_pickle(self._entry_path(key))
+                except (OSError, ValueError, EOFError) as exc:
+                    logger.warning("Dropping unreadable report cache entry %s: %s", key, exc)
+                    self._index["entries"].pop(key, None)
+                    self.misses += 1
+                    return None
+            self._remember(key, df)
+            entry["last_used"] = time.time()
+            self._save_index()
+            self.hits += 1
+            return df.copy()
+
+    def put(self, key: str, df: pd.DataFrame) -> None:
+        """
+        Store df under key and evict least recently used entries beyond the bounds.
+        """
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            path = self._entry_path(key)
+            df.to_pickle(path)
+            self._index["entries"][key] = {
+                "bytes": path.stat().st_size,
+                "last_used": time.time(),
+            }
+            self._remember(key, df.copy())
+            self._evict()
+            self._save_index()
+
+    def _remember(self, key: str, df: pd.DataFrame) -> None:
+        self._memory[key] = df
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _evict(self) -> None:
+        entries = self._index["entries"]
+        by_age = sorted(entries, key=lambda key: entries[key]["last_used"])
+        total = sum(entry["bytes"] for entry in entries.values())
+        while by_age and (len(entries) > self.max_entries or total > self.max_bytes):
+            key = by_age.pop(0)
+            total -= entries.pop(key)["bytes"]
+            self._memory.pop(key, None)
+            self._entry_path(key).unlink(missing_ok=True)
+            self.evictions += 1
+
+    def output_is_current(self, path, digest: str) -> bool:
+        """
+        Return True if the file at path exists and was last written from a
+        DataFrame with this frame_digest.
+        """
+        with self._lock:
+            return Path(path).exists() and self._index["outputs"].get(str(path)) == digest
+
+    def record_output(self, path, digest: str) -> None:
+        """
+        Remember the frame_digest of the DataFrame last written to path.
+        """
+        with self._lock:
+            self._index["outputs"][str(path)] = digest
+            self._save_index()
+
+    def stats(self) -> dict:
+        entries = self._index["entries"]
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(entries),
+            "bytes": sum(entry["bytes"] for entry in entries.values()),
+        }
+
+
+_CACHE: ReportCache | None = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_report_cache() -> ReportCache | None:
+    """
+    Return the process-wide report cache, or None if REPORT_CACHE_ENABLED is off.
+    """
+    global _CACHE
+    if not REPORT_CACHE_ENABLED:
+        return None
+    with _CACHE_LOCK:
+        if _CACHE is None:
+            _CACHE = ReportCache()
+        return _CACHE
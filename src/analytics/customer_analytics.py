@@ -0,0 +1,218 @@
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+# Columns of the per-order input of the customer reports
+ORDER_COLUMNS = ["customer_id", "order_day", "total_amount"]
+
+# RFM segments as (name, minimum recency score, minimum frequency score,
+# maximum recency score, maximum frequency score); the first match wins
+RFM_SEGMENTS = [
+    ("champions", 4, 4, 5, 5),
+    ("loyal", 3, 3, 5, 5),
+    ("new", 4, 1, 5, 2),
+    ("at_risk", 1, 3, 2, 5),
+    ("hibernating", 1, 1, 2, 2),
+]
+OTHER_SEGMENT = "needs_attention"
+RFM_SCORES = 5
+
+EPOCH = np.datetime64("1970-01-01", "D")
+
+
+# Integer customer ids spanning at most this many slots per order are
+# coded through a lookup array instead of a hash table
+DENSE_ID_RATIO = 4
+
+
+def order_days(order_dates: pd.Series) -> np.ndarray:
+    """
+    Return order dates (timestamps or "YYYY-MM-DD..." text) as int64 days
+    since 1970-01-01.
+
+    Text is parsed only once per distinct value, so a column of millions
+    of orders over a few years of dates costs one factorize pass.
+    """
+    if pd.api.types.is_datetime64_any_dtype(order_dates):
+        return (order_dates.to_numpy().astype("datetime64[D]") - EPOCH).astype(np.int64)
+    codes, uniques = pd.factorize(order_dates)
+    days = pd.to_datetime(pd.Series(uniques).astype(str).str.slice(0, 10), format="%Y-%m-%d")
+    days = (days.to_numpy().astype("datetime64[D]") - EPOCH).astype(np.int64)
+    return days[codes]
+
+
+def compact_orders(chunks: Iterable[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Concatenate chunks of customer_id, order_date, total_amount rows into
+    one DataFrame of ORDER_COLUMNS with integer days and numeric dtypes.
+
+    Each chunk is converted as it arrives, so the text dates of the whole
+    result are never held in memory at once.
+    """
+    parts = [
+        pd.DataFrame({
+            "customer_id": chunk["customer_id"].to_numpy(dtype=np.int64),
+            "order_day": order_days(chunk["order_date"]),
+            "total_amount": pd.to_numeric(chunk["total_amount"]).fillna(0.0).to_numpy(np.float64),
+        })
+        for chunk in chunks
+        if len(chunk)
+    ]
+    if not parts:
+        return pd.DataFrame({
+            "customer_id": np.array([], dtype=np.int64),
+            "order_day": np.array([], dtype=np.int64),
+            "total_amount": np.array([], dtype=np.float64),
+        })
+    return pd.concat(parts, ignore_index=True)
+
+
+def customer_codes(customer_ids) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Return (codes, customers): a 0-based integer code per order and the
+    sorted distinct customer ids the codes index.
+
+    Ids that are dense integers (the usual surrogate or source ids) are
+    coded with a presence array and a cumulative sum, which is several
+    times faster than a sorted hash factorize over tens of millions of rows.
+    """
+    ids = np.asarray(customer_ids)
+    if not len(ids) or not np.issubdtype(ids.dtype, np.integer):
+        return pd.factorize(ids, sort=True)
+    low, high = int(ids.min()), int(ids.max())
+    if high - low >= DENSE_ID_RATIO * len(ids):
+        return pd.factorize(ids, sort=True)
+
+    offsets = ids - low
+    present = np.zeros(high - low + 1, dtype=bool)
+    present[offsets] = True
+    remap = np.cumsum(present) - 1
+    return remap[offsets], np.flatnonzero(present) + low
+
+
+def _scores(values: np.ndarray) -> np.ndarray:
+    """
+    Score values 1-RFM_SCORES by quantile: a value scores by the share of
+    values strictly below it, so ties always share a score.
+
+    A value reaches score k + 1 once it is above the value at position
+    ceil(k * n / RFM_SCORES) - 1 of the sorted values, so only those few
+    cut-offs are searched rather than every value.
+    """
+    n = len(values)
+    if not n:
+        return np.array([], dtype=np.int8)
+    positions = -(-np.arange(1, RFM_SCORES) * n // RFM_SCORES) - 1
+    cutoffs = np.sort(values)[positions]
+    return (np.searchsorted(cutoffs, values, side="left") + 1).astype(np.int8)
+
+
+def rfm_scores(orders: pd.DataFrame, as_of=None) -> pd.DataFrame:
+    """
+    Return one row per customer with recency, frequency and monetary value,
+    their 1-5 quantile scores, the combined rfm_score (e.g. 545) and segment.
+
+    orders has ORDER_COLUMNS (see compact_orders). recency_days counts the
+    days from the last order to as_of (default: the day after the last
+    order in orders). Customers are factorized to integer codes and every
+    measure is one np.bincount or ufunc reduction over them.
+    """
+    codes, customers = customer_codes(orders["customer_id"].to_numpy())
+    n = len(customers)
+    days = orders["order_day"].to_numpy()
+
+    frequency = np.bincount(codes, minlength=n)
+    monetary = np.bincount(codes, weights=orders["total_amount"].to_numpy(), minlength=n)
+    last_day = np.full(n, np.iinfo(np.int64).min)
+    np.maximum.at(last_day, codes, days)
+
+    if as_of is None:
+        as_of_day = int(days.max()) + 1 if len(days) else 0
+    else:
+        as_of_day = int((np.datetime64(pd.Timestamp(as_of).date(), "D") - EPOCH).astype(np.int64))
+    recency = as_of_day - last_day
+
+    r_score = _scores(-recency)
+    f_score = _scores(frequency)
+    m_score = _scores(monetary)
+
+    segment = np.full(n, len(RFM_SEGMENTS), dtype=np.int8)
+    for position in range(len(RFM_SEGMENTS) - 1, -1, -1):
+        _, min_r, min_f, max_r, max_f = RFM_SEGMENTS[position]
+        matches = (r_score >= min_r) & (r_score <= max_r) & (f_score >= min_f) & (f_score <= max_f)
+        segment[matches] = position
+
+    # Columns of one dtype are not consolidated into one block (a copy)
+    return pd.DataFrame({
+        "customer_id": np.asarray(customers),
+        "last_order_date": EPOCH + last_day.astype("timedelta64[D]"),
+        "recency_days": recency,
+        "frequency": frequency,
+        "monetary": monetary,
+        "r_score": r_score,
+        "f_score": f_score,
+        "m_score": m_score,
+        "rfm_score": r_score.astype(np.int16) * 100 + f_score * 10 + m_score,
+        "segment": pd.Categorical.from_codes(
+            segment, [name for name, *_ in RFM_SEGMENTS] + [OTHER_SEGMENT]
+        ),
+    }, copy=False)
+
+
+def _order_months(days: np.ndarray) -> np.ndarray:
+    """
+    Return month numbers (months since 1970-01) of int64 day numbers,
+    looked up per distinct day in the range instead of converted per order.
+    """
+    first = int(days.min())
+    months = (EPOCH + np.arange(first, int(days.max()) + 1).astype("timedelta64[D]"))
+    return months.astype("datetime64[M]").astype(np.int64)[days - first]
+
+
+def cohort_retention(orders: pd.DataFrame) -> pd.DataFrame:
+    """
+    Return the monthly cohort retention matrix: one row per first-order
+    month (cohort_month) with the cohort's size and, in month_<k>, the
+    share of its customers who ordered again k months later.
+
+    Months a cohort has not reached yet (after the last order month in
+    orders) are NaN. Customers are integer codes and months integer month
+    numbers; each order becomes one integer per (cohort, months since the
+    first order, customer), which are deduplicated with np.unique and
+    counted per (cohort, offset) with np.bincount. Memory grows with the
+    number of orders, not with months x customers, and no per-customer
+    Python code runs.
+    """
+    days = orders["order_day"].to_numpy()
+    if not len(days):
+        return pd.DataFrame({"cohort_month": [], "cohort_size": []})
+    codes, customers = customer_codes(orders["customer_id"].to_numpy())
+    n = len(customers)
+    months = _order_months(days)
+
+    first_month = np.full(n, np.iinfo(np.int64).max)
+    np.minimum.at(first_month, codes, months)
+    first, last = int(first_month.min()), int(months.max())
+    width = last - first + 1
+    cohort = first_month - first
+
+    # One key per customer and month they ordered in; (cohort, offset)
+    # pairs stay below width**2, so keys fit int64 for any realistic size
+    offset = months - first_month[codes]
+    active = np.unique((cohort[codes] * width + offset) * n + codes)
+    # counts[c, k]: customers of cohort c who ordered k months after their first
+    counts = np.bincount(active // n, minlength=width * width).reshape(width, width)
+
+    sizes = counts[:, 0]
+    cohorts = np.flatnonzero(sizes)
+    retention = counts[cohorts] / sizes[cohorts, None]
+    # Offsets past the last month in the data are not observed yet
+    reached = np.arange(width)[None, :] <= (width - 1 - cohorts)[:, None]
+    retention = np.where(reached, retention, np.nan)
+
+    cohort_months = (first + cohorts).astype("datetime64[M]").astype(str)
+    result = pd.DataFrame(retention, columns=[f"month_{k}" for k in range(width)])
+    result.insert(0, "cohort_size", sizes[cohorts])
+    result.insert(0, "cohort_month", cohort_months)
+    return result
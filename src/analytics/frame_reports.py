@@ -0,0 +1,206 @@
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+
+from src.config import REPORT_FORMAT, REPORTS_DIR
+from src.utils.io_utils import ChunkedTableWriter
+from src.utils.logging_utils import get_logger
+from src.warehouse.partitions import date_bounds
+
+logger = get_logger(__name__)
+
+# Reports the in-memory backend computes, with the output columns of the
+# SQL reports of the same name in src.analytics.reports
+FRAME_REPORTS = {
+    "top_products_by_revenue": ["product_name", "category", "revenue"],
+    "revenue_by_month": ["year_month", "revenue"],
+    "revenue_by_country": ["country", "revenue"],
+}
+
+
+def group_sum(keys: pd.DataFrame, values: np.ndarray) -> pd.DataFrame:
+    """
+    Sum values per distinct row of keys, skipping rows with a missing key.
+
+    Each key column is factorized, the codes are combined into one group id
+    per row and the sums are taken with np.bincount, so the reduction is a
+    few vectorized passes without a hash-based groupby.
+    """
+    combined = np.zeros(len(keys), dtype=np.int64)
+    valid = np.ones(len(keys), dtype=bool)
+    uniques = []
+    for column in keys.columns:
+        codes, levels = pd.factorize(keys[column])
+        valid &= codes >= 0
+        combined = combined * max(len(levels), 1) + codes
+        uniques.append((codes, levels))
+
+    rows = np.flatnonzero(valid)
+    group_ids, _ = pd.factorize(combined[rows])
+    sums = np.bincount(group_ids, weights=values[rows], minlength=group_ids.max(initial=-1) + 1)
+
+    # Key values of each group, read from its first row
+    first = np.full(len(sums), len(rows), dtype=np.int64)
+    np.minimum.at(first, group_ids, np.arange(len(rows)))
+    result = {
+        column: levels.take(codes[rows[first]])
+        for column, (codes, levels) in zip(keys.columns, uniques)
+    }
+    result["revenue"] = sums
+    return pd.DataFrame(result)
+
+
+def _current_attributes(df: pd.DataFrame, natural_key: str, attributes: list) -> pd.DataFrame:
+    """
+    Return the attributes of each row's member as the loader would store them:
+    the values of the member's last row in df.
+    """
+    members = df.dropna(subset=[natural_key]).drop_duplicates(natural_key, keep="last")
+    codes = pd.Index(members[natural_key]).get_indexer(df[natural_key])
+    taken = members[attributes].take(np.where(codes >= 0, codes, 0)).reset_index(drop=True)
+    if (codes < 0).any():
+        taken.loc[codes < 0, :] = None
+    return taken
+
+
+class FrameReports:
+    """
+    The standard reports computed from clean order batches instead of the
+    warehouse.
+
+    Each update reduces a batch to revenue per product, month and country;
+    results() merges the partial sums. A batch resolves customer and product
+    attributes to the member's last row in that batch, as the loader's SCD2
+    dimension versions do, so the reports match the SQL reports over the
+    same batches loaded into an empty warehouse.
+    """
+
+    def __init__(self, start_date=None, end_date=None):
+        self.bounds = date_bounds(start_date, end_date)
+        self.partials = {name: [] for name in FRAME_REPORTS}
+        self.rows = 0
+
+    def update(self, df: pd.DataFrame) -> None:
+        order_dates = pd.to_datetime(df["order_date"])
+        in_range = np.ones(len(df), dtype=bool)
+        if "start_date" in self.bounds:
+            in_range &= (order_dates >= pd.Timestamp(self.bounds["start_date"])).to_numpy()
+        if "end_date" in self.bounds:
+            in_range &= (order_dates < pd.Timestamp(self.bounds["end_date"])).to_numpy()
+
+        products = _current_attributes(df, "product_id", ["product_name", "category"])[in_range]
+        countries = _current_attributes(df, "customer_id", ["country"])[in_range]
+        df = df[in_range]
+        revenue = df["total_amount"].astype("float64").fillna(0.0).to_numpy()
+        # Months as YYYYMM integers; formatting every date is far slower
+        # than formatting the few distinct months in results()
+        order_dates = order_dates[in_range]
+        months = (order_dates.dt.year * 100 + order_dates.dt.month).reset_index(drop=True)
+
+        self.partials["top_products_by_revenue"].append(
+            group_sum(products.reset_index(drop=True), revenue)
+        )
+        self.partials["revenue_by_month"].append(
+            group_sum(pd.DataFrame({"year_month": months}), revenue)
+        )
+        self.partials["revenue_by_country"].append(
+            group_sum(countries.reset_index(drop=True), revenue)
+        )
+        self.rows += len(df)
+
+    def _merged(self, name: str) -> pd.DataFrame:
+        columns = FRAME_REPORTS[name]
+        parts = self.partials[name]
+        if not parts:
+            return pd.DataFrame(columns=columns)
+        merged = pd.concat(parts, ignore_index=True)
+        keys = [column for column in columns if column != "revenue"]
+        return group_sum(merged[keys], merged["revenue"].to_numpy())
+
+    def results(self, limit: int = 10) -> dict[str, pd.DataFrame]:
+        """
+        Return {report name: DataFrame} ordered like the SQL reports.
+        """
+        products = self._merged("top_products_by_revenue")
+        months = self._merged("revenue_by_month")
+        if len(months):
+            months["year_month"] = [
+                f"{month // 100:04d}-{month % 100:02d}"
+                for month in months["year_month"].astype("int64")
+            ]
+        countries = self._merged("revenue_by_country")
+        return {
+            "top_products_by_revenue": products.sort_values("revenue", ascending=False, kind="stable")
+            .head(int(limit))
+            .reset_index(drop=True),
+            "revenue_by_month": months.sort_values("year_month").reset_index(drop=True),
+            "revenue_by_country": countries.sort_values("revenue", ascending=False, kind="stable")
+            .reset_index(drop=True),
+        }
+
+
+def top_products_by_revenue(df, limit: int = 10, start_date=None, end_date=None) -> pd.DataFrame:
+    """
+    Return top products by total revenue computed from clean orders df.
+    """
+    reports = FrameReports(start_date, end_date)
+    reports.update(df)
+    return reports.results(limit)["top_products_by_revenue"]
+
+
+def revenue_by_month(df, start_date=None, end_date=None) -> pd.DataFrame:
+    """
+    Return monthly revenue computed from clean orders df.
+    """
+    reports = FrameReports(start_date, end_date)
+    reports.update(df)
+    return reports.results()["revenue_by_month"]
+
+
+def revenue_by_country(df, start_date=None, end_date=None) -> pd.DataFrame:
+    """
+    Return revenue per customer country computed from clean orders df.
+    """
+    reports = FrameReports(start_date, end_date)
+    reports.update(df)
+    return reports.results()["revenue_by_country"]
+
+
+def write_frame_reports(reports: FrameReports, limit: int = 10, fmt=None, names=None) -> dict:
+    """
+    Write the results of reports under the reports/ directory like
+    generate_all_reports does, optionally only the reports in names.
+
+    Returns:
+        {"report_timings": {name: compute/write seconds and rows}}
+    """
+    fmt = fmt or REPORT_FORMAT
+    REPORTS_DIR.mkdir(parents=True, exist_ok=True)
+
+    started = perf_counter()
+    results = reports.results(limit)
+    compute_seconds = perf_counter() - started
+
+    timings = {}
+    for name, df in results.items():
+        if names and name not in names:
+            continue
+        started = perf_counter()
+        with ChunkedTableWriter(REPORTS_DIR / f"{name}.{fmt}", fmt) as writer:
+            writer.write(df)
+        timings[name] = {
+            "compute_seconds": compute_seconds,
+            "write_seconds": perf_counter() - started,
+            "rows": len(df),
+        }
+        logger.info(
+            "Report %s (in-memory): %d rows, write %.3fs",
+            name,
+            len(df),
+            timings[name]["write_seconds"],
+        )
+    logger.info(
+        "Computed in-memory reports over %d orders in %.3fs", reports.rows, compute_seconds
+    )
+    return {"report_timings": timings}
@@ -1,94 +1,607 @@
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from time import perf_counter
+from typing import Callable, Iterator
+
 import pandas as pd
+from sqlalchemy import inspect, text
 
-from src.warehouse.db import get_engine
-from src.config import REPORTS_DIR
+from src.analytics.cache import cache_key, frame_digest, get_report_cache
+from src.analytics.customer_analytics import cohort_retention, compact_orders, rfm_scores
+from src.warehouse.db import get_engine, read_only_connection
+from src.warehouse.partitions import fact_source, month_of
+from src.warehouse.versions import data_version
+from src.config import (
+    REPORT_CHUNK_SIZE,
+    REPORT_FORMAT,
+    REPORT_WORKERS,
+    REPORTS_DIR,
+)
+from src.utils.io_utils import ChunkedTableWriter
 from src.utils.logging_utils import get_logger
 
 logger = get_logger(__name__)
 
 
-def top_products_by_revenue(limit: int = 10, engine=None) -> pd.DataFrame:
+@dataclass(frozen=True)
+class Report:
     """
-    Return top products by total revenue.
+    A named report; build(engine, limit, start_date, end_date) returns its
+    (query text, parameters).
+
+    Streamed reports are detail exports that may not fit in memory: they
+    are fetched and written chunk by chunk, never cached, and only run
+    when asked for by name.
+
+    Reports with a transform are computed in Python from their query's
+    result: transform(chunks, params) gets an iterator of result chunks
+    and the query parameters and returns the report. Reports that are not
+    default only run when asked for by name.
     """
-    if engine is None:
-        engine = get_engine()
 
+    name: str
+    build: Callable[..., tuple[str, dict]]
+    streamed: bool = False
+    transform: Callable[..., pd.DataFrame] | None = None
+    default: bool = True
+
+
+# Reports written by generate_all_reports, in registration order
+REPORTS: dict[str, Report] = {}
+
+EXPORT_SUFFIXES = {"csv": ".csv", "parquet": ".parquet"}
+
+
+def register_report(name: str, streamed: bool = False, transform=None, default=None):
+    """
+    Decorator adding a query builder to REPORTS under name; see Report.
+    Streamed reports are not default unless default says otherwise.
+    """
+    def decorator(build):
+        is_default = not streamed if default is None else default
+        REPORTS[name] = Report(name, build, streamed, transform, is_default)
+        return build
+    return decorator
+
+
+def aggregate_source(engine, table, start_date=None, end_date=None):
+    """
+    Return (WHERE clause, parameters) for reading the aggregate table
+    (alias a) over the date range, or None if the facts must be read.
+
+    Aggregates hold whole months, so they serve ranges that start on the
+    first and end on the last day of a month (or are open); other ranges,
+    and databases without the aggregate tables, fall back to fact_orders.
+    """
+    start = pd.Timestamp(start_date) if start_date is not None else None
+    end = pd.Timestamp(end_date) if end_date is not None else None
+    if start is not None and start.day != 1:
+        return None
+    if end is not None and not end.is_month_end:
+        return None
+    if not inspect(engine).has_table(table):
+        return None
+
+    conditions, params = [], {}
+    if start is not None:
+        conditions.append("a.year_month >= :first_month")
+        params["first_month"] = month_of(start)
+    if end is not None:
+        conditions.append("a.year_month <= :last_month")
+        params["last_month"] = month_of(end)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    return where, params
+
+
+def _fetch(conn, query: str, params: dict, timing: dict) -> pd.DataFrame:
+    started = perf_counter()
+    result = conn.execute(text(query), params)
+    executed = perf_counter()
+    df = pd.DataFrame(result.fetchall(), columns=list(result.keys()))
+    timing["query_seconds"] += executed - started
+    timing["fetch_seconds"] += perf_counter() - executed
+    return df
+
+
+def _iter_chunks(conn, query: str, params: dict, chunk_size: int, timing: dict):
+    started = perf_counter()
+    result = conn.execution_options(
+        stream_results=True, max_row_buffer=chunk_size
+    ).execute(text(query), params)
+    timing["query_seconds"] += perf_counter() - started
+    columns = list(result.keys())
+
+    empty = True
+    partitions = result.partitions(chunk_size)
+    while True:
+        started = perf_counter()
+        rows = next(partitions, None)
+        timing["fetch_seconds"] += perf_counter() - started
+        if rows is None:
+            break
+        empty = False
+        yield pd.DataFrame(rows, columns=columns)
+    if empty:
+        yield pd.DataFrame(columns=columns)
+
+
+def _compute(conn, query: str, params: dict, transform, chunk_size: int, timing: dict):
+    started = perf_counter()
+    df = transform(_iter_chunks(conn, query, params, chunk_size, timing), params)
+    timing["compute_seconds"] = (
+        perf_counter() - started - timing["query_seconds"] - timing["fetch_seconds"]
+    )
+    return df
+
+
+def iter_report(
+    engine, query: str, params: dict, chunk_size: int, timing=None
+) -> Iterator[pd.DataFrame]:
+    """
+    Yield the result of a report query in DataFrames of at most chunk_size rows.
+
+    Rows are fetched with a streaming (server-side where the driver has
+    one) cursor, so memory use does not depend on the size of the result.
+    A result without rows yields one empty DataFrame with its columns.
+    timing, if given, gets query_seconds and fetch_seconds added to it.
+    """
+    timing = timing if timing is not None else {}
+    timing.setdefault("query_seconds", 0.0)
+    timing.setdefault("fetch_seconds", 0.0)
+    with read_only_connection(engine) as conn:
+        yield from _iter_chunks(conn, query, params, chunk_size, timing)
+
+
+def read_report(
+    engine, query: str, params: dict, cache=None, timing=None, transform=None, chunk_size=None
+) -> pd.DataFrame:
+    """
+    Run a report query on a read-only connection, through cache (a
+    ReportCache) if given.
+
+    With a transform (see Report), the result is streamed to it in chunks
+    of chunk_size rows (default: REPORT_CHUNK_SIZE) and its output is
+    returned and cached instead of the rows.
+
+    The cache key includes the warehouse data version read in the same
+    transaction as the query, so any load makes older results miss.
+    Warehouses without a data version (not written by the loader) are
+    never cached. timing, if given, gets query_seconds (execution) and
+    fetch_seconds (fetching rows into the DataFrame) added to it, and
+    compute_seconds for a transform.
+    """
+    timing = timing if timing is not None else {}
+    timing.setdefault("query_seconds", 0.0)
+    timing.setdefault("fetch_seconds", 0.0)
+    with read_only_connection(engine) as conn:
+        if transform is None:
+            run = partial(_fetch, conn, query, params, timing)
+        else:
+            run = partial(
+                _compute, conn, query, params, transform, chunk_size or REPORT_CHUNK_SIZE, timing
+            )
+
+        version = data_version(conn) if cache is not None else None
+        if version is None:
+            return run()
+
+        key = cache_key(
+            engine.url.render_as_string(hide_password=True),
+            query,
+            params,
+            version,
+            transform=f"{transform.__module__}.{transform.__qualname__}" if transform else None,
+        )
+        df = cache.get(key)
+        if df is None:
+            df = run()
+            cache.put(key, df)
+    return df
+
+
+@register_report("top_products_by_revenue")
+def top_products_query(engine, limit=10, start_date=None, end_date=None):
+    """
+    Query for the top products by revenue, from aggregates where possible.
+    """
+    aggregate = aggregate_source(engine, "agg_revenue_product", start_date, end_date)
+    if aggregate is not None:
+        where, params = aggregate
+        query = f"""
+        SELECT
+            p.product_name,
+            p.category,
+            SUM(a.revenue) AS revenue
+        FROM agg_revenue_product a
+        JOIN dim_products p ON a.product_key = p.product_key
+        {where}
+        GROUP BY p.product_name, p.category
+        ORDER BY revenue DESC
+        LIMIT {int(limit)}
+        """
+        return query, params
+
+    source, where, params = fact_source(engine, start_date, end_date)
     query = f"""
     SELECT
         p.product_name,
         p.category,
         SUM(f.total_amount) AS revenue
-    FROM fact_orders f
-    JOIN dim_products p ON f.product_id = p.product_id
+    FROM {source} f
+    JOIN dim_products p ON f.product_key = p.product_key
+    {where}
     GROUP BY p.product_name, p.category
     ORDER BY revenue DESC
     LIMIT {int(limit)}
     """
-    return pd.read_sql_query(query, engine)
+    return query, params
 
 
-def revenue_by_month(engine=None) -> pd.DataFrame:
+@register_report("revenue_by_month")
+def revenue_by_month_query(engine, limit=None, start_date=None, end_date=None):
     """
-    Return monthly revenue.
+    Query for revenue per month, from aggregates where possible.
     """
-    if engine is None:
-        engine = get_engine()
+    aggregate = aggregate_source(engine, "agg_revenue_month", start_date, end_date)
+    if aggregate is not None:
+        where, params = aggregate
+        query = f"""
+        SELECT
+            a.year_month,
+            a.revenue
+        FROM agg_revenue_month a
+        {where}
+        ORDER BY a.year_month;
+        """
+        return query, params
 
-    query = """
+    source, where, params = fact_source(engine, start_date, end_date)
+    query = f"""
     SELECT
-        substr(order_date, 1, 7) AS year_month,
-        SUM(total_amount) AS revenue
-    FROM fact_orders
-    GROUP BY year_month
-    ORDER BY year_month;
+        f.year_month,
+        SUM(f.total_amount) AS revenue
+    FROM {source} f
+    {where}
+    GROUP BY f.year_month
+    ORDER BY f.year_month;
     """
-    return pd.read_sql_query(query, engine)
+    return query, params
 
 
-def revenue_by_country(engine=None) -> pd.DataFrame:
+@register_report("revenue_by_country")
+def revenue_by_country_query(engine, limit=None, start_date=None, end_date=None):
     """
-    Return revenue per customer country.
+    Query for revenue per customer country, from aggregates where possible.
     """
-    if engine is None:
-        engine = get_engine()
+    aggregate = aggregate_source(engine, "agg_revenue_country", start_date, end_date)
+    if aggregate is not None:
+        where, params = aggregate
+        query = f"""
+        SELECT
+            a.country,
+            SUM(a.revenue) AS revenue
+        FROM agg_revenue_country a
+        {where}
+        GROUP BY a.country
+        ORDER BY revenue DESC;
+        """
+        return query, params
 
-    query = """
+    source, where, params = fact_source(engine, start_date, end_date)
+    query = f"""
     SELECT
         c.country,
         SUM(f.total_amount) AS revenue
-    FROM fact_orders f
-    JOIN dim_customers c ON f.customer_id = c.customer_id
+    FROM {source} f
+    JOIN dim_customers c ON f.customer_key = c.customer_key
+    {where}
     GROUP BY c.country
     ORDER BY revenue DESC;
     """
-    return pd.read_sql_query(query, engine)
+    return query, params
+
+
+@register_report("order_details", streamed=True)
+def order_details_query(engine, limit=None, start_date=None, end_date=None):
+    """
+    Query for one row per order with its customer and product attributes.
+    """
+    source, where, params = fact_source(engine, start_date, end_date)
+    query = f"""
+    SELECT
+        f.order_id,
+        f.order_date,
+        c.customer_id,
+        c.customer_name,
+        c.country,
+        p.product_id,
+        p.product_name,
+        p.category,
+        f.quantity,
+        f.unit_price,
+        f.total_amount
+    FROM {source} f
+    LEFT JOIN dim_customers c ON f.customer_key = c.customer_key
+    LEFT JOIN dim_products p ON f.product_key = p.product_key
+    {where}
+    """
+    return query, params
+
+
+@register_report("customer_revenue", streamed=True)
+def customer_revenue_query(engine, limit=None, start_date=None, end_date=None):
+    """
+    Query for order count and revenue per customer version.
+    """
+    source, where, params = fact_source(engine, start_date, end_date)
+    query = f"""
+    SELECT
+        c.customer_id,
+        c.customer_name,
+        c.country,
+        c.valid_from,
+        COUNT(*) AS orders,
+        SUM(f.total_amount) AS revenue
+    FROM {source} f
+    JOIN dim_customers c ON f.customer_key = c.customer_key
+    {where}
+    GROUP BY f.customer_key
+    """
+    return query, params
+
+
+def _rfm_report(chunks, params: dict) -> pd.DataFrame:
+    # Recency is measured from the day after the range (or the last order)
+    return rfm_scores(compact_orders(chunks), as_of=params.get("end_date"))
+
+
+def _cohort_report(chunks, params: dict) -> pd.DataFrame:
+    return cohort_retention(compact_orders(chunks))
 
 
-def generate_all_reports(limit: int = 10) -> None:
+@register_report("customer_rfm", transform=_rfm_report, default=False)
+@register_report("cohort_retention", transform=_cohort_report, default=False)
+def customer_orders_query(engine, limit=None, start_date=None, end_date=None):
     """
-    Generate CSV reports under the reports/ directory:
-    - top_products_by_revenue.csv
-    - revenue_by_month.csv
-    - revenue_by_country.csv
+    Query for the customer, date and amount of every order, the input of
+    the RFM and cohort retention reports (see src.analytics.customer_analytics).
+    """
+    source, where, params = fact_source(engine, start_date, end_date)
+    query = f"""
+    SELECT
+        f.customer_id,
+        f.order_date,
+        f.total_amount
+    FROM {source} f
+    {where}
+    """
+    return query, params
+
+
+def top_products_by_revenue(
+    limit: int = 10, engine=None, start_date=None, end_date=None, cache=None
+) -> pd.DataFrame:
+    """
+    Return top products by total revenue.
+
+    start_date and end_date (inclusive, optional) restrict the orders read;
+    with a partitioned fact table only the matching months are scanned.
+    Whole-month ranges are answered from agg_revenue_product instead.
+    """
+    if engine is None:
+        engine = get_engine()
+    query, params = top_products_query(engine, limit, start_date, end_date)
+    return read_report(engine, query, params, cache)
+
+
+def revenue_by_month(engine=None, start_date=None, end_date=None, cache=None) -> pd.DataFrame:
+    """
+    Return monthly revenue, optionally within an inclusive date range.
+
+    Whole-month ranges are read from agg_revenue_month.
+    """
+    if engine is None:
+        engine = get_engine()
+    query, params = revenue_by_month_query(engine, None, start_date, end_date)
+    return read_report(engine, query, params, cache)
+
+
+def revenue_by_country(
+    engine=None, start_date=None, end_date=None, cache=None
+) -> pd.DataFrame:
+    """
+    Return revenue per customer country, optionally within an inclusive date range.
+
+    Orders count towards the country their customer had when they were loaded.
+    Whole-month ranges are answered from agg_revenue_country.
+    """
+    if engine is None:
+        engine = get_engine()
+    query, params = revenue_by_country_query(engine, None, start_date, end_date)
+    return read_report(engine, query, params, cache)
+
+
+def customer_rfm(
+    engine=None, start_date=None, end_date=None, cache=None, chunk_size=None
+) -> pd.DataFrame:
+    """
+    Return RFM (recency, frequency, monetary) scores and segments per
+    customer_id, optionally within an inclusive date range.
+
+    Orders are streamed from the warehouse in chunks of chunk_size rows
+    and scored with vectorized operations, see rfm_scores.
+    """
+    if engine is None:
+        engine = get_engine()
+    query, params = customer_orders_query(engine, None, start_date, end_date)
+    return read_report(engine, query, params, cache, transform=_rfm_report, chunk_size=chunk_size)
+
+
+def customer_cohort_retention(
+    engine=None, start_date=None, end_date=None, cache=None, chunk_size=None
+) -> pd.DataFrame:
+    """
+    Return the monthly cohort retention matrix of customers (first-order
+    month x months since), optionally within an inclusive date range.
+    """
+    if engine is None:
+        engine = get_engine()
+    query, params = customer_orders_query(engine, None, start_date, end_date)
+    return read_report(
+        engine, query, params, cache, transform=_cohort_report, chunk_size=chunk_size
+    )
+
+
+def _write_report(report: Report, engine, cache, options: dict, fmt: str, chunk_size: int) -> dict:
+    """
+    Run one report and write its file; return its timings and row count.
+    """
+    timing = {"query_seconds": 0.0, "fetch_seconds": 0.0, "write_seconds": 0.0}
+    query, params = report.build(engine, **options)
+    path = REPORTS_DIR / f"{report.name}{EXPORT_SUFFIXES[fmt]}"
+
+    if report.streamed:
+        with ChunkedTableWriter(path, fmt) as writer:
+            for chunk in iter_report(engine, query, params, chunk_size, timing):
+                started = perf_counter()
+                writer.write(chunk)
+                timing["write_seconds"] += perf_counter() - started
+        timing["rows"] = writer.rows
+        written = True
+    else:
+        df = read_report(engine, query, params, cache, timing, report.transform, chunk_size)
+        started = perf_counter()
+        digest = frame_digest(df) if cache is not None else None
+        written = not (cache is not None and cache.output_is_current(path, digest))
+        if written:
+            with ChunkedTableWriter(path, fmt) as writer:
+                writer.write(df)
+            if cache is not None:
+                cache.record_output(path, digest)
+            timing["write_seconds"] = perf_counter() - started
+        timing["rows"] = len(df)
+
+    logger.info(
+        "Report %s: %d rows, query %.3fs, fetch %.3fs, %swrite %.3fs%s",
+        report.name,
+        timing["rows"],
+        timing["query_seconds"],
+        timing["fetch_seconds"],
+        f"compute {timing['compute_seconds']:.3f}s, " if "compute_seconds" in timing else "",
+        timing["write_seconds"],
+        "" if written else " (file up to date)",
+    )
+    return timing
+
+
+def generate_all_reports(
+    limit: int = 10,
+    engine=None,
+    start_date=None,
+    end_date=None,
+    cache=None,
+    workers=None,
+    reports=None,
+    fmt=None,
+    chunk_size=None,
+    profiler=None,
+) -> dict:
+    """
+    Generate one file per registered report (see register_report) under
+    the reports/ directory, by default:
+    - top_products_by_revenue
+    - revenue_by_month
+    - revenue_by_country
+
+    All reports share engine (default: the shared engine for DB_URL) and
+    cover orders between start_date and end_date (inclusive) when given.
+    reports (names) selects which reports run; streamed detail exports
+    (order_details, customer_revenue) and the customer analytics
+    (customer_rfm, cohort_retention) only run when named. Files are
+    written as fmt, "csv" or "parquet" (default: REPORT_FORMAT); streamed
+    reports are fetched and written chunk_size rows at a time (default:
+    REPORT_CHUNK_SIZE), so their memory use stays constant.
+
+    Reports run concurrently on a pool of workers threads (default:
+    REPORT_WORKERS), each on its own read-only connection from the
+    engine's pool, so the wall time follows the slowest report.
+
+    With a profiler (see src.utils.profiling) every report is profiled as
+    report_<name>, and reports run one at a time.
+
+    Results of the other reports come from cache (default: the shared
+    report cache, see src.analytics.cache) while the warehouse is
+    unchanged, and their files are only rewritten when the content changed.
+
+    Returns:
+        {"report_timings": {name: query/fetch/write seconds and rows},
+         "report_cache": hits, misses, ... of this call (empty when
+         caching is disabled)}
     """
     REPORTS_DIR.mkdir(parents=True, exist_ok=True)
 
     logger.info("Generating analytics reports into %s", REPORTS_DIR)
 
-    engine = get_engine()
-
-    df_top_products = top_products_by_revenue(limit=limit, engine=engine)
-    top_products_path = REPORTS_DIR / "top_products_by_revenue.csv"
-    df_top_products.to_csv(top_products_path, index=False)
-    logger.info("Wrote %s", top_products_path)
+    if engine is None:
+        engine = get_engine()
+    if cache is None:
+        cache = get_report_cache()
+    fmt = fmt or REPORT_FORMAT
+    chunk_size = chunk_size or REPORT_CHUNK_SIZE
+    if reports:
+        selected = [REPORTS[name] for name in reports]
+    else:
+        selected = [report for report in REPORTS.values() if report.default]
+    workers = max(1, min(workers or REPORT_WORKERS, len(selected)))
+    if profiler is not None:
+        workers = 1
+    options = {"limit": limit, "start_date": start_date, "end_date": end_date}
+    before = cache.stats() if cache is not None else {}
 
-    df_monthly = revenue_by_month(engine=engine)
-    monthly_path = REPORTS_DIR / "revenue_by_month.csv"
-    df_monthly.to_csv(monthly_path, index=False)
-    logger.info("Wrote %s", monthly_path)
+    started = perf_counter()
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="report") as pool:
+        futures = {
+            report.name: pool.submit(
+                _write_report, report, engine, cache, options, fmt, chunk_size
+            )
+            if profiler is None
+            else pool.submit(
+                profiler.call,
+                f"report_{report.name}",
+                _write_report,
+                report,
+                engine,
+                cache,
+                options,
+                fmt,
+                chunk_size,
+            )
+            for report in selected
+        }
+        timings = {name: future.result() for name, future in futures.items()}
+    logger.info(
+        "Generated %d reports with %d workers in %.3fs",
+        len(selected),
+        workers,
+        perf_counter() - started,
+    )
 
-    df_country = revenue_by_country(engine=engine)
-    country_path = REPORTS_DIR / "revenue_by_country.csv"
-    df_country.to_csv(country_path, index=False)
-    logger.info("Wrote %s", country_path)
+    stats = {}
+    if cache is not None:
+        after = cache.stats()
+        stats = {
+            **after,
+            "hits": after["hits"] - before["hits"],
+            "misses": after["misses"] - before["misses"],
+            "evictions": after["evictions"] - before["evictions"],
+        }
+        logger.info(
+            "Report cache: %d hits, %d misses, %d evictions (%d entries, %d bytes).",
+            stats["hits"],
+            stats["misses"],
+            stats["evictions"],
+            stats["entries"],
+            stats["bytes"],
+        )
+    return {"report_timings": timings, "report_cache": stats}
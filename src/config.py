@@ -11,15 +11,118 @@ BASE_DIR = Path(__file__).resolve().parents[1]
 # Data paths
 DATA_DIR = BASE_DIR / "data"
 RAW_DATA_PATH = DATA_DIR / "raw" / "orders_raw.csv"
+# Record of ingested raw files + order high-water mark for incremental runs
+INGEST_MANIFEST_PATH = DATA_DIR / "ingest_manifest.json"
 PROCESSED_DATA_PATH = DATA_DIR / "processed" / "orders_clean.csv"
+# Parquet dataset partitioned by order_year/order_month
+PROCESSED_PARQUET_PATH = DATA_DIR / "processed" / "orders_clean"
+# Format of the processed layer: "csv" or "parquet" (requires pyarrow)
+PROCESSED_DATA_FORMAT = os.getenv("PROCESSED_DATA_FORMAT", "csv")
+
+# Incremental runs: also drop rows of new or changed files whose order_id is
+# at or below the high-water mark of earlier runs. Off by default, since the
+# ingest manifest already reads each file once and loads upsert by order_id,
+# so late or corrected orders get through
+INCREMENTAL_SKIP_OLD_ORDERS = os.getenv("INCREMENTAL_SKIP_OLD_ORDERS", "0").lower() in ("1", "true", "yes")
+
+# Rows failing data quality rules are written here instead of being loaded
+QUARANTINE_PATH = DATA_DIR / "quarantine" / "orders_quarantine.csv"
+# Fail the run when more than this share of rows fails data quality rules
+DQ_MAX_ERROR_RATE = float(os.getenv("DQ_MAX_ERROR_RATE", "0.01"))
 
 # Database configuration
 DB_PATH = BASE_DIR / "warehouse.db"
 # You can override this with an environment variable DB_URL
 DB_URL = os.getenv("DB_URL", f"sqlite:///{DB_PATH}")
 
+# Connection pool of the shared engine (one per DB URL and process)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+# Test pooled connections with a lightweight ping before handing them out
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "1").lower() in ("1", "true", "yes")
+# PRAGMAs set on every new SQLite connection
+SQLITE_CONNECT_PRAGMAS = {
+    "busy_timeout": 5000,
+    "cache_size": -65536,  # 64 MiB
+    "temp_store": "MEMORY",
+}
+
+# Warehouse load mode: "upsert" (batched INSERT ... ON CONFLICT into the
+# declared tables) or "replace" (DataFrame.to_sql, rebuilds the tables)
+LOAD_MODE = os.getenv("LOAD_MODE", "upsert")
+# Rows per executemany batch / transaction in upsert mode
+LOAD_BATCH_SIZE = int(os.getenv("LOAD_BATCH_SIZE", "10000"))
+
+# Fact table layout: "none" (one fact_orders table) or "month" (one table per
+# order month behind a fact_orders view, so queries and reloads touch only
+# the months they need)
+FACT_PARTITIONING = os.getenv("FACT_PARTITIONING", "none")
+
+# Use the SQLite bulk-load fast path (relaxed PRAGMAs, deferred indexes,
+# single transaction) for warehouse loads
+SQLITE_BULK_LOAD = os.getenv("SQLITE_BULK_LOAD", "0").lower() in ("1", "true", "yes")
+
 # Logs directory
 LOGS_DIR = BASE_DIR / "logs"
 
+# Per-run column profiles used for drift checks (one JSON object per line)
+PROFILE_HISTORY_PATH = LOGS_DIR / "profile_history.jsonl"
+
 # Reports directory
 REPORTS_DIR = BASE_DIR / "reports"
+
+# Threads generate_all_reports runs reports on (each with its own connection);
+# report queries are CPU-bound in SQLite, so more threads than cores do not help
+REPORT_WORKERS = int(os.getenv("REPORT_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# Default file format ("csv" or "parquet") of report files, and rows per
+# fetch/write for streamed detail exports
+REPORT_FORMAT = os.getenv("REPORT_FORMAT", "csv")
+REPORT_CHUNK_SIZE = int(os.getenv("REPORT_CHUNK_SIZE", "50000"))
+
+# On-disk cache of report results, keyed by query, parameters and the
+# warehouse data version; least recently used entries are evicted beyond
+# either bound
+REPORT_CACHE_DIR = Path(os.getenv("REPORT_CACHE_DIR", DATA_DIR / "report_cache"))
+REPORT_CACHE_MAX_ENTRIES = int(os.getenv("REPORT_CACHE_MAX_ENTRIES", "128"))
+REPORT_CACHE_MAX_BYTES = int(os.getenv("REPORT_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+REPORT_CACHE_ENABLED = os.getenv("REPORT_CACHE_ENABLED", "1").lower() in ("1", "true", "yes")
+
+# Engine the standard reports are computed with: "sql" queries the warehouse,
+# "memory" reduces the clean DataFrames of a pipeline run (or the processed
+# layer) with vectorized pandas/NumPy and never touches the database
+ANALYTICS_BACKEND = os.getenv("ANALYTICS_BACKEND", "sql")
+
+# Stage checkpoints of pipeline runs (see src/orchestration/dag.py): outputs
+# of each stage keyed by a hash of its inputs and code, so --resume and
+# --from-stage can skip stages whose checkpoint is still valid. They pickle
+# every batch's DataFrames (a multiple of the input size), so they are only
+# written with PIPELINE_CHECKPOINTS=1, --checkpoint, --resume or --from-stage
+CHECKPOINT_DIR = Path(os.getenv("CHECKPOINT_DIR", DATA_DIR / "checkpoints"))
+PIPELINE_CHECKPOINTS = os.getenv("PIPELINE_CHECKPOINTS", "0").lower() in ("1", "true", "yes")
+# Per-run stage metrics appended to LOGS_DIR / "run_history.jsonl";
+# python -m src.run_history flags stages whose latest time (or throughput)
+# is worse than the median of the last RUN_HISTORY_WINDOW runs by more
+# than RUN_HISTORY_MAX_RATIO, ignoring stages faster than RUN_HISTORY_MIN_SECONDS
+RUN_HISTORY_WINDOW = int(os.getenv("RUN_HISTORY_WINDOW", "10"))
+RUN_HISTORY_MAX_RATIO = float(os.getenv("RUN_HISTORY_MAX_RATIO", "1.5"))
+RUN_HISTORY_MIN_SECONDS = float(os.getenv("RUN_HISTORY_MIN_SECONDS", "0.1"))
+# --profile output: per-stage cProfile dumps and tracemalloc summaries under
+# PROFILE_DIR/<timestamp>-<run>/, each summary listing the top PROFILE_TOP_N entries
+PROFILE_DIR = Path(os.getenv("PROFILE_DIR", LOGS_DIR / "profiles"))
+PROFILE_TOP_N = int(os.getenv("PROFILE_TOP_N", "25"))
+# Threads running independent stages of a batch (e.g. the dimension loads)
+PIPELINE_STAGE_WORKERS = int(os.getenv("PIPELINE_STAGE_WORKERS", "3"))
+# python -m src.main --watch DIR: poll DIR every WATCH_POLL_SECONDS and load
+# new files (once unchanged for a poll) in micro-batches, as soon as the
+# oldest has waited WATCH_MAX_LATENCY_SECONDS or the batch reaches
+# WATCH_MAX_BATCH_FILES files or WATCH_MAX_BATCH_BYTES bytes
+WATCH_POLL_SECONDS = float(os.getenv("WATCH_POLL_SECONDS", "5"))
+WATCH_MAX_LATENCY_SECONDS = float(os.getenv("WATCH_MAX_LATENCY_SECONDS", "60"))
+WATCH_MAX_BATCH_FILES = int(os.getenv("WATCH_MAX_BATCH_FILES", "100"))
+WATCH_MAX_BATCH_BYTES = int(os.getenv("WATCH_MAX_BATCH_BYTES", str(256 * 1024 * 1024)))
+# Files of a failed micro-batch are retried one at a time after
+# WATCH_RETRY_SECONDS, doubling the wait after each further failure; a file
+# that failed WATCH_MAX_FAILURES times is moved into failed/ next to it
+WATCH_RETRY_SECONDS = float(os.getenv("WATCH_RETRY_SECONDS", "60"))
+WATCH_MAX_FAILURES = int(os.getenv("WATCH_MAX_FAILURES", "3"))
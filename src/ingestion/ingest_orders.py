@@ -1,9 +1,107 @@
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
 import pandas as pd
 from src.config import RAW_DATA_PATH
+from src.utils.io_utils import iter_table, read_table
+
+# Declared raw schema. Integer columns use nullable, downcast types (rows with
+# missing ids are dropped later by clean_orders); repeated strings are categorical.
+RAW_SCHEMA = {
+    "order_id": "Int64",
+    "customer_id": "Int32",
+    "customer_name": "category",
+    "country": "category",
+    "product_id": "Int32",
+    "product_name": "category",
+    "category": "category",
+    "order_date": "datetime64[ns]",
+    "quantity": "Int16",
+    "unit_price": "float64",
+}
+RAW_DATE_FORMAT = "%Y-%m-%d"
+
+# CSV integers are parsed as Int64 first: pandas wraps out-of-range values
+# silently when parsing straight into a narrower type.
+_CSV_READ_DTYPES = {
+    col: ("Int64" if dtype.startswith("Int") else dtype)
+    for col, dtype in RAW_SCHEMA.items()
+    if col != "order_date"
+}
+
+def _downcast_int(series: pd.Series, dtype: str) -> pd.Series:
+    """
+    Cast an integer column to a narrower nullable type, failing on overflow.
+    """
+    info = np.iinfo(dtype.lower())
+    values = series.dropna()
+    if not values.empty and (values.min() < info.min or values.max() > info.max):
+        raise ValueError(
+            f"Raw schema drift: {series.name} has values outside the {dtype} range "
+            f"[{values.min()}, {values.max()}]"
+        )
+    return series.astype(dtype)
+
+def apply_raw_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Check the raw columns against RAW_SCHEMA and cast them to the declared types.
+
+    Raises:
+        ValueError on missing or unexpected columns, unparseable dates or
+        integer values that do not fit the declared type.
+    """
+    missing = [col for col in RAW_SCHEMA if col not in df.columns]
+    unexpected = [col for col in df.columns if col not in RAW_SCHEMA]
+    if missing or unexpected:
+        raise ValueError(
+            f"Raw schema drift: missing columns {missing}, unexpected columns {unexpected}"
+        )
+
+    columns = {}
+    for col, dtype in RAW_SCHEMA.items():
+        if col == "order_date":
+            columns[col] = pd.to_datetime(df[col], format=RAW_DATE_FORMAT).astype(dtype)
+        elif dtype.startswith("Int"):
+            columns[col] = _downcast_int(df[col].astype("Int64"), dtype)
+        else:
+            columns[col] = df[col].astype(dtype)
+    return pd.DataFrame(columns, index=df.index)
+
+def load_raw_orders(path: Path | None = None) -> pd.DataFrame:
+    """
+    Load raw orders data from CSV, Parquet or Arrow IPC (chosen by file suffix)
+    and apply the declared raw schema.
+    """
+    df = read_table(path or RAW_DATA_PATH, dtype=_CSV_READ_DTYPES)
+    return apply_raw_schema(df)
+
+def iter_raw_orders(chunk_size: int, path: Path | None = None) -> Iterator[pd.DataFrame]:
+    """
+    Stream raw orders data in chunks of at most chunk_size rows.
+
+    Only one chunk is held in memory at a time, so memory use depends on
+    chunk_size rather than on the size of the input file.
+    """
+    if chunk_size <= 0:
+        raise ValueError(f"chunk_size must be positive, got {chunk_size}")
+
+    for chunk in iter_table(path or RAW_DATA_PATH, chunk_size, dtype=_CSV_READ_DTYPES):
+        yield apply_raw_schema(chunk)
+
+def load_raw_files(paths: list[Path]) -> pd.DataFrame:
+    """
+    Load and concatenate several raw order files.
+    """
+    frames = [load_raw_orders(path) for path in paths]
+    if len(frames) == 1:
+        return frames[0]
+    # Categories differ per file, so re-apply the schema after concatenating
+    return apply_raw_schema(pd.concat(frames, ignore_index=True))
 
-def load_raw_orders() -> pd.DataFrame:
+def iter_raw_files(paths: list[Path], chunk_size: int) -> Iterator[pd.DataFrame]:
     """
-    Load raw orders data from CSV.
+    Stream several raw order files one after another in bounded chunks.
     """
-    df = pd.read_csv(RAW_DATA_PATH)
-    return df
+    for path in paths:
+        yield from iter_raw_orders(chunk_size, path)
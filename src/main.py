@@ -1,5 +1,6 @@
 import argparse
-from src.orchestration.pipeline import run_pipeline
+from src.orchestration.pipeline import STAGES, run_pipeline
+from src.orchestration.watch import watch
 from src.utils.logging_utils import get_logger
 
 logger = get_logger(__name__)
@@ -14,13 +15,164 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Run ingestion + transform + quality checks, but skip database load.",
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=None,
+        help="Stream the raw file through every stage in chunks of N rows (default: load it all at once)",
+    )
+    parser.add_argument(
+        "--processed-format",
+        choices=["csv", "parquet"],
+        default=None,
+        help="Format of the processed data layer (default: PROCESSED_DATA_FORMAT, csv)",
+    )
+    parser.add_argument(
+        "--source",
+        default=None,
+        help="Raw file, directory or glob of raw drops to ingest (default: RAW_DATA_PATH)",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only process raw files that are new or changed since the last run, and append to the warehouse.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Ingest and transform raw files in parallel with N worker processes (default: 1)",
+    )
+    parser.add_argument(
+        "--load-mode",
+        choices=["upsert", "replace", "swap"],
+        default=None,
+        help="Warehouse load mode: upsert new/changed rows into the declared tables, replace them, or load staging tables and swap them in atomically (default: LOAD_MODE, upsert)",
+    )
+    parser.add_argument(
+        "--bulk-load",
+        action="store_true",
+        default=None,
+        help="Use the SQLite bulk-load fast path for warehouse loads (default: SQLITE_BULK_LOAD)",
+    )
+    parser.add_argument(
+        "--generate-reports",
+        action="store_true",
+        help="Write the standard reports at the end of the run (also works with --dry-run)",
+    )
+    parser.add_argument(
+        "--analytics-backend",
+        choices=["sql", "memory"],
+        default=None,
+        help="Compute reports from the warehouse or in memory from the run's clean data (default: ANALYTICS_BACKEND, sql; dry runs always use memory)",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        action="store_true",
+        help="Checkpoint every stage's output so a failed run can be resumed with --resume (default: PIPELINE_CHECKPOINTS, off)",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip stages whose checkpoint from an earlier run is still valid, e.g. to resume a failed run",
+    )
+    parser.add_argument(
+        "--from-stage",
+        choices=STAGES,
+        default=None,
+        help="Resume, but rerun this stage and every stage downstream of it",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Run every stage under cProfile and write per-stage .prof files and summaries under PROFILE_DIR (stages then run one at a time)",
+    )
+    parser.add_argument(
+        "--profile-memory",
+        action="store_true",
+        help="Trace allocations with tracemalloc and write each stage's top allocating lines under PROFILE_DIR",
+    )
+    parser.add_argument(
+        "--watch",
+        metavar="DIR",
+        default=None,
+        help="Keep running: poll DIR (a directory or glob) and load new raw files incrementally in micro-batches until SIGINT/SIGTERM",
+    )
+    parser.add_argument(
+        "--poll-seconds",
+        type=float,
+        default=None,
+        help="With --watch: seconds between polls of DIR (default: WATCH_POLL_SECONDS, 5)",
+    )
+    parser.add_argument(
+        "--max-latency",
+        type=float,
+        default=None,
+        help="With --watch: load waiting files once the oldest has waited this many seconds (default: WATCH_MAX_LATENCY_SECONDS, 60)",
+    )
+    parser.add_argument(
+        "--max-batch-files",
+        type=int,
+        default=None,
+        help="With --watch: load as soon as this many files are waiting, and at most this many per batch (default: WATCH_MAX_BATCH_FILES, 100)",
+    )
+    parser.add_argument(
+        "--max-batch-bytes",
+        type=int,
+        default=None,
+        help="With --watch: load as soon as this many bytes are waiting, and at most this many per batch (default: WATCH_MAX_BATCH_BYTES, 256 MiB)",
+    )
+    args = parser.parse_args()
+    if args.watch and (args.dry_run or args.resume or args.from_stage or args.source):
+        parser.error("--watch cannot be combined with --dry-run, --resume, --from-stage or --source")
+    return args
 
 
 def main():
     args = parse_args()
-    logger.info("Starting pipeline (dry_run=%s)", args.dry_run)
-    run_pipeline(dry_run=args.dry_run)
+    if args.watch:
+        watch(
+            args.watch,
+            poll_seconds=args.poll_seconds,
+            max_latency=args.max_latency,
+            max_files=args.max_batch_files,
+            max_bytes=args.max_batch_bytes,
+            chunk_size=args.chunk_size,
+            processed_format=args.processed_format,
+            workers=args.workers,
+            load_mode=args.load_mode,
+            bulk_load=args.bulk_load,
+            generate_reports=args.generate_reports,
+            analytics_backend=args.analytics_backend,
+            profile=args.profile,
+            profile_memory=args.profile_memory,
+            checkpoints=True if args.checkpoint else None,
+        )
+        return
+    logger.info(
+        "Starting pipeline (dry_run=%s, chunk_size=%s, incremental=%s, workers=%d)",
+        args.dry_run,
+        args.chunk_size,
+        args.incremental,
+        args.workers,
+    )
+    run_pipeline(
+        dry_run=args.dry_run,
+        chunk_size=args.chunk_size,
+        processed_format=args.processed_format,
+        source=args.source,
+        incremental=args.incremental,
+        workers=args.workers,
+        load_mode=args.load_mode,
+        bulk_load=args.bulk_load,
+        generate_reports=args.generate_reports,
+        analytics_backend=args.analytics_backend,
+        resume=args.resume,
+        from_stage=args.from_stage,
+        checkpoints=True if args.checkpoint else None,
+        profile=args.profile,
+        profile_memory=args.profile_memory,
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,313 @@
+import functools
+import hashlib
+import inspect
+import json
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable
+
+import pandas as pd
+
+from src.config import CHECKPOINT_DIR
+from src.ingestion.manifest import file_sha256
+from src.orchestration.telemetry import measured
+from src.utils.logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+DIGESTS_FILE = "file_digests.json"
+
+
+@dataclass(frozen=True)
+class Stage:
+    """
+    One node of a pipeline DAG.
+
+    run(*values) gets the outputs of the nodes named in inputs, in order,
+    and returns the stage's output (stages run for their side effects
+    return a small record of what they did). Nodes in after must finish
+    first but their outputs are not passed in. kind groups the nodes of
+    one pipeline stage (e.g. the two dimension loads are both "dims").
+
+    The stage's checkpoint key hashes its name, params, the keys of its
+    inputs and after nodes, and its code version: the source of the
+    functions and modules in code (default: run). With checkpoint=False
+    the stage always runs and is never saved. is_valid(value), if given,
+    can reject a stored output whose effects are gone (e.g. a load into a
+    warehouse that was since recreated).
+    """
+
+    name: str
+    run: Callable[..., Any]
+    inputs: tuple[str, ...] = ()
+    after: tuple[str, ...] = ()
+    params: dict = field(default_factory=dict)
+    kind: str | None = None
+    code: tuple = ()
+    checkpoint: bool = True
+    is_valid: Callable[[Any], bool] | None = None
+
+    @property
+    def stage_kind(self) -> str:
+        return self.kind or self.name
+
+    @property
+    def dependencies(self) -> tuple[str, ...]:
+        return self.inputs + self.after
+
+
+_CODE_VERSIONS: dict = {}
+
+
+def code_version(stage: Stage) -> str:
+    """
+    Return a hash of the source of the functions and modules in stage.code
+    (default: stage.run).
+    """
+    parts = stage.code or (stage.run,)
+    cache_key = tuple(id(part) for part in parts)
+    if cache_key not in _CODE_VERSIONS:
+        digest = hashlib.sha256()
+        for part in parts:
+            try:
+                digest.update(inspect.getsource(part).encode("utf-8"))
+            except (OSError, TypeError):
+                # No source to go by (e.g. a partial): fall back to the name
+                digest.update(getattr(part, "__qualname__", type(part).__name__).encode("utf-8"))
+        _CODE_VERSIONS[cache_key] = digest.hexdigest()
+    return _CODE_VERSIONS[cache_key]
+
+
+def stage_key(stage: Stage, input_keys: list[str]) -> str:
+    """
+    Return the checkpoint key of stage given the keys of its dependencies.
+    """
+    payload = json.dumps(
+        {
+            "name": stage.name,
+            "params": stage.params,
+            "inputs": input_keys,
+            "code": code_version(stage),
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class CheckpointStore:
+    """
+    Stage outputs pickled under directory/<stage kind>/<key>.pkl.
+
+    Keys already hash everything an output depends on, so a stored output
+    is reused for as long as its key comes up again. prune() drops the
+    outputs of a kind that the last run did not use.
+    """
+
+    def __init__(self, directory=None):
+        self.directory = Path(directory or CHECKPOINT_DIR)
+        self.used: dict[str, set] = {}
+        self._digests = self._load_digests()
+
+    def _path(self, name: str, key: str) -> Path:
+        return self.directory / name / f"{key}.pkl"
+
+    def exists(self, name: str, key: str) -> bool:
+        return self._path(name, key).exists()
+
+    def load(self, name: str, key: str):
+        self.used.setdefault(name, set()).add(key)
+        return pd.read_pickle(self._path(name, key))
+
+    def save(self, name: str, key: str, value) -> None:
+        path = self._path(name, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        pd.to_pickle(value, tmp_path)
+        os.replace(tmp_path, path)
+        self.used.setdefault(name, set()).add(key)
+
+    def prune(self) -> int:
+        """
+        Delete the stored outputs of every kind used in this process that
+        were not loaded or saved by it. Returns the number of files deleted.
+        """
+        removed = 0
+        for name, keys in self.used.items():
+            for path in (self.directory / name).glob("*.pkl"):
+                if path.stem not in keys:
+                    path.unlink(missing_ok=True)
+                    removed += 1
+        return removed
+
+    def _load_digests(self) -> dict:
+        path = self.directory / DIGESTS_FILE
+        if not path.exists():
+            return {}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def file_digest(self, path: Path) -> str:
+        """
+        Return the SHA-256 of a file's content, recomputed only when its
+        size or modification time changed since the last call.
+        """
+        stat = path.stat()
+        key = str(path.resolve())
+        entry = self._digests.get(key)
+        if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+            return entry["sha256"]
+        digest = file_sha256(path)
+        self._digests[key] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": digest}
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.directory / f"{DIGESTS_FILE}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._digests, f, indent=2)
+        os.replace(tmp_path, self.directory / DIGESTS_FILE)
+        return digest
+
+
+class StageResult:
+    """
+    The key and output of a DAG node; outputs reused from a checkpoint
+    are only read from disk when first needed.
+    """
+
+    def __init__(self, key: str, value=None, loader=None, skipped=False, seconds=0.0):
+        self.key = key
+        self._value = value
+        self._loader = loader
+        self.skipped = skipped
+        self.seconds = seconds
+
+    @property
+    def value(self):
+        if self._loader is not None:
+            self._value = self._loader()
+            self._loader = None
+        return self._value
+
+
+class StageRunner:
+    """
+    Run DAGs of Stages, reusing checkpointed outputs where allowed.
+
+    Without resume every stage runs (and its output is saved). With resume
+    a stage whose checkpoint exists (and passes is_valid) is skipped,
+    unless its kind is in rerun. Stages whose inputs are complete run
+    concurrently on up to workers threads.
+
+    timings gets one record per stage with its name, kind, whether it was
+    skipped and, for stages that ran, the metrics of telemetry.measured.
+
+    With a profiler (see src.utils.profiling) every stage that runs is
+    profiled, its DataFrame sizes are measured deeply, and stages run one
+    at a time so each profile is its own.
+    """
+
+    def __init__(self, store=None, resume=False, rerun=frozenset(), workers=1, profiler=None):
+        self.store = store
+        self.resume = resume
+        self.rerun = frozenset(rerun)
+        self.workers = 1 if profiler is not None else max(1, workers)
+        self.profiler = profiler
+        self.timings: list[dict] = []
+
+    def _reusable(self, stage: Stage, key: str) -> bool:
+        if not (self.resume and self.store is not None and stage.checkpoint):
+            return False
+        kind = stage.stage_kind
+        if kind in self.rerun or not self.store.exists(kind, key):
+            return False
+        if stage.is_valid is not None and not stage.is_valid(self.store.load(kind, key)):
+            logger.info("Checkpoint of stage %s is no longer valid; rerunning it.", stage.name)
+            return False
+        return True
+
+    def run(self, stages: list[Stage], known: dict | None = None) -> dict[str, StageResult]:
+        """
+        Run stages (in any order) and return {name: StageResult}, including
+        known, the results of nodes outside stages that they take as inputs.
+        """
+        results = dict(known or {})
+        pending = {stage.name: stage for stage in stages}
+
+        # Keys only depend on input keys, so they are all known up front
+        keys = {}
+        while len(keys) < len(pending):
+            progressed = False
+            for stage in pending.values():
+                if stage.name in keys:
+                    continue
+                input_keys = [
+                    results[name].key if name in results else keys.get(name)
+                    for name in stage.dependencies
+                ]
+                if None not in input_keys:
+                    keys[stage.name] = stage_key(stage, input_keys)
+                    progressed = True
+            if not progressed:
+                missing = sorted(set(pending) - set(keys))
+                raise ValueError(f"Stages with missing or cyclic inputs: {', '.join(missing)}")
+
+        for name in list(pending):
+            stage = pending[name]
+            if self._reusable(stage, keys[name]):
+                results[name] = StageResult(
+                    keys[name],
+                    loader=lambda kind=stage.stage_kind, key=keys[name]: self.store.load(kind, key),
+                    skipped=True,
+                )
+                self.timings.append({"stage": name, "kind": stage.stage_kind, "skipped": True})
+                logger.info("Stage %s: reusing checkpoint %s", name, keys[name][:12])
+                del pending[name]
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="stage") as pool:
+            running = {}
+            error = None
+            while pending or running:
+                if error is None:
+                    for name in list(pending):
+                        stage = pending[name]
+                        if all(dep in results for dep in stage.dependencies):
+                            del pending[name]
+                            running[pool.submit(self._run_stage, stage, keys[name], results)] = name
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        results[name] = future.result()
+                    except Exception as exc:
+                        error = error or exc
+                        logger.error("Stage %s failed: %s", name, exc)
+            if error is not None:
+                raise error
+        return results
+
+    def _run_stage(self, stage: Stage, key: str, results: dict) -> StageResult:
+        run = stage.run
+        if self.profiler is not None:
+            run = functools.partial(self.profiler.call, stage.name, stage.run)
+        value, metrics = measured(
+            run,
+            *(results[name].value for name in stage.inputs),
+            deep=self.profiler is not None,
+        )
+        if stage.checkpoint and self.store is not None:
+            self.store.save(stage.stage_kind, key, value)
+        self.timings.append({"stage": stage.name, "kind": stage.stage_kind, "skipped": False, **metrics})
+        logger.info(
+            "Stage %s finished in %.3fs (cpu %.3fs, %d rows)",
+            stage.name,
+            metrics["seconds"],
+            metrics["cpu_seconds"],
+            metrics["rows"],
+        )
+        return StageResult(key, value, seconds=metrics["seconds"])
@@ -1,24 +1,87 @@
+import copy
+import functools
+import hashlib
 import json
+import uuid
+from contextlib import nullcontext
+from dataclasses import dataclass, field
 from datetime import datetime
+from pathlib import Path
+from typing import Iterator
 
-from sqlalchemy import text
+import pandas as pd
+from sqlalchemy import Connection, Engine, text
 
-from src.ingestion.ingest_orders import load_raw_orders
-from src.transformations.transform_orders import transform_orders
-from src.transformations.data_quality import validate_orders
-from src.warehouse.load_to_db import create_schema, load_fact_orders, load_dimensions
+from src.analytics.frame_reports import FrameReports, write_frame_reports
+from src.analytics.reports import generate_all_reports
+from src.ingestion.ingest_orders import iter_raw_files, load_raw_files
+from src.ingestion.manifest import IngestManifest, discover_raw_files
+from src.transformations.transform_orders import (
+    SeenOrderIds,
+    drop_seen_order_ids,
+    transform_orders,
+)
+from src.transformations.data_quality import (
+    OrdersProfile,
+    append_profile_history,
+    check_drift,
+    check_error_rate,
+    evaluate_rules,
+    load_profile_history,
+    merge_reports,
+)
+from src.warehouse.load_to_db import (
+    DIMENSIONS,
+    create_schema,
+    sqlite_bulk_load,
+    load_fact_orders,
+    load_dimensions,
+)
 from src.warehouse.db import get_engine
-from src.config import PROCESSED_DATA_PATH, LOGS_DIR
+from src.warehouse.migrations import optimize
+from src.warehouse.staging import prepare_staging, swap_staging
+from src.warehouse.versions import DATABASE_ID_KEY, data_version
+from src.orchestration.dag import CheckpointStore, Stage, StageRunner
+from src.orchestration.parallel import iter_transformed_files
+from src.orchestration.telemetry import append_run_history, measured, summarize_stages
+import src.ingestion.ingest_orders as ingest_module
+import src.orchestration.parallel as parallel_module
+import src.transformations.data_quality as data_quality_module
+import src.transformations.transform_orders as transform_module
+import src.utils.io_utils as io_utils_module
+import src.warehouse.load_to_db as load_module
+from src.config import (
+    RAW_DATA_PATH,
+    PROCESSED_DATA_PATH,
+    PROCESSED_PARQUET_PATH,
+    PROCESSED_DATA_FORMAT,
+    QUARANTINE_PATH,
+    PROFILE_HISTORY_PATH,
+    LOAD_MODE,
+    FACT_PARTITIONING,
+    SQLITE_BULK_LOAD,
+    LOGS_DIR,
+    ANALYTICS_BACKEND,
+    DQ_MAX_ERROR_RATE,
+    PIPELINE_CHECKPOINTS,
+    PIPELINE_STAGE_WORKERS,
+    INCREMENTAL_SKIP_OLD_ORDERS,
+)
+from src.utils.io_utils import write_processed
+from src.utils.profiling import StageProfiler
 from src.utils.logging_utils import get_logger
 
 logger = get_logger(__name__)
 
+# Run history next to the run summary, one JSON object per run
+RUN_HISTORY_FILE = "run_history.jsonl"
 
-def get_table_row_counts():
+
+def get_table_row_counts(engine=None):
     """
     Return and log row counts for key tables in the warehouse.
     """
-    engine = get_engine()
+    engine = engine or get_engine()
     tables = ["dim_customers", "dim_products", "fact_orders"]
     counts = {}
 
@@ -45,9 +108,16 @@ def write_run_summary(
     table_counts: dict | None,
     status: str,
     error_message: str | None = None,
+    **details,
 ) -> None:
     """
-    Write a JSON summary of the last pipeline run.
+    Write a JSON summary of the last pipeline run and append its stage
+    metrics to the run history.
+
+    Extra keyword arguments (chunking, files, quality counts, ...) are
+    added to the summary as-is. The per-stage records in details["stages"]
+    are also totalled per stage kind under stage_totals, which is what the
+    run history (LOGS_DIR / RUN_HISTORY_FILE) keeps of them.
     """
     LOGS_DIR.mkdir(parents=True, exist_ok=True)
     summary_path = LOGS_DIR / "run_summary.json"
@@ -59,16 +129,632 @@ def write_run_summary(
         "error_message": error_message,
         "raw_rows": raw_rows,
         "clean_rows": clean_rows,
+        "wall_seconds": (datetime.utcnow() - started_at).total_seconds(),
+        **details,
+        "stage_totals": summarize_stages(details.get("stages", [])),
         "table_counts": table_counts or {},
     }
 
     with open(summary_path, "w", encoding="utf-8") as f:
-        json.dump(summary, f, indent=2)
+        json.dump(summary, f, indent=2, default=str)
+
+    append_run_history(LOGS_DIR / RUN_HISTORY_FILE, {
+        key: summary.get(key)
+        for key in (
+            "started_at_utc",
+            "dry_run",
+            "status",
+            "raw_rows",
+            "clean_rows",
+            "wall_seconds",
+            "chunk_size",
+            "workers",
+            "load_mode",
+            "stage_totals",
+        )
+    })
 
     logger.info("Wrote run summary to %s", summary_path)
 
 
-def run_pipeline(dry_run: bool = False):
+def update_run_summary(**details) -> None:
+    """
+    Add or replace top-level keys in the summary of the last pipeline run,
+    e.g. report statistics from a later analytics run.
+    """
+    summary_path = LOGS_DIR / "run_summary.json"
+    summary = {}
+    if summary_path.exists():
+        with open(summary_path, "r", encoding="utf-8") as f:
+            summary = json.load(f)
+    summary.update(details)
+
+    LOGS_DIR.mkdir(parents=True, exist_ok=True)
+    with open(summary_path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2, default=str)
+
+    logger.info("Updated run summary %s with %s", summary_path, ", ".join(details))
+
+
+@dataclass
+class RunState:
+    """
+    Counters and cross-chunk bookkeeping for a single pipeline run.
+    """
+
+    chunk_size: int | None = None
+    incremental: bool = False
+    files: list = field(default_factory=list)
+    raw_rows: int = 0
+    clean_rows: int = 0
+    loaded_rows: int = 0
+    chunks: int = 0
+    quality_report: dict = field(default_factory=dict)
+    quarantined_rows: int = 0
+    seen_order_ids: SeenOrderIds | None = None
+    max_order_id: int | None = None
+    max_order_date: pd.Timestamp | None = None
+    workers: int = 1
+    worker_timings: list = field(default_factory=list)
+    profile: OrdersProfile = field(default_factory=OrdersProfile)
+    drift_violations: list = field(default_factory=list)
+    load_mode: str = LOAD_MODE
+    load_conn: Connection | None = None
+    engine: Engine | None = None
+    started_at: datetime | None = None
+    frame_reports: FrameReports | None = None
+    source: dict = field(default_factory=dict)
+    warehouse: str | None = None
+    checkpoint_loads: bool = True
+    stages: list = field(default_factory=list)
+    profiler: StageProfiler | None = None
+    # Names this run's files in the Parquet processed layer; starts with the
+    # time so file names sort in run order
+    run_id: str = field(
+        default_factory=lambda: f"{datetime.utcnow():%Y%m%d%H%M%S%f}{uuid.uuid4().hex[:8]}"
+    )
+
+    def summary_details(self) -> dict:
+        """
+        Return the run-summary fields derived from this state.
+        """
+        return {
+            "chunk_size": self.chunk_size,
+            "chunks": self.chunks,
+            "incremental": self.incremental,
+            "workers": self.workers,
+            "load_mode": self.load_mode,
+            "loaded_rows": self.loaded_rows,
+            "files": [str(path) for path in self.files],
+            "quarantined_rows": self.quarantined_rows,
+            "data_quality": self.quality_report,
+            "worker_timings": self.worker_timings,
+            "profile": self.profile.summary(),
+            "drift_violations": self.drift_violations,
+            "stages": self.stages,
+            "profile_dir": str(self.profiler.directory) if self.profiler else None,
+        }
+
+
+def _iter_raw_batches(
+    paths: list, chunk_size: int | None, manifest: IngestManifest | None = None
+) -> Iterator[pd.DataFrame]:
+    """
+    Yield the raw input as one DataFrame, or as bounded chunks when chunk_size is set.
+
+    With a manifest, rows at or below its high-water mark are dropped
+    (see skip_old_orders of run_pipeline).
+    """
+    if chunk_size:
+        batches = iter_raw_files(paths, chunk_size)
+    else:
+        batches = iter([load_raw_files(paths)])
+
+    for df_raw in batches:
+        if manifest is not None:
+            df_raw = manifest.filter_new_rows(df_raw)
+        yield df_raw
+
+
+def processed_output_path(fmt: str):
+    """
+    Return where the processed layer is written for the given format.
+    """
+    return PROCESSED_PARQUET_PATH if fmt == "parquet" else PROCESSED_DATA_PATH
+
+
+# Stage kinds of a run and the kinds whose outputs they use
+STAGE_DEPENDENCIES = {
+    "ingest": (),
+    "transform": ("ingest",),
+    "validate": ("transform",),
+    "save": ("validate",),
+    "schema": (),
+    "dims": ("schema", "validate"),
+    "facts": ("dims", "validate"),
+    "reports": ("facts",),
+}
+STAGES = list(STAGE_DEPENDENCIES)
+
+
+def downstream_stages(stage: str) -> set:
+    """
+    Return stage and every stage kind that depends on it, directly or not.
+    """
+    if stage not in STAGE_DEPENDENCIES:
+        raise ValueError(f"Unknown stage {stage!r}; expected one of {', '.join(STAGES)}")
+    selected = {stage}
+    while True:
+        added = {
+            kind
+            for kind, dependencies in STAGE_DEPENDENCIES.items()
+            if kind not in selected and selected.intersection(dependencies)
+        }
+        if not added:
+            return selected
+        selected |= added
+
+
+class _RawBatches:
+    """
+    The raw batches of a run, read on demand: get(i) returns batch i, or
+    None past the last one, reading on from where the last call stopped.
+    """
+
+    def __init__(self, paths: list, chunk_size: int | None, manifest: IngestManifest | None):
+        self.paths = paths
+        self.chunk_size = chunk_size
+        self.manifest = manifest
+        self._batches = None
+        self._position = 0
+
+    def _open(self, index: int):
+        return _iter_raw_batches(self.paths, self.chunk_size, self.manifest), 0
+
+    def get(self, index: int):
+        if self._batches is None or index < self._position:
+            self.close()
+            self._batches, self._position = self._open(index)
+        while self._position < index:
+            next(self._batches, None)
+            self._position += 1
+        self._position += 1
+        return next(self._batches, None)
+
+    def close(self) -> None:
+        if self._batches is not None:
+            self._batches.close()
+            self._batches = None
+
+
+class _WorkerBatches(_RawBatches):
+    """
+    Batches ingested and transformed by worker processes, one per file:
+    get(i) returns (df_clean, timing, profile) of file i. The pool starts
+    at the first file asked for, so files before it are not read at all.
+    """
+
+    def __init__(self, paths: list, workers: int, manifest: IngestManifest | None):
+        super().__init__(paths, None, manifest)
+        self.workers = workers
+
+    def _open(self, index: int):
+        return iter_transformed_files(self.paths[index:], self.workers, self.manifest), index
+
+
+def _ingest_stage(batches: _RawBatches, index: int):
+    """
+    Step 1 for one batch: the raw rows (or a worker's clean rows) of batch index.
+    """
+    return batches.get(index)
+
+
+def _transform_stage(state: RunState, batch) -> dict:
+    """
+    Step 2 for one batch: drop order_ids seen in earlier batches and
+    transform the rest.
+
+    Workers already transformed their file and only deduplicated within
+    it, so only the cross-file deduplication runs here for them.
+    """
+    timing = None
+    if state.workers > 1:
+        df_clean, timing, profile = batch
+        raw_rows = timing["raw_rows"]
+        logger.info(
+            "Worker %s transformed %s: %d raw -> %d clean rows (read %.3fs, transform %.3fs).",
+            timing["pid"],
+            timing["file"],
+            timing["raw_rows"],
+            timing["clean_rows"],
+            timing["read_seconds"],
+            timing["transform_seconds"],
+        )
+    else:
+        df_clean = batch
+        raw_rows = len(batch)
+        logger.info("Loaded %d raw rows (batch %d).", raw_rows, state.chunks + 1)
+        logger.info("Step 2: Transforming orders...")
+
+    # This batch's order_ids are collected separately from the run's, so
+    # the checkpoint holds only what the batch adds
+    order_ids = None
+    if state.seen_order_ids is not None:
+        df_clean = drop_seen_order_ids(df_clean, state.seen_order_ids)
+        order_ids = SeenOrderIds()
+    if state.workers > 1:
+        if order_ids is not None:
+            order_ids.update(df_clean["order_id"])
+    else:
+        df_clean = transform_orders(df_clean, seen_order_ids=order_ids)
+        profile = OrdersProfile()
+        profile.update(df_clean)
+        logger.info("Transformed to %d clean rows.", len(df_clean))
+
+    return {
+        "df": df_clean,
+        "order_ids": order_ids,
+        "raw_rows": raw_rows,
+        "profile": profile,
+        "timing": timing,
+    }
+
+
+def _validate_stage(state: RunState, transformed: dict) -> dict:
+    """
+    Step 3 for one batch: split the clean rows into valid and quarantined rows.
+    """
+    logger.info("Step 3: Running data quality checks...")
+    df_clean, df_quarantine, report = evaluate_rules(transformed["df"])
+    # The threshold applies to the run so far, so streaming runs fail as soon as it is crossed
+    check_error_rate(merge_reports(copy.deepcopy(state.quality_report), report))
+    logger.info("Data quality checks passed.")
+    return {"df": df_clean, "quarantine": df_quarantine, "report": report}
+
+
+def _save_stage(state: RunState, index: int, processed_format: str, validated: dict) -> dict:
+    """
+    Step 4 for one batch: write its rows to the processed layer and its
+    rejected rows to the quarantine file.
+
+    The first batch of a full run replaces the processed file; later
+    batches, and every batch of an incremental run, are appended to it.
+    """
+    if index == 0:
+        # The quarantine file only ever holds the rows rejected by this run
+        QUARANTINE_PATH.unlink(missing_ok=True)
+    df_quarantine = validated["quarantine"]
+    if not df_quarantine.empty:
+        write_processed(df_quarantine, QUARANTINE_PATH, "csv", append=True)
+        logger.info("Quarantined %d rows to %s", len(df_quarantine), QUARANTINE_PATH)
+
+    logger.info("Step 4: Saving processed %s...", processed_format)
+    processed_path = processed_output_path(processed_format)
+    write_processed(
+        validated["df"],
+        processed_path,
+        processed_format,
+        append=index > 0 or state.incremental,
+        part=index + 1,
+        run_id=state.run_id,
+    )
+    logger.info("Saved processed data to %s", processed_path)
+    return {"path": str(processed_path), "rows": len(validated["df"])}
+
+
+def _schema_stage(state: RunState):
+    """
+    Step 5: create the warehouse schema and apply pending migrations.
+    """
+    logger.info("Step 5: Creating schema...")
+    create_schema(conn=state.load_conn, engine=state.engine)
+    logger.info("Schema created (if not already present).")
+
+
+def _warehouse_version(state: RunState) -> dict | None:
+    if state.load_conn is not None:
+        return data_version(state.load_conn)
+    with state.engine.connect() as conn:
+        return data_version(conn)
+
+
+def _warehouse_unchanged(state: RunState, recorded: dict | None) -> bool:
+    """
+    Return whether the warehouse still holds a load recorded with the
+    table versions it left behind: a warehouse that was since recreated
+    has another database id.
+    """
+    current = _warehouse_version(state)
+    if not recorded:
+        return True
+    if current is None or current.get(DATABASE_ID_KEY) != recorded.get(DATABASE_ID_KEY):
+        return False
+    return all(
+        current.get(table, 0) >= version
+        for table, version in recorded.items()
+        if table != DATABASE_ID_KEY
+    )
+
+
+def _dimension_stage(state: RunState, index: int, table: str, validated: dict) -> dict | None:
+    """
+    Step 6 for one batch and dimension table.
+    """
+    logger.info("Step 6: Loading %s...", table)
+    load_dimensions(
+        validated["df"],
+        if_exists="replace" if index == 0 and not state.incremental else "append",
+        mode=state.load_mode,
+        conn=state.load_conn,
+        engine=state.engine,
+        as_of=state.started_at,
+        tables=[table],
+    )
+    logger.info("Loaded %s.", table)
+    return _warehouse_version(state)
+
+
+def _fact_stage(state: RunState, index: int, validated: dict) -> dict | None:
+    """
+    Step 7 for one batch.
+    """
+    logger.info("Step 7: Loading fact_orders table...")
+    load_fact_orders(
+        validated["df"],
+        if_exists="replace" if index == 0 and not state.incremental else "append",
+        mode=state.load_mode,
+        conn=state.load_conn,
+        engine=state.engine,
+    )
+    logger.info("Loaded fact_orders.")
+    return _warehouse_version(state)
+
+
+def _optimize_warehouse(engine: Engine) -> None:
+    with engine.begin() as conn:
+        optimize(conn)
+
+
+def _timed_step(state: RunState, name: str, func, *args):
+    """
+    Run a run-level step outside the stage DAG and record its metrics
+    with the stages'.
+    """
+    if state.profiler is not None:
+        func = functools.partial(state.profiler.call, name, func)
+    result, metrics = measured(func, *args, deep=state.profiler is not None)
+    state.stages.append({"stage": name, "kind": name, "skipped": False, **metrics})
+    return result
+
+
+def _reports_stage(state: RunState) -> dict:
+    """
+    Write the standard reports, from memory or from the warehouse.
+    """
+    if state.frame_reports is not None:
+        logger.info("Writing reports computed in memory...")
+        return write_frame_reports(state.frame_reports)
+    logger.info("Generating reports from the warehouse...")
+    return generate_all_reports(engine=state.engine)
+
+
+def _stage_name(kind: str, index: int) -> str:
+    return f"{kind}_{index:05d}"
+
+
+def _batch_stages(
+    state: RunState,
+    batches: _RawBatches,
+    index: int,
+    dry_run: bool,
+    processed_format: str,
+) -> list[Stage]:
+    """
+    Return the DAG of one batch. Stages that carry state from batch to
+    batch (deduplication, appends, dimension history) come after the same
+    stage of the previous batch, so their keys change with everything
+    before them.
+    """
+    name = functools.partial(_stage_name, index=index)
+    previous = (lambda kind: (_stage_name(kind, index - 1),)) if index else (lambda kind: ())
+
+    stages = [
+        Stage(
+            name("ingest"),
+            functools.partial(_ingest_stage, batches, index),
+            params={**state.source, "index": index},
+            kind="ingest",
+            code=(_ingest_stage, ingest_module, parallel_module),
+        ),
+        Stage(
+            name("transform"),
+            functools.partial(_transform_stage, state),
+            inputs=(name("ingest"),),
+            after=previous("transform"),
+            params={"deduplicate": state.seen_order_ids is not None},
+            kind="transform",
+            code=(_transform_stage, transform_module),
+        ),
+        Stage(
+            name("validate"),
+            functools.partial(_validate_stage, state),
+            inputs=(name("transform"),),
+            after=previous("validate"),
+            params={"max_error_rate": DQ_MAX_ERROR_RATE},
+            kind="validate",
+            code=(_validate_stage, data_quality_module),
+        ),
+    ]
+    if dry_run:
+        return stages
+
+    is_loaded = functools.partial(_warehouse_unchanged, state)
+    load_params = {"warehouse": state.warehouse, "mode": state.load_mode, "incremental": state.incremental}
+    stages.append(
+        Stage(
+            name("save"),
+            functools.partial(_save_stage, state, index, processed_format),
+            inputs=(name("validate"),),
+            after=previous("save"),
+            params={"format": processed_format, "incremental": state.incremental},
+            kind="save",
+            code=(_save_stage, io_utils_module),
+            is_valid=lambda saved: Path(saved["path"]).exists(),
+        )
+    )
+    for table in DIMENSIONS:
+        stages.append(
+            Stage(
+                name(table),
+                functools.partial(_dimension_stage, state, index, table),
+                inputs=(name("validate"),),
+                after=previous(table) or ("schema",),
+                params=load_params,
+                kind="dims",
+                code=(_dimension_stage, load_module),
+                checkpoint=state.checkpoint_loads,
+                is_valid=is_loaded,
+            )
+        )
+    stages.append(
+        Stage(
+            name("facts"),
+            functools.partial(_fact_stage, state, index),
+            inputs=(name("validate"),),
+            after=tuple(name(table) for table in DIMENSIONS) + previous("facts"),
+            params=load_params,
+            kind="facts",
+            code=(_fact_stage, load_module),
+            checkpoint=state.checkpoint_loads,
+            is_valid=is_loaded,
+        )
+    )
+    return stages
+
+
+def _record_batch(state: RunState, results: dict, index: int, dry_run: bool) -> None:
+    """
+    Add one batch's stage outputs, run or reused, to the run's counters.
+    """
+    transformed = results[_stage_name("transform", index)].value
+    validated = results[_stage_name("validate", index)].value
+    df_clean = validated["df"]
+
+    state.chunks += 1
+    state.raw_rows += transformed["raw_rows"]
+    state.clean_rows += len(transformed["df"])
+    state.profile.merge(transformed["profile"])
+    if transformed["timing"] is not None:
+        state.worker_timings.append(transformed["timing"])
+    if state.seen_order_ids is not None:
+        state.seen_order_ids.update(transformed["order_ids"])
+
+    merge_reports(state.quality_report, validated["report"])
+    state.quarantined_rows += len(validated["quarantine"])
+
+    if not df_clean.empty:
+        batch_max_id = int(df_clean["order_id"].max())
+        batch_max_date = df_clean["order_date"].max()
+        if state.max_order_id is None or batch_max_id > state.max_order_id:
+            state.max_order_id = batch_max_id
+        if state.max_order_date is None or batch_max_date > state.max_order_date:
+            state.max_order_date = batch_max_date
+
+    if state.frame_reports is not None:
+        state.frame_reports.update(df_clean)
+    if not dry_run:
+        state.loaded_rows += len(df_clean)
+
+
+def _run_batches(
+    paths: list,
+    manifest: IngestManifest | None,
+    state: RunState,
+    dry_run: bool,
+    processed_format: str,
+    runner: StageRunner,
+) -> None:
+    """
+    Feed every batch of the run through steps 1-7, one batch DAG at a time.
+
+    The number of batches of a chunked run is only known once the input
+    was read to the end; it is checkpointed too, so a resumed run need not
+    read the input again to find it.
+    """
+    if state.workers > 1:
+        logger.info(
+            "Steps 1-2: Loading and transforming %d file(s) with %d workers...",
+            len(paths),
+            state.workers,
+        )
+        batches = _WorkerBatches(paths, state.workers, manifest)
+        count = len(paths)
+    elif state.chunk_size:
+        logger.info(
+            "Step 1: Streaming raw orders from %d file(s) in chunks of %d rows...",
+            len(paths),
+            state.chunk_size,
+        )
+        batches = _RawBatches(paths, state.chunk_size, manifest)
+        count = None
+    else:
+        logger.info("Step 1: Loading raw orders from %d file(s)...", len(paths))
+        batches = _RawBatches(paths, None, manifest)
+        count = 1
+
+    store = runner.store
+    count_key = hashlib.sha256(json.dumps(state.source, sort_keys=True, default=str).encode()).hexdigest()
+    if count is None and store is not None and store.exists("batches", count_key):
+        count = store.load("batches", count_key)
+
+    known = {}
+    if not dry_run:
+        known = runner.run(
+            [Stage("schema", functools.partial(_schema_stage, state), code=(_schema_stage, load_module), checkpoint=False)]
+        )
+    run_level = dict(known)
+
+    index = 0
+    try:
+        while count is None or index < count:
+            stages = _batch_stages(state, batches, index, dry_run, processed_format)
+            if count is None:
+                known.update(runner.run(stages[:1], known))
+                if known[stages[0].name].value is None:
+                    count = index
+                    if store is not None:
+                        store.save("batches", count_key, count)
+                    break
+                stages = stages[1:]
+            results = runner.run(stages, known)
+            _record_batch(state, results, index, dry_run)
+            # The next batch only needs this batch's results
+            suffix = _stage_name("", index)
+            known = {**run_level, **{name: result for name, result in results.items() if name.endswith(suffix)}}
+            index += 1
+    finally:
+        batches.close()
+
+
+def run_pipeline(
+    dry_run: bool = False,
+    chunk_size: int | None = None,
+    processed_format: str | None = None,
+    source=None,
+    incremental: bool = False,
+    workers: int = 1,
+    load_mode: str | None = None,
+    bulk_load: bool | None = None,
+    engine=None,
+    generate_reports: bool = False,
+    analytics_backend: str | None = None,
+    resume: bool = False,
+    from_stage: str | None = None,
+    checkpoints: bool | None = None,
+    profile: bool = False,
+    profile_memory: bool = False,
+    skip_old_orders: bool | None = None,
+):
     """
     Run the whole pipeline:
     1. Ingest raw data
@@ -78,26 +764,185 @@ def run_pipeline(dry_run: bool = False):
     5. (optional) Create schema
     6. (optional) Load dimensions
     7. (optional) Load fact table
+
+    With chunk_size set, the raw file is streamed in chunks of at most
+    chunk_size rows and steps 2-7 run once per chunk, so peak memory is
+    bounded by the chunk size rather than the input size. Duplicate
+    order_ids are tracked across chunks; dimension members are compared
+    with the warehouse by hash, so each is written only when it changes.
+
+    processed_format selects "csv" or "parquet" for the processed layer
+    (default: PROCESSED_DATA_FORMAT from config).
+
+    source is a raw file, directory, glob or list of files (default:
+    RAW_DATA_PATH). With incremental=True only files that are new or
+    changed according to the ingest manifest are read, and results are
+    appended to the warehouse instead of replacing it. The manifest is
+    updated only after a successful load, so every file is loaded once;
+    rows of new or changed files are all loaded (upserted by order_id),
+    including late or corrected orders. With skip_old_orders (default:
+    INCREMENTAL_SKIP_OLD_ORDERS from config) rows at or below the order_id
+    high-water mark of earlier runs are dropped instead, with a warning.
+
+    With workers > 1 and several raw files, each file is ingested and
+    transformed in its own worker process; results are merged in file
+    order with global order_id deduplication before validation.
+
+    load_mode selects "upsert" (write only new or changed rows into the
+    declared tables), "replace" (rebuild tables with to_sql) or "swap"
+    (load into *_staging tables, validate them and swap them into place
+    in one transaction at the end, so readers never see a partial load);
+    default LOAD_MODE from config. Incremental swap runs start from a copy
+    of the live tables.
+
+    bulk_load (default: SQLITE_BULK_LOAD from config) runs all upsert loads
+    of the run inside sqlite_bulk_load: relaxed PRAGMAs, secondary indexes
+    dropped and rebuilt, one transaction and ANALYZE at the end.
+
+    engine is the warehouse engine used for every step (default: the
+    shared engine for DB_URL), so connections are pooled across the run.
+
+    With generate_reports=True the standard reports are written at the end
+    of the run. analytics_backend (default: ANALYTICS_BACKEND from config)
+    selects "sql", which queries the warehouse once it is loaded, or
+    "memory", which reduces each validated batch in memory as it passes
+    through. Dry runs have no warehouse to query and always use "memory".
+
+    Each batch runs as a small DAG of stages (see src.orchestration.dag):
+    ingest -> transform -> validate, then save and the two dimension
+    loads in parallel, then the fact load; schema runs before the batches
+    and reports after them. With checkpoints (default: PIPELINE_CHECKPOINTS
+    from config, or on when resuming; never for dry runs) every stage's
+    output is stored keyed by a hash of its inputs and code. resume=True
+    skips the stages whose checkpoint is still valid, so a run that failed in the fact load
+    resumes there without ingesting and transforming again. from_stage
+    (one of STAGES) implies resume but reruns that stage and every stage
+    downstream of it. Loads are not checkpointed with bulk_load or the
+    swap load mode, which commit (or discard) all batches together.
+
+    profile=True runs every stage under cProfile and profile_memory=True
+    under tracemalloc (see src.utils.profiling); stages then run one at a
+    time and write their profiles under PROFILE_DIR.
     """
     started_at = datetime.utcnow()
-    raw_rows = 0
-    clean_rows = 0
+    rerun = downstream_stages(from_stage) if from_stage else set()
+    if checkpoints is None:
+        checkpoints = PIPELINE_CHECKPOINTS or resume or from_stage is not None
+    bulk_load = SQLITE_BULK_LOAD if bulk_load is None else bulk_load
+    processed_format = processed_format or PROCESSED_DATA_FORMAT
+    if workers > 1 and chunk_size:
+        raise ValueError("workers and chunk_size cannot be combined")
+    if (load_mode or LOAD_MODE) == "swap" and FACT_PARTITIONING == "month":
+        raise ValueError("swap load mode does not support month-partitioned facts")
+    analytics_backend = "memory" if dry_run else analytics_backend or ANALYTICS_BACKEND
+    if generate_reports and analytics_backend == "memory" and incremental and not dry_run:
+        # Batches of an incremental run are only the new rows, not the whole warehouse
+        raise ValueError("incremental runs can only generate reports with the sql backend")
+    state = RunState(
+        chunk_size=chunk_size,
+        incremental=incremental,
+        workers=workers,
+        load_mode=load_mode or LOAD_MODE,
+        started_at=started_at,
+    )
+    if not dry_run:
+        state.engine = engine or get_engine()
+    if chunk_size or workers > 1:
+        state.seen_order_ids = SeenOrderIds()
+    if generate_reports and analytics_backend == "memory":
+        state.frame_reports = FrameReports()
+    store = CheckpointStore() if checkpoints and not dry_run else None
     table_counts = None
+    report_details = {}
 
     try:
-        logger.info("Step 1: Loading raw orders...")
-        df_raw = load_raw_orders()
-        raw_rows = len(df_raw)
-        logger.info("Loaded %d raw rows.", raw_rows)
+        paths = discover_raw_files(source or RAW_DATA_PATH)
+        manifest = None
+        if incremental:
+            manifest = IngestManifest.load()
+            paths = manifest.pending_files(paths)
+        skip_old_orders = INCREMENTAL_SKIP_OLD_ORDERS if skip_old_orders is None else skip_old_orders
+        # Only consulted for rows when skipping orders below the high-water mark
+        row_filter = manifest if skip_old_orders else None
+        state.files = paths
 
-        logger.info("Step 2: Transforming orders...")
-        df_clean = transform_orders(df_raw)
-        clean_rows = len(df_clean)
-        logger.info("Transformed to %d clean rows.", clean_rows)
+        if not paths:
+            logger.info("No new or changed raw files; nothing to do.")
+            write_run_summary(
+                started_at=started_at,
+                dry_run=dry_run,
+                raw_rows=0,
+                clean_rows=0,
+                table_counts=None,
+                status="success",
+                **state.summary_details(),
+            )
+            return
+
+        use_bulk_load = bulk_load and not dry_run and state.load_mode == "upsert"
+        if use_bulk_load and state.engine.dialect.name != "sqlite":
+            logger.warning("Bulk load fast path only supports SQLite; using regular loads.")
+            use_bulk_load = False
 
-        logger.info("Step 3: Running data quality checks...")
-        validate_orders(df_clean)
-        logger.info("Data quality checks passed.")
+        use_staging = state.load_mode == "swap" and not dry_run
+        if use_staging:
+            copied_rows = prepare_staging(state.engine, copy_live=incremental)
+
+        state.source = {
+            "files": [[str(path), store.file_digest(path) if store else None] for path in paths],
+            "chunk_size": chunk_size,
+            "workers": workers > 1,
+            "high_water_mark": row_filter.high_water_mark if row_filter else None,
+        }
+        if state.engine is not None:
+            state.warehouse = state.engine.url.render_as_string(hide_password=True)
+        state.checkpoint_loads = not (use_bulk_load or use_staging)
+        if profile or profile_memory:
+            state.profiler = StageProfiler(label="pipeline", cpu=profile, memory=profile_memory)
+        runner = StageRunner(
+            store,
+            resume=resume or from_stage is not None,
+            rerun=rerun,
+            # The bulk load shares one connection between all loads
+            workers=1 if use_bulk_load else PIPELINE_STAGE_WORKERS,
+            profiler=state.profiler,
+        )
+        state.stages = runner.timings
+
+        with sqlite_bulk_load(state.engine) if use_bulk_load else nullcontext() as load_conn:
+            state.load_conn = load_conn
+            _run_batches(paths, row_filter, state, dry_run, processed_format, runner)
+        state.load_conn = None
+
+        if use_staging:
+            logger.info("Validating staging tables and swapping them into place...")
+            _timed_step(
+                state,
+                "swap",
+                functools.partial(
+                    swap_staging,
+                    state.engine,
+                    min_fact_rows=copied_rows if incremental else state.loaded_rows,
+                    max_fact_rows=copied_rows + state.loaded_rows,
+                ),
+            )
+        if state.engine is not None:
+            _timed_step(state, "optimize", _optimize_warehouse, state.engine)
+
+        profile_summary = state.profile.summary()
+        state.drift_violations = _timed_step(
+            state,
+            "drift",
+            check_drift,
+            profile_summary,
+            load_profile_history(PROFILE_HISTORY_PATH),
+        )
+
+        if generate_reports:
+            reports = runner.run([
+                Stage("reports", functools.partial(_reports_stage, state), checkpoint=False)
+            ])
+            report_details = reports["reports"].value
 
         if dry_run:
             logger.info(
@@ -106,39 +951,36 @@ def run_pipeline(dry_run: bool = False):
             write_run_summary(
                 started_at=started_at,
                 dry_run=True,
-                raw_rows=raw_rows,
-                clean_rows=clean_rows,
+                raw_rows=state.raw_rows,
+                clean_rows=state.clean_rows,
                 table_counts=None,
                 status="success",
+                **state.summary_details(),
+                **report_details,
             )
             return
 
-        logger.info("Step 4: Saving processed CSV...")
-        PROCESSED_DATA_PATH.parent.mkdir(parents=True, exist_ok=True)
-        df_clean.to_csv(PROCESSED_DATA_PATH, index=False)
-        logger.info("Saved processed data to %s", PROCESSED_DATA_PATH)
-
-        logger.info("Step 5: Creating schema...")
-        create_schema()
-        logger.info("Schema created (if not already present).")
-
-        logger.info("Step 6: Loading dimension tables...")
-        load_dimensions(df_clean)
-        logger.info("Loaded dim_customers and dim_products.")
+        if manifest is not None:
+            for path in paths:
+                manifest.record_file(path)
+            manifest.advance_high_water_mark(state.max_order_id, state.max_order_date)
+            manifest.save()
 
-        logger.info("Step 7: Loading fact_orders table...")
-        load_fact_orders(df_clean)
-        logger.info("Loaded fact_orders.")
+        append_profile_history(PROFILE_HISTORY_PATH, profile_summary, started_at)
 
-        table_counts = get_table_row_counts()
+        table_counts = get_table_row_counts(state.engine)
+        if store is not None:
+            store.prune()
 
         write_run_summary(
             started_at=started_at,
             dry_run=False,
-            raw_rows=raw_rows,
-            clean_rows=clean_rows,
+            raw_rows=state.raw_rows,
+            clean_rows=state.clean_rows,
             table_counts=table_counts,
             status="success",
+            **state.summary_details(),
+            **report_details,
         )
 
         logger.info("Pipeline completed successfully.")
@@ -148,10 +990,14 @@ def run_pipeline(dry_run: bool = False):
         write_run_summary(
             started_at=started_at,
             dry_run=dry_run,
-            raw_rows=raw_rows,
-            clean_rows=clean_rows,
+            raw_rows=state.raw_rows,
+            clean_rows=state.clean_rows,
             table_counts=table_counts,
             status="failed",
             error_message=str(exc),
+            **state.summary_details(),
         )
         raise
+    finally:
+        if state.profiler is not None:
+            state.profiler.close()
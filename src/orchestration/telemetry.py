@@ -0,0 +1,240 @@
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.config import RUN_HISTORY_MAX_RATIO, RUN_HISTORY_MIN_SECONDS, RUN_HISTORY_WINDOW
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Per-stage metrics compared against earlier runs: higher is worse for
+# times, lower is worse for throughput
+TREND_METRICS = {
+    "wall_seconds": "higher",
+    "cpu_seconds": "higher",
+    "rows_per_second": "lower",
+}
+
+
+def peak_rss_bytes() -> int | None:
+    """
+    Return the peak resident set size of this process so far, or None
+    where the platform does not report it.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def frame_stats(value, deep: bool = False) -> tuple[int, int]:
+    """
+    Return (rows, bytes) of the DataFrames in value, which may be a
+    DataFrame or a dict, list or tuple holding some.
+
+    With deep=False object columns count only their pointers; deep=True
+    adds the Python objects they hold, which visits every value.
+    """
+    if isinstance(value, pd.DataFrame):
+        return len(value), int(value.memory_usage(deep=deep).sum())
+    if isinstance(value, dict):
+        value = list(value.values())
+    if isinstance(value, (list, tuple)):
+        rows = size = 0
+        for item in value:
+            item_rows, item_size = frame_stats(item, deep)
+            rows += item_rows
+            size += item_size
+        return rows, size
+    return 0, 0
+
+
+def measured(func, *args, deep: bool = False):
+    """
+    Call func(*args) and return (result, metrics).
+
+    metrics has the wall and CPU time of the call (CPU time of the calling
+    thread, so stages running concurrently are not counted twice), rows
+    and bytes of the DataFrames going in or coming out (whichever is
+    larger), rows per second and the process's peak RSS at the end. The
+    peak RSS is the process's, so stages running at the same time share it.
+    Frame bytes are measured deeply (see frame_stats) only with deep=True.
+    """
+    started = time.perf_counter()
+    cpu_started = time.thread_time()
+    result = func(*args)
+    # Stop the CPU clock first so its interval lies within the wall one
+    cpu = time.thread_time() - cpu_started
+    wall = time.perf_counter() - started
+
+    in_rows, in_bytes = frame_stats(list(args), deep)
+    out_rows, out_bytes = frame_stats(result, deep)
+    rows = max(in_rows, out_rows)
+    return result, {
+        "seconds": wall,
+        "cpu_seconds": cpu,
+        "rows": rows,
+        "rows_per_second": rows / wall if wall > 0 else None,
+        "frame_bytes": max(in_bytes, out_bytes),
+        "peak_rss_bytes": peak_rss_bytes(),
+    }
+
+
+def summarize_stages(records: list[dict]) -> dict:
+    """
+    Return per-stage-kind totals of stage records (see StageRunner.timings):
+    wall and CPU time, rows and rows per second summed over the stages that
+    ran, and the largest DataFrame and peak RSS seen.
+    """
+    totals = {}
+    for record in records:
+        kind = totals.setdefault(record["kind"], {
+            "runs": 0,
+            "skipped": 0,
+            "wall_seconds": 0.0,
+            "cpu_seconds": 0.0,
+            "rows": 0,
+            "rows_per_second": None,
+            "frame_bytes": 0,
+            "peak_rss_bytes": None,
+        })
+        if record.get("skipped"):
+            kind["skipped"] += 1
+            continue
+        kind["runs"] += 1
+        kind["wall_seconds"] += record["seconds"]
+        kind["cpu_seconds"] += record.get("cpu_seconds") or 0.0
+        kind["rows"] += record.get("rows") or 0
+        kind["frame_bytes"] = max(kind["frame_bytes"], record.get("frame_bytes") or 0)
+        if record.get("peak_rss_bytes") is not None:
+            kind["peak_rss_bytes"] = max(kind["peak_rss_bytes"] or 0, record["peak_rss_bytes"])
+
+    for kind in totals.values():
+        if kind["rows"] and kind["wall_seconds"] > 0:
+            kind["rows_per_second"] = kind["rows"] / kind["wall_seconds"]
+    return totals
+
+
+def load_run_history(path: Path) -> list[dict]:
+    """
+    Read earlier run records (one JSON object per line).
+    """
+    if not path.exists():
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def append_run_history(path: Path, record: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record, default=str) + "\n")
+
+
+# Run settings that change what a stage does; runs are only compared with
+# runs that used the same ones
+RUN_SETTINGS = ("dry_run", "chunk_size", "workers", "load_mode")
+
+
+def comparable_runs(history: list[dict]) -> list[dict]:
+    """
+    Return the successful runs in history that used the same RUN_SETTINGS
+    as the latest successful run.
+    """
+    runs = [run for run in history if run.get("status") == "success"]
+    if not runs:
+        return []
+    settings = [runs[-1].get(key) for key in RUN_SETTINGS]
+    return [run for run in runs if [run.get(key) for key in RUN_SETTINGS] == settings]
+
+
+def stage_metric_history(history: list[dict], metric: str) -> pd.DataFrame:
+    """
+    Return one row per successful run and one column per stage kind with
+    metric for the stages that ran (NaN where a kind was skipped or absent).
+    """
+    rows = []
+    for run in history:
+        if run.get("status") != "success":
+            continue
+        rows.append({
+            "started_at_utc": run.get("started_at_utc"),
+            **{
+                kind: stats.get(metric)
+                for kind, stats in run.get("stage_totals", {}).items()
+                if stats.get("runs")
+            },
+        })
+    if not rows:
+        return pd.DataFrame()
+    return pd.DataFrame(rows).set_index("started_at_utc").astype(float)
+
+
+def stage_trends(history: list[dict], window: int | None = None) -> pd.DataFrame:
+    """
+    Return per stage kind and TREND_METRICS metric the latest successful
+    run's value, the median of the up to window comparable runs before it
+    that ran the stage (see comparable_runs), and their ratio.
+    """
+    window = window or RUN_HISTORY_WINDOW
+    history = comparable_runs(history)
+    trends = []
+    for metric in TREND_METRICS:
+        values = stage_metric_history(history, metric)
+        for kind in values.columns:
+            series = values[kind]
+            if pd.isna(series.iloc[-1]):
+                continue
+            previous = series.iloc[:-1].dropna().iloc[-window:]
+            baseline = float(np.median(previous)) if len(previous) else None
+            latest = float(series.iloc[-1])
+            trends.append({
+                "stage": kind,
+                "metric": metric,
+                "latest": latest,
+                "median": baseline,
+                "ratio": latest / baseline if baseline else None,
+                "runs": len(previous),
+            })
+    return pd.DataFrame(trends, columns=["stage", "metric", "latest", "median", "ratio", "runs"])
+
+
+def find_regressions(
+    history: list[dict],
+    window: int | None = None,
+    max_ratio: float | None = None,
+    min_seconds: float | None = None,
+) -> list[dict]:
+    """
+    Return the stage metrics of the latest run that are worse than the
+    rolling median of earlier runs by more than max_ratio (default:
+    RUN_HISTORY_MAX_RATIO from config), e.g. 1.5 flags a stage that got
+    50% slower or whose throughput fell by a third.
+
+    Stages that took less than min_seconds (default: RUN_HISTORY_MIN_SECONDS)
+    in the latest run are too noisy to judge and never flagged.
+    """
+    max_ratio = max_ratio or RUN_HISTORY_MAX_RATIO
+    min_seconds = RUN_HISTORY_MIN_SECONDS if min_seconds is None else min_seconds
+    trends = stage_trends(history, window)
+    latest_seconds = dict(
+        trends.loc[trends["metric"] == "wall_seconds", ["stage", "latest"]].itertuples(index=False)
+    )
+    regressions = []
+    for trend in trends.to_dict("records"):
+        if trend["ratio"] is None or pd.isna(trend["ratio"]):
+            continue
+        if latest_seconds.get(trend["stage"], 0.0) < min_seconds:
+            continue
+        worse = TREND_METRICS[trend["metric"]]
+        if (worse == "higher" and trend["ratio"] > max_ratio) or (
+            worse == "lower" and trend["ratio"] < 1 / max_ratio
+        ):
+            regressions.append(trend)
+    return regressions
@@ -0,0 +1,256 @@
+import shutil
+import signal
+import threading
+import time
+from pathlib import Path
+
+from src.config import (
+    PIPELINE_CHECKPOINTS,
+    WATCH_MAX_BATCH_BYTES,
+    WATCH_MAX_BATCH_FILES,
+    WATCH_MAX_FAILURES,
+    WATCH_MAX_LATENCY_SECONDS,
+    WATCH_POLL_SECONDS,
+    WATCH_RETRY_SECONDS,
+)
+from src.ingestion.manifest import IngestManifest, discover_raw_files
+from src.orchestration.pipeline import run_pipeline
+from src.warehouse.db import get_engine
+from src.utils.logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+# Directory, next to a file, that files failing every retry are moved into
+FAILED_DIR = "failed"
+
+
+def _stat_key(path: Path) -> tuple[int, int]:
+    stat = path.stat()
+    return stat.st_size, stat.st_mtime_ns
+
+
+class RawFileWatcher:
+    """
+    Load raw files landing in source in micro-batches from one warm process.
+
+    Every poll lists source (a directory or glob). A file is ready once its
+    size and mtime are unchanged since the previous poll, so files still
+    being written are left alone. Ready files run through an incremental
+    run_pipeline as soon as the oldest has waited max_latency seconds since
+    it was first seen, or they add up to max_files files or max_bytes
+    bytes (whichever comes first; a batch takes at most that many).
+
+    Batches share one engine and the process-wide caches (report cache,
+    imports, connection pool), so a batch costs its own work rather than a
+    cold start. The ingest manifest keeps the bookkeeping exactly-once: it
+    is only updated after a batch loaded and loads upsert by order_id.
+
+    The files of a failed batch are retried one at a time, so a bad file
+    does not hold back the others, after retry_seconds and then twice as
+    long after each further failure. A file that failed max_failures times
+    is moved into a failed/ directory next to it and no longer retried.
+    Retries resume from their checkpoints only when checkpoints are on
+    (default: PIPELINE_CHECKPOINTS). pipeline_options are passed on to
+    run_pipeline.
+    """
+
+    def __init__(
+        self,
+        source,
+        poll_seconds: float | None = None,
+        max_latency: float | None = None,
+        max_files: int | None = None,
+        max_bytes: int | None = None,
+        retry_seconds: float | None = None,
+        max_failures: int | None = None,
+        checkpoints: bool | None = None,
+        engine=None,
+        **pipeline_options,
+    ):
+        self.source = source
+        self.poll_seconds = WATCH_POLL_SECONDS if poll_seconds is None else poll_seconds
+        self.max_latency = WATCH_MAX_LATENCY_SECONDS if max_latency is None else max_latency
+        self.max_files = max_files or WATCH_MAX_BATCH_FILES
+        self.max_bytes = max_bytes or WATCH_MAX_BATCH_BYTES
+        self.retry_seconds = WATCH_RETRY_SECONDS if retry_seconds is None else retry_seconds
+        self.max_failures = max_failures or WATCH_MAX_FAILURES
+        self.checkpoints = PIPELINE_CHECKPOINTS if checkpoints is None else checkpoints
+        self.engine = engine or get_engine()
+        self.pipeline_options = pipeline_options
+        self.manifest = IngestManifest.load()
+        self.batches = 0
+        self.failures = 0
+        # path -> (size, mtime_ns, first seen, ready) of files waiting to be loaded
+        self._pending: dict[Path, tuple[int, int, float, bool]] = {}
+        # path -> (size, mtime_ns) of files already loaded
+        self._loaded: dict[Path, tuple[int, int]] = {}
+        # path -> (failed batches, when it may be retried) of files that failed
+        self._failed: dict[Path, tuple[int, float]] = {}
+        self.moved: list[Path] = []
+        self._resume = False
+
+    def poll(self, now: float | None = None) -> list[Path]:
+        """
+        Scan source and return the batch of files due to be loaded now, if any.
+        """
+        now = time.monotonic() if now is None else now
+        current = {}
+        for path in discover_raw_files(self.source):
+            try:
+                current[path] = _stat_key(path)
+            except FileNotFoundError:
+                continue
+        self._loaded = {path: key for path, key in self._loaded.items() if path in current}
+        self._pending = {path: entry for path, entry in self._pending.items() if path in current}
+        self._failed = {path: entry for path, entry in self._failed.items() if path in current}
+
+        settled = []
+        for path, key in current.items():
+            if self._loaded.get(path) == key:
+                continue
+            entry = self._pending.get(path)
+            if entry is not None and entry[:2] != key:
+                # A rewritten file gets a fresh set of retries
+                self._failed.pop(path, None)
+            first_seen = entry[2] if entry else now
+            ready = entry is not None and entry[:2] == key
+            self._pending[path] = (*key, first_seen, ready)
+            if ready and not entry[3]:
+                settled.append(path)
+
+        if settled:
+            # Files ingested before the watcher started (or by another run)
+            new = set(self.manifest.pending_files(settled))
+            for path in settled:
+                if path not in new:
+                    self._loaded[path] = self._pending.pop(path)[:2]
+        return self._due_batch(now)
+
+    def _due_batch(self, now: float) -> list[Path]:
+        ready = sorted(path for path, entry in self._pending.items() if entry[3])
+        # Files that failed go alone, once their backoff has passed
+        for path in ready:
+            if path in self._failed and self._failed[path][1] <= now:
+                return [path]
+        ready = [path for path in ready if path not in self._failed]
+        if not ready:
+            return []
+        batch, size = [], 0
+        for path in ready:
+            if batch and (len(batch) >= self.max_files or size + self._pending[path][0] > self.max_bytes):
+                break
+            batch.append(path)
+            size += self._pending[path][0]
+        oldest = min(self._pending[path][2] for path in ready)
+        full = len(batch) >= self.max_files or size >= self.max_bytes or len(batch) < len(ready)
+        return batch if full or now - oldest >= self.max_latency else []
+
+    def run_batch(self, paths: list[Path], now: float | None = None) -> bool:
+        """
+        Load paths with an incremental pipeline run; return whether it succeeded.
+        """
+        waited = (time.monotonic() if now is None else now) - min(self._pending[p][2] for p in paths)
+        logger.info(
+            "Micro-batch %d: %d files, %.1f MiB, oldest waited %.1fs",
+            self.batches + 1,
+            len(paths),
+            sum(self._pending[p][0] for p in paths) / 2**20,
+            waited,
+        )
+        started = time.perf_counter()
+        try:
+            run_pipeline(
+                source=paths,
+                incremental=True,
+                engine=self.engine,
+                checkpoints=self.checkpoints,
+                resume=self._resume,
+                **self.pipeline_options,
+            )
+        except Exception:
+            self.failures += 1
+            self._resume = self.checkpoints
+            logger.exception("Micro-batch failed")
+            self._record_failure(paths, time.monotonic() if now is None else now)
+            return False
+
+        self.batches += 1
+        self._resume = False
+        self.manifest = IngestManifest.load()
+        for path in paths:
+            self._loaded[path] = self._pending.pop(path)[:2]
+            self._failed.pop(path, None)
+        logger.info("Micro-batch %d loaded in %.2fs", self.batches, time.perf_counter() - started)
+        return True
+
+    def _record_failure(self, paths: list[Path], now: float) -> None:
+        """
+        Schedule the retry of each of paths, or move it aside after max_failures.
+        """
+        for path in paths:
+            failures = self._failed.get(path, (0, now))[0] + 1
+            if failures < self.max_failures:
+                delay = self.retry_seconds * 2 ** (failures - 1)
+                self._failed[path] = (failures, now + delay)
+                logger.warning("Retrying %s in %.0fs (failure %d).", path, delay, failures)
+                continue
+            target = path.parent / FAILED_DIR / path.name
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.move(path, target)
+            self._pending.pop(path, None)
+            self._failed.pop(path, None)
+            self.moved.append(target)
+            logger.error("Moved %s to %s after %d failed batches.", path, target, failures)
+
+    def run(self, stop: threading.Event | None = None) -> None:
+        """
+        Poll and load batches until stop is set. A batch in progress always
+        finishes; files still waiting are picked up by the next watcher.
+        """
+        stop = stop or threading.Event()
+        logger.info(
+            "Watching %s (poll %.1fs, max latency %.0fs, batches of up to %d files / %.0f MiB)",
+            self.source,
+            self.poll_seconds,
+            self.max_latency,
+            self.max_files,
+            self.max_bytes / 2**20,
+        )
+        while not stop.is_set():
+            batch = self.poll()
+            # Keep going without sleeping while a backlog is being worked off
+            if not (batch and self.run_batch(batch)):
+                stop.wait(self.poll_seconds)
+        logger.info(
+            "Stopped watching %s after %d batches (%d failed, %d files moved aside); %d files waiting.",
+            self.source,
+            self.batches,
+            self.failures,
+            len(self.moved),
+            len(self._pending),
+        )
+
+
+def watch(source, **options) -> RawFileWatcher:
+    """
+    Run a RawFileWatcher on source until SIGINT or SIGTERM, which stop it
+    after the batch in progress; a second signal interrupts immediately.
+    options are passed on to RawFileWatcher.
+    """
+    watcher = RawFileWatcher(source, **options)
+    stop = threading.Event()
+    previous = {}
+
+    def _request_stop(signum, frame):
+        logger.info("Received %s; stopping after the current batch.", signal.Signals(signum).name)
+        signal.signal(signum, previous[signum])
+        stop.set()
+
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        previous[signum] = signal.signal(signum, _request_stop)
+    try:
+        watcher.run(stop)
+    finally:
+        for signum, handler in previous.items():
+            signal.signal(signum, handler)
+    return watcher
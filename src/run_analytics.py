@@ -1,6 +1,15 @@
 import argparse
+import sys
+from datetime import date
 
-from src.analytics.reports import generate_all_reports
+from src.analytics.frame_reports import FRAME_REPORTS, FrameReports, write_frame_reports
+from src.analytics.reports import REPORTS, generate_all_reports
+from src.config import ANALYTICS_BACKEND, PROCESSED_DATA_FORMAT
+from src.orchestration.pipeline import processed_output_path, update_run_summary
+from src.utils.io_utils import read_processed
+from src.utils.profiling import StageProfiler
+from src.warehouse.aggregates import check_aggregates, rebuild_aggregates
+from src.warehouse.db import get_engine
 from src.utils.logging_utils import get_logger
 
 logger = get_logger(__name__)
@@ -16,13 +25,156 @@ def parse_args() -> argparse.Namespace:
         default=10,
         help="Number of top products to include in the top products report (default: 10)",
     )
+    parser.add_argument(
+        "--start-date",
+        type=date.fromisoformat,
+        default=None,
+        help="Only include orders on or after this date (YYYY-MM-DD)",
+    )
+    parser.add_argument(
+        "--end-date",
+        type=date.fromisoformat,
+        default=None,
+        help="Only include orders on or before this date (YYYY-MM-DD)",
+    )
+    parser.add_argument(
+        "--format",
+        choices=["csv", "parquet"],
+        default=None,
+        help="File format of the reports (default: REPORT_FORMAT, csv)",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=None,
+        help="Rows fetched and written per chunk by streamed exports (default: REPORT_CHUNK_SIZE)",
+    )
+    parser.add_argument(
+        "--reports",
+        nargs="+",
+        choices=list(REPORTS),
+        default=None,
+        help="Reports to generate; the detail exports order_details and customer_revenue and the customer analytics customer_rfm and cohort_retention only run when listed (default: all summary reports)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of reports generated concurrently (default: REPORT_WORKERS, up to 4 by CPU count)",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=["sql", "memory"],
+        default=None,
+        help="Query the warehouse, or compute the summary reports in memory from the processed data layer (default: ANALYTICS_BACKEND, sql)",
+    )
+    parser.add_argument(
+        "--check-aggregates",
+        action="store_true",
+        help="Recompute the report aggregates from fact_orders and report mismatches instead of generating reports",
+    )
+    parser.add_argument(
+        "--rebuild-aggregates",
+        action="store_true",
+        help="Rebuild the report aggregates from fact_orders before running",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Run every report under cProfile and write per-report .prof files and summaries under PROFILE_DIR (reports then run one at a time)",
+    )
+    parser.add_argument(
+        "--profile-memory",
+        action="store_true",
+        help="Trace allocations with tracemalloc and write each report's top allocating lines under PROFILE_DIR",
+    )
     return parser.parse_args()
 
 
+def run_aggregate_check() -> bool:
+    """
+    Compare the stored report aggregates with fact_orders and log any
+    mismatches. Returns True if they are consistent.
+    """
+    with get_engine().connect() as conn:
+        mismatches = check_aggregates(conn)
+    if mismatches.empty:
+        logger.info("Report aggregates are consistent with fact_orders.")
+        return True
+    logger.error("Report aggregates disagree with fact_orders for %d keys:", len(mismatches))
+    for row in mismatches.itertuples(index=False):
+        logger.error(
+            "  %s %s: stored revenue=%s orders=%s, expected revenue=%s orders=%s",
+            row.aggregate,
+            row.key,
+            row.revenue_stored,
+            row.order_count_stored,
+            row.revenue_expected,
+            row.order_count_expected,
+        )
+    return False
+
+
+def run_memory_reports(args) -> dict:
+    """
+    Compute the summary reports from the processed data layer instead of
+    the warehouse.
+    """
+    unsupported = set(args.reports or ()) - set(FRAME_REPORTS)
+    if unsupported:
+        raise SystemExit(
+            f"The memory backend does not support: {', '.join(sorted(unsupported))}"
+        )
+    path = processed_output_path(PROCESSED_DATA_FORMAT)
+    logger.info("Reading processed orders from %s", path)
+    orders = read_processed(path, PROCESSED_DATA_FORMAT)
+    # Incremental runs append re-sent orders, which the warehouse upserts;
+    # keep the latest version of each like the loader does
+    orders = orders.drop_duplicates("order_id", keep="last")
+    reports = FrameReports(args.start_date, args.end_date)
+    reports.update(orders)
+    return write_frame_reports(reports, limit=args.limit, fmt=args.format, names=args.reports)
+
+
 def main():
     args = parse_args()
-    logger.info("Running analytics reports (limit=%d)", args.limit)
-    generate_all_reports(limit=args.limit)
+    if args.rebuild_aggregates:
+        with get_engine().begin() as conn:
+            rebuild_aggregates(conn)
+    if args.check_aggregates:
+        sys.exit(0 if run_aggregate_check() else 1)
+
+    logger.info(
+        "Running analytics reports (limit=%d, start_date=%s, end_date=%s, format=%s)",
+        args.limit,
+        args.start_date,
+        args.end_date,
+        args.format,
+    )
+    profiler = None
+    if args.profile or args.profile_memory:
+        profiler = StageProfiler(label="analytics", cpu=args.profile, memory=args.profile_memory)
+    try:
+        if (args.backend or ANALYTICS_BACKEND) == "memory":
+            if profiler is None:
+                details = run_memory_reports(args)
+            else:
+                details = profiler.call("memory_reports", run_memory_reports, args)
+        else:
+            details = generate_all_reports(
+                limit=args.limit,
+                start_date=args.start_date,
+                end_date=args.end_date,
+                workers=args.workers,
+                reports=args.reports,
+                fmt=args.format,
+                chunk_size=args.chunk_size,
+                profiler=profiler,
+            )
+    finally:
+        if profiler is not None:
+            profiler.close()
+    update_run_summary(**details)
     logger.info("Analytics reports completed.")
 
 
@@ -0,0 +1,94 @@
+import argparse
+import sys
+
+import pandas as pd
+
+from src.config import LOGS_DIR, RUN_HISTORY_WINDOW
+from src.orchestration.pipeline import RUN_HISTORY_FILE
+from src.orchestration.telemetry import (
+    TREND_METRICS,
+    find_regressions,
+    load_run_history,
+    stage_metric_history,
+    stage_trends,
+)
+from src.utils.logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Show per-stage performance trends of pipeline runs and flag regressions"
+    )
+    parser.add_argument(
+        "--window",
+        type=int,
+        default=None,
+        help="Number of earlier runs the latest run is compared with (default: RUN_HISTORY_WINDOW, 10)",
+    )
+    parser.add_argument(
+        "--max-ratio",
+        type=float,
+        default=None,
+        help="Flag stages this many times slower (or with this many times lower throughput) than the rolling median (default: RUN_HISTORY_MAX_RATIO, 1.5)",
+    )
+    parser.add_argument(
+        "--min-seconds",
+        type=float,
+        default=None,
+        help="Never flag stages that took less than this in the latest run (default: RUN_HISTORY_MIN_SECONDS, 0.1)",
+    )
+    parser.add_argument(
+        "--metric",
+        choices=[*TREND_METRICS, "rows", "frame_bytes", "peak_rss_bytes"],
+        default=None,
+        help="Also print this metric of every stage for the last --runs runs",
+    )
+    parser.add_argument(
+        "--runs",
+        type=int,
+        default=20,
+        help="Number of runs printed with --metric (default: 20)",
+    )
+    parser.add_argument(
+        "--fail-on-regression",
+        action="store_true",
+        help="Exit non-zero if the latest run has a regression",
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    path = LOGS_DIR / RUN_HISTORY_FILE
+    history = load_run_history(path)
+    if not history:
+        logger.info("No run history in %s yet.", path)
+        return
+
+    with pd.option_context("display.width", 160, "display.max_columns", None):
+        if args.metric:
+            print(stage_metric_history(history, args.metric).tail(args.runs).to_string())
+            print()
+        print(stage_trends(history, args.window).to_string(index=False, float_format="{:.4g}".format))
+
+    regressions = find_regressions(history, args.window, args.max_ratio, args.min_seconds)
+    for regression in regressions:
+        logger.warning(
+            "Regression: stage %s %s is %.4g vs median %.4g of the last %d runs (x%.2f)",
+            regression["stage"],
+            regression["metric"],
+            regression["latest"],
+            regression["median"],
+            regression["runs"],
+            regression["ratio"],
+        )
+    if not regressions:
+        logger.info("No stage regressed against the last %d runs.", args.window or RUN_HISTORY_WINDOW)
+    if regressions and args.fail_on_regression:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,45 +1,433 @@
+import json
+import re
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Iterable
+
+import numpy as np
 import pandas as pd
+from src.config import DQ_MAX_ERROR_RATE
 from src.utils.logging_utils import get_logger
+from src.utils.sketches import HyperLogLog, KLLSketch
 
 logger = get_logger(__name__)
 
-def validate_orders(df: pd.DataFrame) -> None:
+
+@dataclass(frozen=True)
+class Rule:
     """
-    Run basic data quality checks on the orders DataFrame.
+    A named data quality rule.
 
-    - No null order_id
-    - No duplicate order_id
-    - quantity > 0
-    - unit_price > 0
+    check returns a boolean Series/array that is True for rows that FAIL the rule.
+    """
 
-    Raises:
-        ValueError if any check fails.
+    name: str
+    check: Callable[[pd.DataFrame], pd.Series]
+
+
+def _as_mask(values) -> np.ndarray:
+    """
+    Convert a (possibly nullable) boolean Series to a plain numpy mask; NA counts as False.
+    """
+    if isinstance(values, pd.Series):
+        values = values.fillna(False)
+    return np.asarray(values, dtype=bool)
+
+
+def not_null(column: str, name: str | None = None) -> Rule:
+    return Rule(name or f"{column}_not_null", lambda df: df[column].isna())
+
+
+def unique(column: str, name: str | None = None) -> Rule:
+    """
+    Fail every occurrence of a value after its first one.
+    """
+    return Rule(
+        name or f"{column}_unique",
+        lambda df: df[column].duplicated() & df[column].notna(),
+    )
+
+
+def in_range(
+    column: str,
+    min_value=None,
+    max_value=None,
+    inclusive: bool = True,
+    name: str | None = None,
+) -> Rule:
+    """
+    Fail non-null values outside [min_value, max_value] (or the open interval
+    when inclusive=False). Nulls are left to not_null rules.
     """
-    errors = []
 
-    if df["order_id"].isna().any():
-        errors.append("order_id contains null values")
+    def check(df):
+        values = df[column]
+        ok = pd.Series(True, index=df.index)
+        if min_value is not None:
+            ok &= (values >= min_value) if inclusive else (values > min_value)
+        if max_value is not None:
+            ok &= (values <= max_value) if inclusive else (values < max_value)
+        return ~ok.fillna(True)
+
+    return Rule(name or f"{column}_in_range", check)
+
+
+def allowed_values(column: str, values: Iterable, name: str | None = None) -> Rule:
+    allowed = list(values)
+    return Rule(
+        name or f"{column}_allowed_values",
+        lambda df: ~df[column].isin(allowed) & df[column].notna(),
+    )
 
-    dup_count = df["order_id"].duplicated().sum()
-    if dup_count > 0:
-        errors.append(f"{dup_count} duplicate order_id values found")
 
-    bad_qty = (df["quantity"] <= 0).sum()
-    if bad_qty > 0:
-        errors.append(f"{bad_qty} rows with non-positive quantity")
+def matches(column: str, pattern: str, name: str | None = None) -> Rule:
+    """
+    Fail non-null values that do not fully match the regular expression.
+    """
+    re.compile(pattern)  # fail fast on an invalid pattern
+    return Rule(
+        name or f"{column}_matches",
+        lambda df: ~df[column].astype("string").str.fullmatch(pattern).fillna(True),
+    )
+
+
+def references(
+    column: str, keys: Callable[[], Iterable] | Iterable, name: str | None = None
+) -> Rule:
+    """
+    Fail non-null values that are not present in a set of parent keys.
 
-    bad_price = (df["unit_price"] <= 0).sum()
-    if bad_price > 0:
-        errors.append(f"{bad_price} rows with non-positive unit_price")
+    keys may be a callable, so the parent key set (e.g. loaded from a
+    dimension table) is fetched only when the rule is evaluated.
+    """
+
+    def check(df):
+        parent_keys = list(keys() if callable(keys) else keys)
+        return ~df[column].isin(parent_keys) & df[column].notna()
+
+    return Rule(name or f"{column}_references", check)
+
+
+def cross_column(name: str, predicate: Callable[[pd.DataFrame], pd.Series]) -> Rule:
+    """
+    Fail rows where a predicate over several columns is False.
+    """
+    return Rule(name, lambda df: ~predicate(df).fillna(True))
+
+
+# Default rule registry, evaluated by validate_orders and the pipeline.
+RULES: list[Rule] = [
+    not_null("order_id"),
+    unique("order_id"),
+    not_null("customer_id"),
+    not_null("product_id"),
+    not_null("order_date"),
+    in_range("quantity", min_value=0, inclusive=False, name="quantity_positive"),
+    in_range("unit_price", min_value=0, inclusive=False, name="unit_price_positive"),
+    cross_column(
+        "total_amount_consistent",
+        lambda df: (df["total_amount"] - df["quantity"] * df["unit_price"]).abs() < 1e-6,
+    ),
+]
+
+
+def register_rule(rule: Rule) -> None:
+    """
+    Add a rule to the default registry, replacing any rule with the same name.
+    """
+    RULES[:] = [r for r in RULES if r.name != rule.name]
+    RULES.append(rule)
+
+
+def evaluate_rules(
+    df: pd.DataFrame, rules: list[Rule] | None = None
+) -> tuple[pd.DataFrame, pd.DataFrame, dict]:
+    """
+    Evaluate every rule in one vectorized pass over the DataFrame.
+
+    Each rule produces one boolean mask; rows failing any rule are split off
+    into a quarantine DataFrame with a failed_rules column listing the rule
+    names (";"-separated).
+
+    Returns:
+        (valid rows, quarantined rows, report) where report holds the row
+        count, failed row count and per-rule failure counts and timings.
+    """
+    rules = RULES if rules is None else rules
+    report = {"rows": len(df), "failed_rows": 0, "rules": {}}
+    masks = {}
+
+    for rule in rules:
+        started = time.perf_counter()
+        mask = _as_mask(rule.check(df))
+        masks[rule.name] = mask
+        report["rules"][rule.name] = {
+            "failed": int(mask.sum()),
+            "seconds": time.perf_counter() - started,
+        }
+
+    failed = np.zeros(len(df), dtype=bool)
+    for mask in masks.values():
+        failed |= mask
+    report["failed_rows"] = int(failed.sum())
+
+    df_quarantine = df[failed].copy()
+    if not df_quarantine.empty:
+        failed_rules = np.full(len(df_quarantine), "", dtype=object)
+        for rule_name, mask in masks.items():
+            failed_rules = np.where(mask[failed], failed_rules + rule_name + ";", failed_rules)
+        df_quarantine["failed_rules"] = [names.rstrip(";") for names in failed_rules]
+    else:
+        df_quarantine["failed_rules"] = pd.Series(dtype="object")
+
+    return df[~failed], df_quarantine, report
+
+
+def merge_reports(totals: dict, report: dict) -> dict:
+    """
+    Add one batch's report into run-wide totals (counts and timings are additive).
+    """
+    totals["rows"] = totals.get("rows", 0) + report["rows"]
+    totals["failed_rows"] = totals.get("failed_rows", 0) + report["failed_rows"]
+    rule_totals = totals.setdefault("rules", {})
+    for rule_name, stats in report["rules"].items():
+        entry = rule_totals.setdefault(rule_name, {"failed": 0, "seconds": 0.0})
+        entry["failed"] += stats["failed"]
+        entry["seconds"] += stats["seconds"]
+    return totals
+
+
+def check_error_rate(report: dict, max_error_rate: float | None = None) -> None:
+    """
+    Log the data quality summary and fail if too many rows were quarantined.
+
+    Raises:
+        ValueError if failed_rows / rows exceeds max_error_rate
+        (default: DQ_MAX_ERROR_RATE from config).
+    """
+    max_error_rate = DQ_MAX_ERROR_RATE if max_error_rate is None else max_error_rate
+    rows = report["rows"]
+    error_rate = report["failed_rows"] / rows if rows else 0.0
 
     logger.info(
-        "Data quality summary: rows=%d, columns=%d, issues=%d",
-        len(df),
-        df.shape[1],
-        len(errors),
+        "Data quality summary: rows=%d, quarantined=%d, error_rate=%.4f (max %.4f)",
+        rows,
+        report["failed_rows"],
+        error_rate,
+        max_error_rate,
     )
+    for rule_name, stats in report["rules"].items():
+        if stats["failed"]:
+            logger.warning("Data quality rule %s failed for %d rows", rule_name, stats["failed"])
 
-    if errors:
-        for e in errors:
-            logger.error("Data quality issue: %s", e)
+    if error_rate > max_error_rate:
+        logger.error(
+            "Data quality error rate %.4f exceeds threshold %.4f", error_rate, max_error_rate
+        )
         raise ValueError("Data quality validation failed; see logs for details")
+
+
+def validate_orders(
+    df: pd.DataFrame,
+    rules: list[Rule] | None = None,
+    max_error_rate: float | None = None,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Run the data quality rules on the orders DataFrame.
+
+    Returns:
+        (valid rows, quarantined rows).
+
+    Raises:
+        ValueError if the share of failing rows exceeds max_error_rate.
+    """
+    df_valid, df_quarantine, report = evaluate_rules(df, rules)
+    check_error_rate(report, max_error_rate)
+    return df_valid, df_quarantine
+
+
+PROFILE_QUANTILES = {"p01": 0.01, "p25": 0.25, "p50": 0.5, "p75": 0.75, "p99": 0.99}
+QUANTILE_COLUMNS = ("quantity", "unit_price", "total_amount")
+
+
+class OrdersProfile:
+    """
+    Fixed-memory, mergeable column profile of the orders data.
+
+    For every column it tracks null rate, approximate distinct count
+    (HyperLogLog) and min/max; quantity, unit_price and total_amount also
+    get approximate quantiles (KLL). Profiles built per chunk or per worker
+    can be merged into one profile for the run.
+    """
+
+    def __init__(self):
+        self.rows = 0
+        self.columns = {}
+
+    def _column(self, name: str) -> dict:
+        if name not in self.columns:
+            self.columns[name] = {
+                "nulls": 0,
+                "min": None,
+                "max": None,
+                "distinct": HyperLogLog(),
+                "quantiles": KLLSketch() if name in QUANTILE_COLUMNS else None,
+            }
+        return self.columns[name]
+
+    def update(self, df: pd.DataFrame) -> None:
+        self.rows += len(df)
+        for name in df.columns:
+            values = df[name]
+            stats = self._column(name)
+            stats["nulls"] += int(values.isna().sum())
+            stats["distinct"].update(values)
+            if stats["quantiles"] is not None:
+                stats["quantiles"].update(values)
+
+            if not (
+                pd.api.types.is_numeric_dtype(values)
+                or pd.api.types.is_datetime64_any_dtype(values)
+            ):
+                continue
+            non_null = values.dropna()
+            if non_null.empty:
+                continue
+            low, high = non_null.min(), non_null.max()
+            stats["min"] = low if stats["min"] is None else min(stats["min"], low)
+            stats["max"] = high if stats["max"] is None else max(stats["max"], high)
+
+    def merge(self, other: "OrdersProfile") -> None:
+        self.rows += other.rows
+        for name, theirs in other.columns.items():
+            ours = self._column(name)
+            ours["nulls"] += theirs["nulls"]
+            ours["distinct"].merge(theirs["distinct"])
+            if ours["quantiles"] is not None and theirs["quantiles"] is not None:
+                ours["quantiles"].merge(theirs["quantiles"])
+            for key, pick in (("min", min), ("max", max)):
+                if theirs[key] is not None:
+                    ours[key] = theirs[key] if ours[key] is None else pick(ours[key], theirs[key])
+
+    def summary(self) -> dict:
+        """
+        Return a JSON-serializable summary of the profile.
+        """
+        columns = {}
+        for name, stats in self.columns.items():
+            column = {
+                "null_rate": stats["nulls"] / self.rows if self.rows else 0.0,
+                "distinct": stats["distinct"].estimate(),
+                "min": _to_json(stats["min"]),
+                "max": _to_json(stats["max"]),
+            }
+            if stats["quantiles"] is not None:
+                values = stats["quantiles"].quantiles(list(PROFILE_QUANTILES.values()))
+                column["quantiles"] = dict(zip(PROFILE_QUANTILES, values))
+            columns[name] = column
+        return {"rows": self.rows, "columns": columns}
+
+
+def _to_json(value):
+    if value is None:
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+@dataclass(frozen=True)
+class DriftRule:
+    """
+    Flag a profile metric that moved too far from its recent history.
+
+    metric is a dotted path into OrdersProfile.summary()["columns"], e.g.
+    "unit_price.quantiles.p50". The current value is compared with the
+    median of the last `window` runs.
+    """
+
+    metric: str
+    max_relative_change: float = 0.3
+    window: int = 7
+
+
+DRIFT_RULES: list[DriftRule] = [
+    DriftRule("unit_price.quantiles.p50"),
+    DriftRule("quantity.quantiles.p50"),
+    DriftRule("total_amount.quantiles.p50"),
+]
+
+
+def profile_metric(summary: dict, metric: str):
+    """
+    Look up a dotted metric path in a profile summary; None if missing.
+    """
+    value = summary.get("columns", {})
+    for key in metric.split("."):
+        if not isinstance(value, dict) or key not in value:
+            return None
+        value = value[key]
+    return value
+
+
+def load_profile_history(path: Path) -> list[dict]:
+    """
+    Read previously persisted run profiles (one JSON object per line).
+    """
+    if not path.exists():
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def append_profile_history(path: Path, summary: dict, started_at: datetime) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"started_at_utc": started_at.isoformat() + "Z", **summary}) + "\n")
+
+
+def check_drift(
+    summary: dict, history: list[dict], rules: list[DriftRule] | None = None
+) -> list[dict]:
+    """
+    Evaluate drift rules against earlier run profiles and log any violations.
+
+    Returns:
+        One dict per violated rule with the current value, the baseline
+        median and the relative change.
+    """
+    rules = DRIFT_RULES if rules is None else rules
+    violations = []
+
+    for rule in rules:
+        current = profile_metric(summary, rule.metric)
+        previous = [profile_metric(run, rule.metric) for run in history[-rule.window:]]
+        previous = [value for value in previous if value is not None]
+        if current is None or not previous:
+            continue
+
+        baseline = float(np.median(previous))
+        if baseline == 0:
+            continue
+        change = (current - baseline) / abs(baseline)
+        if abs(change) > rule.max_relative_change:
+            logger.warning(
+                "Data drift: %s is %.4g vs median %.4g of last %d runs (%.0f%% change)",
+                rule.metric,
+                current,
+                baseline,
+                len(previous),
+                change * 100,
+            )
+            violations.append({
+                "metric": rule.metric,
+                "current": current,
+                "baseline_median": baseline,
+                "relative_change": change,
+            })
+
+    return violations
@@ -1,10 +1,79 @@
+import numpy as np
 import pandas as pd
 
-def clean_orders(df: pd.DataFrame) -> pd.DataFrame:
+class SeenOrderIds:
+    """
+    The distinct order_ids seen so far, as a sorted int64 array.
+
+    Takes 8 bytes per order_id, against roughly 100 for a Python set of
+    ints, so a run can track about 10 million orders in 80 MB. Each update
+    copies the array once; beyond a few hundred million orders per run use
+    incremental runs, which deduplicate by upsert instead.
+    """
+
+    def __init__(self):
+        self.ids = np.empty(0, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _seen(self, values: np.ndarray) -> np.ndarray:
+        # Lookups in sorted order walk the array instead of jumping around it
+        if not len(self.ids):
+            return np.zeros(len(values), dtype=bool)
+        positions = np.searchsorted(self.ids, values).clip(max=len(self.ids) - 1)
+        return self.ids[positions] == values
+
+    def contains(self, order_ids: pd.Series) -> np.ndarray:
+        """
+        Return a boolean mask of the order_ids already seen (never for nulls).
+        """
+        present = order_ids.notna().to_numpy()
+        values = order_ids.to_numpy(dtype=np.int64, na_value=0)
+        order = np.argsort(values, kind="stable")
+        seen = np.empty(len(values), dtype=bool)
+        seen[order] = self._seen(values[order])
+        return present & seen
+
+    def update(self, order_ids) -> None:
+        """
+        Add order_ids (a Series or another SeenOrderIds).
+        """
+        if isinstance(order_ids, SeenOrderIds):
+            order_ids = order_ids.ids
+        values = np.sort(pd.Series(order_ids).dropna().to_numpy(dtype=np.int64))
+        values = values[np.r_[True, values[1:] != values[:-1]]] if len(values) else values
+        new = values[~self._seen(values)]
+        if len(new):
+            # A stable sort merges the two sorted runs in linear time
+            self.ids = np.sort(np.concatenate([self.ids, new]), kind="stable")
+
+
+def drop_seen_order_ids(df: pd.DataFrame, seen_order_ids) -> pd.DataFrame:
+    """
+    Drop rows whose order_id is already in seen_order_ids (a SeenOrderIds or
+    any collection pandas isin accepts).
+    """
+    if isinstance(seen_order_ids, SeenOrderIds):
+        return df[~seen_order_ids.contains(df["order_id"])]
+    return df[~df["order_id"].isin(seen_order_ids)]
+
+def clean_orders(df: pd.DataFrame, seen_order_ids: SeenOrderIds | None = None) -> pd.DataFrame:
     """
     Basic cleaning: drop duplicates and rows missing critical fields.
+
+    When seen_order_ids is given, rows whose order_id was already seen in an
+    earlier chunk are dropped too, and it is updated with this chunk's
+    order_ids. This keeps deduplication correct across chunk boundaries.
     """
+    if seen_order_ids is not None:
+        df = drop_seen_order_ids(df, seen_order_ids)
+
     df = df.drop_duplicates(subset=["order_id"])
+
+    if seen_order_ids is not None:
+        seen_order_ids.update(df["order_id"].dropna())
+
     df = df.dropna(subset=["order_id", "customer_id", "product_id", "order_date"])
     return df
 
@@ -20,7 +89,7 @@ def add_features(df: pd.DataFrame) -> pd.DataFrame:
 
     return df
 
-def transform_orders(df: pd.DataFrame) -> pd.DataFrame:
-    df = clean_orders(df)
+def transform_orders(df: pd.DataFrame, seen_order_ids: SeenOrderIds | None = None) -> pd.DataFrame:
+    df = clean_orders(df, seen_order_ids=seen_order_ids)
     df = add_features(df)
     return df
@@ -0,0 +1,226 @@
+import os
+import shutil
+from pathlib import Path
+from typing import Iterator
+
+import pandas as pd
+
+PARQUET_SUFFIXES = {".parquet", ".pq"}
+ARROW_SUFFIXES = {".arrow", ".feather", ".ipc"}
+PROCESSED_PARTITION_COLS = ["order_year", "order_month"]
+
+
+def _require_pyarrow():
+    """
+    Import pyarrow lazily so CSV-only runs do not need it installed.
+    """
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError as exc:
+        raise ImportError(
+            "pyarrow is required for Parquet/Arrow files; install it with `pip install pyarrow`"
+        ) from exc
+
+
+def file_format(path: Path) -> str:
+    """
+    Return "csv", "parquet" or "arrow" based on the path suffix.
+
+    Directories are treated as Parquet datasets.
+    """
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix in PARQUET_SUFFIXES or path.is_dir():
+        return "parquet"
+    if suffix in ARROW_SUFFIXES:
+        return "arrow"
+    return "csv"
+
+
+def read_table(path: Path, **csv_kwargs) -> pd.DataFrame:
+    """
+    Read a CSV, Parquet (file or dataset directory) or Arrow IPC file into a DataFrame.
+
+    csv_kwargs (e.g. dtype) are passed to pd.read_csv; columnar files carry
+    their own types.
+    """
+    fmt = file_format(path)
+    if fmt == "csv":
+        return pd.read_csv(path, **csv_kwargs)
+
+    _require_pyarrow()
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        return pq.read_table(path).to_pandas()
+
+    import pyarrow.feather as feather
+
+    return feather.read_table(path).to_pandas()
+
+
+def iter_table(path: Path, chunk_size: int, **csv_kwargs) -> Iterator[pd.DataFrame]:
+    """
+    Stream a CSV, Parquet or Arrow IPC file in chunks of at most chunk_size rows.
+    """
+    fmt = file_format(path)
+    if fmt == "csv":
+        with pd.read_csv(path, chunksize=chunk_size, **csv_kwargs) as reader:
+            yield from reader
+        return
+
+    _require_pyarrow()
+    if fmt == "parquet":
+        import pyarrow.dataset as ds
+
+        batches = ds.dataset(path, format="parquet").to_batches(batch_size=chunk_size)
+    else:
+        import pyarrow.ipc as ipc
+
+        reader = ipc.open_file(path)
+        batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+
+    for batch in batches:
+        # Arrow IPC batches keep the writer's size, so re-slice them to chunk_size
+        for offset in range(0, batch.num_rows, chunk_size):
+            yield batch.slice(offset, chunk_size).to_pandas()
+
+
+def write_processed(
+    df: pd.DataFrame,
+    path: Path,
+    fmt: str,
+    append: bool = False,
+    part: int = 0,
+    run_id: str | None = None,
+) -> None:
+    """
+    Write processed orders as CSV or as a Parquet dataset partitioned by
+    order_year/order_month.
+
+    With append=False any existing output is replaced; with append=True the
+    rows are added to it (used for later chunks in streaming mode). part
+    numbers the Parquet files so appended chunks never overwrite each other;
+    run_id goes into the file names too, so appending runs (incremental or
+    --watch) never overwrite the files of earlier runs.
+    """
+    path = Path(path)
+    if fmt == "csv":
+        path.parent.mkdir(parents=True, exist_ok=True)
+        write_header = not append or not path.exists()
+        df.to_csv(path, index=False, mode="a" if append else "w", header=write_header)
+        return
+
+    if fmt != "parquet":
+        raise ValueError(f"Unsupported processed data format: {fmt}")
+
+    _require_pyarrow()
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    if not append and path.exists():
+        shutil.rmtree(path)
+    path.mkdir(parents=True, exist_ok=True)
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    prefix = f"{run_id}-" if run_id else ""
+    pq.write_to_dataset(
+        table,
+        root_path=path,
+        partition_cols=PROCESSED_PARTITION_COLS,
+        basename_template=f"part-{prefix}{part:05d}-{{i}}.parquet",
+        existing_data_behavior="overwrite_or_ignore",
+    )
+
+
+class ChunkedTableWriter:
+    """
+    Write DataFrame chunks to a single CSV or Parquet file as they arrive.
+
+    Only the current chunk is held in memory. Output goes to a temporary
+    file that replaces path when the writer is closed without error, so a
+    failed export never leaves a truncated file behind. The Parquet schema
+    is taken from the first chunk.
+    """
+
+    def __init__(self, path: Path, fmt: str):
+        if fmt not in ("csv", "parquet"):
+            raise ValueError(f"Unsupported export format: {fmt}")
+        if fmt == "parquet":
+            _require_pyarrow()
+        self.path = Path(path)
+        self.fmt = fmt
+        self.rows = 0
+        self._tmp_path = self.path.with_name(self.path.name + ".tmp")
+        self._parquet_writer = None
+        self._started = False
+
+    def write(self, df: pd.DataFrame) -> None:
+        if not self._started:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.fmt == "csv":
+            df.to_csv(
+                self._tmp_path,
+                index=False,
+                mode="a" if self._started else "w",
+                header=not self._started,
+            )
+        else:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            if self._parquet_writer is None:
+                table = pa.Table.from_pandas(df, preserve_index=False)
+                self._parquet_writer = pq.ParquetWriter(self._tmp_path, table.schema)
+            else:
+                table = pa.Table.from_pandas(
+                    df, schema=self._parquet_writer.schema, preserve_index=False
+                )
+            self._parquet_writer.write_table(table)
+        self._started = True
+        self.rows += len(df)
+
+    def close(self) -> None:
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+        if self._started:
+            os.replace(self._tmp_path, self.path)
+
+    def abort(self) -> None:
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+        self._tmp_path.unlink(missing_ok=True)
+
+    def __enter__(self) -> "ChunkedTableWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def read_processed(path: Path, fmt: str) -> pd.DataFrame:
+    """
+    Read processed orders written by write_processed, in the order they
+    were written: Parquet files are read by file name, which starts with
+    the run id and part number.
+    """
+    if fmt == "csv":
+        return pd.read_csv(path, parse_dates=["order_date"])
+
+    _require_pyarrow()
+    import pyarrow.dataset as ds
+
+    files = ds.dataset(path, format="parquet", partitioning="hive").files
+    dataset = ds.dataset(
+        sorted(files, key=lambda file: Path(file).name),
+        format="parquet",
+        partitioning="hive",
+        partition_base_dir=str(path),
+    )
+    df = dataset.to_table().to_pandas()
+    for col in PROCESSED_PARTITION_COLS:
+        df[col] = df[col].astype("int64")
+    return df
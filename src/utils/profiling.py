@@ -0,0 +1,100 @@
+import cProfile
+import pstats
+import threading
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+from src.config import PROFILE_DIR, PROFILE_TOP_N
+from src.utils.logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+
+class StageProfiler:
+    """
+    Profile pipeline stages or reports one call at a time.
+
+    call(name, func, *args) runs func under cProfile and writes
+    <directory>/<name>.prof (open with `python -m pstats` or snakeviz)
+    and <name>.txt, the top functions by cumulative time. With memory=True
+    tracemalloc traces the whole run and every call also writes
+    <name>.alloc.txt: its peak traced memory and the top lines by memory
+    allocated (and still held) during the call.
+
+    Only one profiler can be active per thread and, from Python 3.12, per
+    process, so calls are serialized (and must not nest); callers run the
+    profiled work one call at a time.
+    """
+
+    def __init__(
+        self,
+        directory=None,
+        label: str = "run",
+        cpu: bool = True,
+        memory: bool = False,
+        top: int | None = None,
+    ):
+        stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S")
+        self.directory = Path(directory or PROFILE_DIR) / f"{stamp}-{label}"
+        self.cpu = cpu
+        self.memory = memory
+        self.top = top or PROFILE_TOP_N
+        self._lock = threading.Lock()
+        self._started_tracemalloc = False
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        self.directory.mkdir(parents=True, exist_ok=True)
+        logger.info("Writing profiles to %s", self.directory)
+
+    def call(self, name: str, func, *args, **kwargs):
+        with self._lock:
+            before = tracemalloc.take_snapshot() if self.memory else None
+            if self.memory:
+                tracemalloc.reset_peak()
+            profile = cProfile.Profile() if self.cpu else None
+            try:
+                if profile is not None:
+                    profile.enable()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    if profile is not None:
+                        profile.disable()
+            finally:
+                # Allocations first, so writing the CPU profile is not among them
+                if before is not None:
+                    self._write_allocations(name, before)
+                if profile is not None:
+                    self._write_cpu_profile(name, profile)
+
+    def _write_cpu_profile(self, name: str, profile: cProfile.Profile) -> None:
+        path = self.directory / f"{name}.prof"
+        profile.dump_stats(path)
+        with open(path.with_suffix(".txt"), "w", encoding="utf-8") as f:
+            pstats.Stats(profile, stream=f).sort_stats("cumulative").print_stats(self.top)
+        logger.info("CPU profile of %s -> %s", name, path)
+
+    def _write_allocations(self, name: str, before: tracemalloc.Snapshot) -> None:
+        _, peak = tracemalloc.get_traced_memory()
+        filters = [
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, cProfile.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ]
+        after = tracemalloc.take_snapshot().filter_traces(filters)
+        differences = after.compare_to(before.filter_traces(filters), "lineno")[: self.top]
+
+        path = self.directory / f"{name}.alloc.txt"
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f"{name}: peak traced memory {peak / 2**20:.1f} MiB\n")
+            f.write(f"Top {len(differences)} lines by memory allocated during the call:\n")
+            for difference in differences:
+                f.write(f"{difference}\n")
+        logger.info("Allocation profile of %s -> %s (peak %.1f MiB)", name, path, peak / 2**20)
+
+    def close(self) -> None:
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
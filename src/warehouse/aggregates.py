@@ -0,0 +1,276 @@
+import numpy as np
+import pandas as pd
+from sqlalchemy import bindparam, inspect, text
+
+from src.warehouse.partitions import FACT_TABLE
+from src.warehouse.versions import bump_data_version
+from src.utils.logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+# Summary tables behind the standard reports, one row per month and key.
+# The loader applies each batch's changes to the rows of the keys it touched
+# (see apply_fact_changes); "select" recomputes the table from the facts and
+# is used for rebuilds and consistency checks.
+AGGREGATES = {
+    "agg_revenue_month": {
+        "keys": ["year_month"],
+        "ddl": """
+        CREATE TABLE IF NOT EXISTS agg_revenue_month (
+            year_month TEXT NOT NULL,
+            revenue REAL NOT NULL,
+            order_count INTEGER NOT NULL,
+            PRIMARY KEY (year_month)
+        );
+        """,
+        "select": f"""
+        SELECT f.year_month, COALESCE(SUM(f.total_amount), 0) AS revenue, COUNT(*) AS order_count
+        FROM {FACT_TABLE} f
+        WHERE f.year_month IS NOT NULL {{condition}}
+        GROUP BY f.year_month
+        """,
+    },
+    "agg_revenue_product": {
+        "keys": ["year_month", "product_key"],
+        "ddl": """
+        CREATE TABLE IF NOT EXISTS agg_revenue_product (
+            year_month TEXT NOT NULL,
+            product_key INTEGER NOT NULL,
+            revenue REAL NOT NULL,
+            order_count INTEGER NOT NULL,
+            PRIMARY KEY (year_month, product_key)
+        );
+        """,
+        "select": f"""
+        SELECT f.year_month, f.product_key,
+            COALESCE(SUM(f.total_amount), 0) AS revenue, COUNT(*) AS order_count
+        FROM {FACT_TABLE} f
+        WHERE f.year_month IS NOT NULL AND f.product_key IS NOT NULL {{condition}}
+        GROUP BY f.year_month, f.product_key
+        """,
+    },
+    "agg_revenue_country": {
+        "keys": ["year_month", "country"],
+        "ddl": """
+        CREATE TABLE IF NOT EXISTS agg_revenue_country (
+            year_month TEXT NOT NULL,
+            country TEXT NOT NULL,
+            revenue REAL NOT NULL,
+            order_count INTEGER NOT NULL,
+            PRIMARY KEY (year_month, country)
+        );
+        """,
+        "select": f"""
+        SELECT f.year_month, c.country,
+            COALESCE(SUM(f.total_amount), 0) AS revenue, COUNT(*) AS order_count
+        FROM {FACT_TABLE} f
+        JOIN dim_customers c ON f.customer_key = c.customer_key
+        WHERE f.year_month IS NOT NULL AND c.country IS NOT NULL {{condition}}
+        GROUP BY f.year_month, c.country
+        """,
+    },
+}
+
+# Fact columns an order contributes to the aggregates with
+FACT_COLUMNS = ["order_id", "customer_key", "product_key", "year_month", "total_amount"]
+
+# Keys per IN (...) lookup of stored facts and customer countries
+LOOKUP_BATCH_SIZE = 500
+
+# Relative difference tolerated between stored and recomputed revenue, since
+# sums maintained batch by batch round differently from a single SUM
+REVENUE_TOLERANCE = 1e-9
+
+MISMATCH_COLUMNS = [
+    "aggregate",
+    "key",
+    "revenue_stored",
+    "order_count_stored",
+    "revenue_expected",
+    "order_count_expected",
+]
+
+
+def create_aggregate_tables(conn) -> None:
+    """
+    Create the AGGREGATES tables if they do not exist.
+    """
+    for spec in AGGREGATES.values():
+        conn.execute(text(spec["ddl"]))
+
+
+def _lookup(conn, query: str, keys: list) -> list:
+    statement = text(query).bindparams(bindparam("keys", expanding=True))
+    rows = []
+    for start in range(0, len(keys), LOOKUP_BATCH_SIZE):
+        rows += conn.execute(statement, {"keys": keys[start:start + LOOKUP_BATCH_SIZE]}).all()
+    return rows
+
+
+def read_fact_rows(conn, order_ids, table: str = FACT_TABLE) -> pd.DataFrame:
+    """
+    Return the FACT_COLUMNS of the stored orders among order_ids, read
+    from table (e.g. a month partition) by primary key.
+    """
+    ids = pd.Series(order_ids).dropna().astype("int64").unique().tolist()
+    rows = _lookup(
+        conn, f"SELECT {', '.join(FACT_COLUMNS)} FROM {table} WHERE order_id IN :keys", ids
+    )
+    return pd.DataFrame(rows, columns=FACT_COLUMNS)
+
+
+def _write_deltas(conn, table: str, deltas: pd.DataFrame) -> None:
+    """
+    Add revenue and order_count deltas to the rows of their keys.
+    """
+    keys = AGGREGATES[table]["keys"]
+    columns = keys + ["revenue", "order_count"]
+    conn.execute(
+        text(f"""
+            INSERT INTO {table} ({", ".join(columns)})
+            VALUES ({", ".join(f":{col}" for col in columns)})
+            ON CONFLICT ({", ".join(keys)}) DO UPDATE SET
+                revenue = {table}.revenue + excluded.revenue,
+                order_count = {table}.order_count + excluded.order_count
+        """),
+        deltas[columns].to_dict("records"),
+    )
+    conn.execute(text(f"DELETE FROM {table} WHERE order_count = 0"))
+
+
+def apply_fact_changes(conn, old: pd.DataFrame | None, new: pd.DataFrame) -> int:
+    """
+    Update the aggregates for a batch that replaced the fact rows old with new.
+
+    old holds the stored versions of the batch's orders before the write
+    (see read_fact_rows), new the rows written; both need FACT_COLUMNS.
+    Each old row is subtracted and each new row added, so only the month,
+    product and country rows the batch touched are written and the work is
+    proportional to the batch, not to the fact table.
+
+    Returns:
+        The number of aggregate rows written.
+    """
+    create_aggregate_tables(conn)
+    parts = [new[FACT_COLUMNS].assign(sign=1)]
+    if old is not None and not old.empty:
+        parts.append(old[FACT_COLUMNS].assign(sign=-1))
+    rows = pd.concat(parts, ignore_index=True)
+    rows["revenue"] = rows["total_amount"].astype("float64").fillna(0.0) * rows["sign"]
+    rows["order_count"] = rows["sign"]
+
+    customer_keys = rows["customer_key"].dropna().astype("int64").unique().tolist()
+    countries = dict(_lookup(
+        conn,
+        "SELECT customer_key, country FROM dim_customers WHERE customer_key IN :keys",
+        customer_keys,
+    ))
+    rows["country"] = rows["customer_key"].map(countries)
+    rows["product_key"] = rows["product_key"].astype("Int64")
+
+    written = 0
+    for table, spec in AGGREGATES.items():
+        deltas = rows.groupby(spec["keys"], as_index=False)[["revenue", "order_count"]].sum()
+        # Unchanged orders cancel out and leave nothing to write
+        deltas = deltas[(deltas["order_count"] != 0) | ~np.isclose(deltas["revenue"], 0.0)]
+        if deltas.empty:
+            continue
+        deltas = deltas.astype(object).where(deltas.notna(), None)
+        _write_deltas(conn, table, deltas)
+        written += len(deltas)
+    return written
+
+
+def clear_aggregates(conn, year_month: str | None = None) -> None:
+    """
+    Delete all aggregate rows, or only those of one "YYYY-MM" month.
+    """
+    create_aggregate_tables(conn)
+    for table in AGGREGATES:
+        if year_month is None:
+            conn.execute(text(f"DELETE FROM {table}"))
+        else:
+            conn.execute(text(f"DELETE FROM {table} WHERE year_month = :month"), {"month": year_month})
+
+
+def build_aggregates(conn, suffix: str) -> None:
+    """
+    Compute every aggregate into new tables named <aggregate><suffix> from
+    the fact and customer tables named with the same suffix, e.g. the
+    staging copies, which are then swapped in with them.
+    """
+    for table, spec in AGGREGATES.items():
+        target = f"{table}{suffix}"
+        columns = spec["keys"] + ["revenue", "order_count"]
+        select = (
+            spec["select"].format(condition="")
+            .replace(f"FROM {FACT_TABLE} f", f"FROM {FACT_TABLE}{suffix} f")
+            .replace("JOIN dim_customers c", f"JOIN dim_customers{suffix} c")
+        )
+        conn.execute(text(f"DROP TABLE IF EXISTS {target}"))
+        conn.execute(text(spec["ddl"].replace(table, target)))
+        conn.execute(text(f"INSERT INTO {target} ({', '.join(columns)}) " + select))
+    logger.info("Built report aggregates from the %s tables.", suffix)
+
+
+def _has_facts(conn) -> bool:
+    inspector = inspect(conn)
+    return FACT_TABLE in inspector.get_table_names() + inspector.get_view_names()
+
+
+def rebuild_aggregates(conn, year_month: str | None = None) -> None:
+    """
+    Recompute the aggregates from the fact table, entirely or for one month.
+
+    Used where a load rewrites facts wholesale (staging swaps, month
+    reloads) instead of batch by batch.
+    """
+    clear_aggregates(conn, year_month)
+    bump_data_version(conn, AGGREGATES)
+    if not _has_facts(conn):
+        return
+    condition = "AND f.year_month = :month" if year_month is not None else ""
+    for table, spec in AGGREGATES.items():
+        columns = spec["keys"] + ["revenue", "order_count"]
+        conn.execute(
+            text(f"INSERT INTO {table} ({', '.join(columns)}) "
+                 + spec["select"].format(condition=condition)),
+            {"month": year_month} if year_month is not None else {},
+        )
+    logger.info("Rebuilt report aggregates%s.", f" for {year_month}" if year_month else "")
+
+
+def check_aggregates(conn) -> pd.DataFrame:
+    """
+    Compare every aggregate table with a recomputation from the fact table.
+
+    Returns:
+        One row per mismatching key with the aggregate table, the key
+        values, and the stored and expected revenue and order count
+        (missing rows show up with NaN); empty if all aggregates match.
+    """
+    mismatches = []
+    for table, spec in AGGREGATES.items():
+        keys = spec["keys"]
+        stored = pd.read_sql_query(
+            text(f"SELECT {', '.join(keys)}, revenue, order_count FROM {table}"), conn
+        )
+        expected = pd.read_sql_query(text(spec["select"].format(condition="")), conn)
+        merged = stored.merge(
+            expected, on=keys, how="outer", suffixes=("_stored", "_expected")
+        )
+        revenue_ok = np.isclose(
+            merged["revenue_stored"],
+            merged["revenue_expected"],
+            rtol=REVENUE_TOLERANCE,
+            atol=REVENUE_TOLERANCE,
+        )
+        count_ok = merged["order_count_stored"] == merged["order_count_expected"]
+        bad = merged[~(revenue_ok & count_ok)]
+        if not bad.empty:
+            bad = bad.assign(aggregate=table, key=bad[keys].astype(str).agg("/".join, axis=1))
+            mismatches.append(bad.drop(columns=keys))
+
+    if not mismatches:
+        return pd.DataFrame(columns=MISMATCH_COLUMNS)
+    return pd.concat(mismatches, ignore_index=True)[MISMATCH_COLUMNS]
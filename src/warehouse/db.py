@@ -1,8 +1,132 @@
-from sqlalchemy import create_engine
-from src.config import DB_URL
+import os
+import threading
+from contextlib import contextmanager, nullcontext
 
-def get_engine():
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from src.config import (
+    DB_URL,
+    DB_MAX_OVERFLOW,
+    DB_POOL_PRE_PING,
+    DB_POOL_SIZE,
+    SQLITE_CONNECT_PRAGMAS,
+)
+from src.utils.logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+# One engine (and connection pool) per database URL for the whole process
+_ENGINES: dict[str, Engine] = {}
+_ENGINES_LOCK = threading.Lock()
+
+# One lock per SQLite engine serializing write transactions across threads
+_WRITE_LOCKS: dict[int, threading.RLock] = {}
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """
+    Apply SQLITE_CONNECT_PRAGMAS to every new SQLite DBAPI connection.
+    """
+    # Hand transaction control to _begin_sqlite_transaction
+    dbapi_connection.isolation_level = None
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in SQLITE_CONNECT_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+    finally:
+        cursor.close()
+
+
+def _begin_sqlite_transaction(conn):
+    """
+    Emit BEGIN ourselves: the sqlite3 driver only opens transactions before
+    DML, which would leave DDL (renames, drops) outside the transaction.
+    """
+    if conn.get_execution_options().get("isolation_level") != "AUTOCOMMIT":
+        conn.exec_driver_sql("BEGIN")
+
+
+def _create_engine(url: str) -> Engine:
+    parsed = make_url(url)
+    options = {"echo": False, "future": True, "pool_pre_ping": DB_POOL_PRE_PING}
+    # In-memory SQLite uses a single-connection pool without size settings
+    if not (parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:")):
+        options.update(pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW)
+
+    engine = create_engine(url, **options)
+    if engine.dialect.name == "sqlite":
+        event.listen(engine, "connect", _set_sqlite_pragmas)
+        event.listen(engine, "begin", _begin_sqlite_transaction)
+    logger.info("Created engine for %s", parsed.render_as_string(hide_password=True))
+    return engine
+
+
+def get_engine(url: str | None = None) -> Engine:
+    """
+    Return the shared SQLAlchemy engine for url (default: DB_URL from config).
+
+    Engines are created once per URL and process and then reused, so
+    connections come from one pool instead of being set up on every call.
     """
-    Return a SQLAlchemy engine for the SQLite database.
+    url = url or DB_URL
+    with _ENGINES_LOCK:
+        engine = _ENGINES.get(url)
+        if engine is None:
+            engine = _ENGINES[url] = _create_engine(url)
+    return engine
+
+
+def write_lock(engine: Engine):
+    """
+    Return the lock that write transactions on engine hold, or a no-op
+    context for databases that handle concurrent writers themselves.
+
+    SQLite allows one writer at a time, and a WAL transaction that read
+    before another writer committed fails with SQLITE_BUSY_SNAPSHOT
+    instead of waiting, so threads loading different tables in parallel
+    take turns on this lock.
     """
-    return create_engine(DB_URL, echo=False, future=True)
+    if engine.dialect.name != "sqlite":
+        return nullcontext()
+    with _ENGINES_LOCK:
+        return _WRITE_LOCKS.setdefault(id(engine), threading.RLock())
+
+
+@contextmanager
+def read_only_connection(engine: Engine | None = None):
+    """
+    Yield a pooled connection that rejects writes for the duration of the block.
+
+    SQLite enforces this with PRAGMA query_only (reset before the connection
+    goes back to the pool), PostgreSQL with a read-only transaction.
+    """
+    engine = engine or get_engine()
+    with engine.connect() as conn:
+        if engine.dialect.name == "sqlite":
+            conn.exec_driver_sql("PRAGMA query_only = ON")
+            try:
+                yield conn
+            finally:
+                conn.exec_driver_sql("PRAGMA query_only = OFF")
+            return
+        if engine.dialect.name == "postgresql":
+            conn.exec_driver_sql("SET TRANSACTION READ ONLY")
+        yield conn
+
+
+def dispose_engines(close: bool = True) -> None:
+    """
+    Dispose of all registered engines and empty the registry.
+
+    close=False drops the pooled connections without closing them, which is
+    what a forked child must do with connections owned by its parent.
+    """
+    with _ENGINES_LOCK:
+        engines = list(_ENGINES.values())
+        _ENGINES.clear()
+    for engine in engines:
+        engine.dispose(close=close)
+
+
+# Worker processes forked from the pipeline must not reuse the parent's connections
+os.register_at_fork(after_in_child=lambda: dispose_engines(close=False))
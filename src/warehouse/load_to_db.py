@@ -1,82 +1,854 @@
-from sqlalchemy import text
-from src.warehouse.db import get_engine
+import re
+from contextlib import contextmanager
+from datetime import datetime
 
-def create_schema():
-    """
-    Create dim_customers, dim_products, and fact_orders tables if they do not exist.
-    """
-    engine = get_engine()
-    with engine.begin() as conn:
-        # Dimension table: customers
-        conn.execute(text("""
+import numpy as np
+import pandas as pd
+from sqlalchemy import bindparam, inspect, text
+from src.config import FACT_PARTITIONING, LOAD_BATCH_SIZE, LOAD_MODE
+from src.warehouse.aggregates import (
+    AGGREGATES,
+    apply_fact_changes,
+    clear_aggregates,
+    read_fact_rows,
+    rebuild_aggregates,
+)
+from src.warehouse.db import get_engine, write_lock
+from src.warehouse.migrations import apply_migrations, fact_index_statements
+from src.warehouse.partitions import (
+    date_bounds,
+    list_partitions,
+    order_months,
+    partition_name,
+)
+from src.warehouse.versions import bump_data_version
+from src.utils.logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+# Declared warehouse tables: primary key, column list, DDL and secondary indexes.
+# Dimensions are SCD Type 2: one row per version of a member, identified by a
+# surrogate key, with the natural key, a hash of the attributes and the
+# validity interval (valid_to is NULL for the current version).
+TABLES = {
+    "dim_customers": {
+        "key": "customer_key",
+        "natural_key": "customer_id",
+        "attributes": ["customer_name", "country"],
+        "columns": [
+            "customer_key",
+            "customer_id",
+            "customer_name",
+            "country",
+            "row_hash",
+            "valid_from",
+            "valid_to",
+        ],
+        "ddl": """
         CREATE TABLE IF NOT EXISTS dim_customers (
-            customer_id INTEGER PRIMARY KEY,
+            customer_key INTEGER PRIMARY KEY,
+            customer_id INTEGER NOT NULL,
             customer_name TEXT,
-            country TEXT
+            country TEXT,
+            row_hash INTEGER NOT NULL,
+            valid_from TEXT NOT NULL,
+            valid_to TEXT
         );
-        """))
-
-        # Dimension table: products
-        conn.execute(text("""
+        """,
+        "indexes": [
+            """
+            CREATE UNIQUE INDEX IF NOT EXISTS ux_dim_customers_current
+            ON dim_customers (customer_id) WHERE valid_to IS NULL
+            """,
+        ],
+    },
+    "dim_products": {
+        "key": "product_key",
+        "natural_key": "product_id",
+        "attributes": ["product_name", "category"],
+        "columns": [
+            "product_key",
+            "product_id",
+            "product_name",
+            "category",
+            "row_hash",
+            "valid_from",
+            "valid_to",
+        ],
+        "ddl": """
         CREATE TABLE IF NOT EXISTS dim_products (
-            product_id INTEGER PRIMARY KEY,
+            product_key INTEGER PRIMARY KEY,
+            product_id INTEGER NOT NULL,
             product_name TEXT,
-            category TEXT
+            category TEXT,
+            row_hash INTEGER NOT NULL,
+            valid_from TEXT NOT NULL,
+            valid_to TEXT
         );
-        """))
-
-        # Fact table: orders
-        conn.execute(text("""
+        """,
+        "indexes": [
+            """
+            CREATE UNIQUE INDEX IF NOT EXISTS ux_dim_products_current
+            ON dim_products (product_id) WHERE valid_to IS NULL
+            """,
+        ],
+    },
+    "fact_orders": {
+        "key": "order_id",
+        "columns": [
+            "order_id",
+            "customer_id",
+            "product_id",
+            "customer_key",
+            "product_key",
+            "order_date",
+            "year_month",
+            "quantity",
+            "unit_price",
+            "total_amount",
+        ],
+        "ddl": """
         CREATE TABLE IF NOT EXISTS fact_orders (
             order_id INTEGER PRIMARY KEY,
             customer_id INTEGER,
             product_id INTEGER,
+            customer_key INTEGER,
+            product_key INTEGER,
             order_date TEXT,
+            year_month TEXT,
             quantity INTEGER,
             unit_price REAL,
             total_amount REAL,
-            FOREIGN KEY (customer_id) REFERENCES dim_customers(customer_id),
-            FOREIGN KEY (product_id) REFERENCES dim_products(product_id)
+            FOREIGN KEY (customer_key) REFERENCES dim_customers(customer_key),
+            FOREIGN KEY (product_key) REFERENCES dim_products(product_key)
         );
-        """))
+        """,
+        "indexes": fact_index_statements(),
+    },
+}
+DIMENSIONS = ("dim_customers", "dim_products")
+
+# Tables whose data version (see src.warehouse.versions) a fact load bumps
+FACT_VERSION_TABLES = ("fact_orders", *AGGREGATES)
+
+# Natural keys per IN (...) lookup of current dimension versions
+KEY_LOOKUP_BATCH_SIZE = 500
+
+# Load mode "swap" writes into <table>_staging copies that are swapped into
+# place at the end of the run (see src.warehouse.staging)
+STAGING_SUFFIX = "_staging"
+
 
-def load_dimensions(df):
+def physical_table(table, staging=False):
     """
-    Build and load dim_customers and dim_products from the transformed DataFrame.
+    Return the table actually written for a declared table.
     """
-    from src.warehouse.db import get_engine  # avoid circular import
-    engine = get_engine()
+    return f"{table}{STAGING_SUFFIX}" if staging else table
 
-    # Build customer dimension
-    dim_customers = df[["customer_id", "customer_name", "country"]].drop_duplicates().copy()
 
-    # Build product dimension
-    dim_products = df[["product_id", "product_name", "category"]].drop_duplicates().copy()
+_INDEX_PATTERN = re.compile(r"INDEX IF NOT EXISTS (\w+)\s+ON (\w+)")
 
-    # Load into database (replace each time)
-    dim_customers.to_sql("dim_customers", engine, if_exists="replace", index=False)
-    dim_products.to_sql("dim_products", engine, if_exists="replace", index=False)
 
-def load_fact_orders(df):
+def index_statements(conn, table, staging=False) -> list[str]:
     """
-    Load transformed orders DataFrame into the fact_orders table.
+    Return the CREATE INDEX statements of the declared indexes that the
+    live (or staging) copy of table still lacks.
+
+    A staging swap renames tables but not their indexes, so after a swap
+    the live table's indexes carry the staging names and the next staging
+    copy takes the declared ones. Each index counts as present under
+    either name and is created under whichever is free.
+    """
+    physical = physical_table(table, staging)
+    staging_table = physical_table(table, staging=True)
+    inspector = inspect(conn)
+    owners = {}
+    for name in {table, staging_table, f"{table}_old"} & set(inspector.get_table_names()):
+        for index in inspector.get_indexes(name):
+            owners[index["name"]] = name
+
+    statements = []
+    for statement in TABLES[table]["indexes"]:
+        declared = _INDEX_PATTERN.search(statement).group(1)
+        names = [declared, declared.replace(table, staging_table)]
+        if any(owners.get(name) == physical for name in names):
+            continue
+        if staging:
+            names.reverse()
+        name = names[1] if names[0] in owners else names[0]
+        statements.append(_INDEX_PATTERN.sub(f"INDEX IF NOT EXISTS {name} ON {physical}", statement))
+    return statements
+
+# Timestamps are stored in the same text format DataFrame.to_sql used
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+
+
+def _restore_primary_key(conn, table):
+    """
+    Rebuild a table that lost its primary key (e.g. after a to_sql replace load).
+    """
+    spec = TABLES[table]
+    columns = ", ".join(spec["columns"])
+    if conn.dialect.name != "sqlite":
+        raise RuntimeError(
+            f"Table {table} has no primary key; recreate it from create_schema() before loading"
+        )
+    logger.warning("Table %s has no primary key; rebuilding it from the declared schema.", table)
+    conn.execute(text(f"ALTER TABLE {table} RENAME TO {table}_legacy"))
+    conn.execute(text(spec["ddl"]))
+    # Keep the last row per key, matching upsert semantics
+    conn.execute(text(f"""
+        INSERT INTO {table} ({columns})
+        SELECT {columns} FROM {table}_legacy
+        WHERE rowid IN (SELECT MAX(rowid) FROM {table}_legacy GROUP BY {spec["key"]})
+    """))
+    conn.execute(text(f"DROP TABLE {table}_legacy"))
+
+
+@contextmanager
+def _transaction(conn=None, engine=None):
+    """
+    Yield conn as-is when the caller already manages the transaction,
+    otherwise open a new connection and transaction on engine (default:
+    the shared engine).
+    """
+    if conn is not None:
+        yield conn
+        return
+    engine = engine or get_engine()
+    with write_lock(engine), engine.begin() as new_conn:
+        yield new_conn
+
+
+def _upgrade_dimension(conn, table):
+    """
+    Convert a dimension table from before SCD2 versioning (one row per
+    natural key, no hash or validity columns) into current versions.
+    """
+    spec = TABLES[table]
+    natural_key = spec["natural_key"]
+    logger.warning("Table %s predates SCD2 versioning; converting its rows to versions.", table)
+    members = pd.read_sql_query(
+        text(f"SELECT {natural_key}, {', '.join(spec['attributes'])} FROM {table}"), conn
+    ).drop_duplicates(natural_key, keep="last")
+    conn.execute(text(f"DROP TABLE {table}"))
+    conn.execute(text(spec["ddl"]))
+    members["row_hash"] = row_hashes(members, spec["attributes"])
+    _insert_versions(conn, table, members, datetime.utcnow())
+
+
+def _deferred(conn, statements):
+    """
+    Return the index statements to run now: inside sqlite_bulk_load only
+    the unique ones, since the secondary indexes are built when it ends.
+    """
+    if not conn.info.get(BULK_LOAD_INFO_KEY):
+        return list(statements)
+    return [statement for statement in statements if "UNIQUE INDEX" in statement]
+
+
+def _ensure_table(conn, table):
+    """
+    Create one declared table and its indexes, upgrading an older layout in place.
+    """
+    spec = TABLES[table]
+    conn.execute(text(spec["ddl"]))
+    existing = {column["name"] for column in inspect(conn).get_columns(table)}
+
+    if "natural_key" in spec and "row_hash" not in existing:
+        _upgrade_dimension(conn, table)
+    elif not inspect(conn).get_pk_constraint(table)["constrained_columns"]:
+        _restore_primary_key(conn, table)
+
+    for index in _deferred(conn, index_statements(conn, table)):
+        conn.execute(text(index))
+
+
+def _ensure_partition(conn, name):
+    """
+    Create a fact_orders month partition with the fact table's columns and indexes.
+    """
+    spec = TABLES["fact_orders"]
+    for statement in [spec["ddl"], *_deferred(conn, spec["indexes"])]:
+        conn.execute(text(statement.replace("fact_orders", name)))
+
+
+def _refresh_fact_view(conn):
+    """
+    (Re)create the fact_orders view as the UNION ALL of all month partitions.
+    """
+    columns = TABLES["fact_orders"]["columns"]
+    partitions = list(list_partitions(conn).values())
+    if partitions:
+        body = " UNION ALL ".join(
+            f"SELECT {', '.join(columns)} FROM {table}" for table in partitions
+        )
+    else:
+        body = f"SELECT {', '.join(f'NULL AS {col}' for col in columns)} WHERE 1 = 0"
+    conn.execute(text("DROP VIEW IF EXISTS fact_orders"))
+    conn.execute(text(f"CREATE VIEW fact_orders AS {body}"))
+
+
+def _partition_fact_table(conn):
+    """
+    Move the rows of a monolithic fact_orders table into month partitions.
+    """
+    columns = ", ".join(TABLES["fact_orders"]["columns"])
+    _ensure_table(conn, "fact_orders")
+    months = conn.execute(
+        text("SELECT DISTINCT substr(order_date, 1, 7) FROM fact_orders")
+    ).scalars()
+    months = [month for month in months if month]
+    logger.warning("Moving fact_orders into %d month partitions.", len(months))
+    for month in months:
+        name = partition_name(month)
+        _ensure_partition(conn, name)
+        conn.execute(
+            text(f"""
+                INSERT INTO {name} ({columns})
+                SELECT {columns} FROM fact_orders WHERE substr(order_date, 1, 7) = :month
+            """),
+            {"month": month},
+        )
+    conn.execute(text("DROP TABLE fact_orders"))
+
+
+def _merge_fact_partitions(conn):
+    """
+    Replace the fact_orders view and its month partitions with one table.
+    """
+    columns = ", ".join(TABLES["fact_orders"]["columns"])
+    partitions = list(list_partitions(conn).values())
+    logger.warning("Merging %d fact_orders partitions into one table.", len(partitions))
+    conn.execute(text("DROP VIEW fact_orders"))
+    conn.execute(text(TABLES["fact_orders"]["ddl"]))
+    for table in partitions:
+        conn.execute(text(f"INSERT INTO fact_orders ({columns}) SELECT {columns} FROM {table}"))
+        conn.execute(text(f"DROP TABLE {table}"))
+
+
+def create_schema(conn=None, engine=None, partitioning=None):
+    """
+    Create dim_customers, dim_products, and fact_orders tables if they do not exist.
+
+    Tables that exist without their primary key are rebuilt so upserts can
+    rely on it; tables from before dimension versioning are upgraded.
+
+    partitioning="month" (default: FACT_PARTITIONING from config) stores
+    facts in one table per order month behind a fact_orders UNION ALL view;
+    an existing fact table is moved into partitions, and back again when
+    partitioning is switched off.
+
+    Pending versioned migrations (see src.warehouse.migrations) are applied
+    to existing tables before the layout is checked.
+    """
+    partitioning = partitioning or FACT_PARTITIONING
+    with _transaction(conn, engine) as conn:
+        for table in DIMENSIONS:
+            _ensure_table(conn, table)
+        apply_migrations(conn)
+
+        fact_is_view = "fact_orders" in inspect(conn).get_view_names()
+        if partitioning == "month":
+            if not fact_is_view and "fact_orders" in inspect(conn).get_table_names():
+                _partition_fact_table(conn)
+            _refresh_fact_view(conn)
+        else:
+            if fact_is_view:
+                _merge_fact_partitions(conn)
+            _ensure_table(conn, "fact_orders")
+
+# Set in Connection.info of the connection sqlite_bulk_load yields
+BULK_LOAD_INFO_KEY = "sqlite_bulk_load"
+
+# PRAGMAs relaxed by sqlite_bulk_load, with the values used during the load
+BULK_LOAD_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "OFF",
+    "cache_size": "-262144",  # 256 MiB
+    "temp_store": "MEMORY",
+}
+
+
+@contextmanager
+def sqlite_bulk_load(engine=None):
+    """
+    Fast path for bulk loads into SQLite.
+
+    For the duration of the block: WAL journal, synchronous=OFF, a large
+    page cache and in-memory temp store; secondary indexes on the warehouse
+    tables are dropped (unique indexes stay, since loads rely on them), and
+    create_schema does not create them on the yielded connection, not even
+    for new tables or month partitions; and everything runs in one
+    transaction on the yielded connection. Afterwards the dropped and all
+    declared indexes are built, ANALYZE refreshes planner statistics and
+    the original PRAGMAs are restored.
+
+    Pass the yielded connection as conn= to create_schema, load_dimensions
+    and load_fact_orders.
+    """
+    engine = engine or get_engine()
+    if engine.dialect.name != "sqlite":
+        raise ValueError("sqlite_bulk_load only supports SQLite databases")
+
+    # AUTOCOMMIT stops the driver from opening transactions implicitly, so
+    # PRAGMAs apply immediately and BEGIN/COMMIT below are the only transaction
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        original = {
+            name: conn.exec_driver_sql(f"PRAGMA {name}").scalar()
+            for name in BULK_LOAD_PRAGMAS
+        }
+        for name, value in BULK_LOAD_PRAGMAS.items():
+            conn.exec_driver_sql(f"PRAGMA {name} = {value}")
+
+        tables = ", ".join(f"'{table}'" for table in TABLES)
+        indexes = conn.exec_driver_sql(
+            "SELECT name, sql FROM sqlite_master "
+            "WHERE type = 'index' AND sql IS NOT NULL AND sql NOT LIKE 'CREATE UNIQUE%' "
+            f"AND (tbl_name IN ({tables}) OR tbl_name LIKE 'fact_orders_p%')"
+        ).all()
+        for name, _ in indexes:
+            conn.exec_driver_sql(f"DROP INDEX {name}")
+        logger.info(
+            "SQLite bulk load: relaxed PRAGMAs and dropped %d secondary indexes.", len(indexes)
+        )
+
+        conn.info[BULK_LOAD_INFO_KEY] = True
+        try:
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.exec_driver_sql("ROLLBACK")
+                raise
+            conn.exec_driver_sql("COMMIT")
+        finally:
+            # info belongs to the pooled DBAPI connection and outlives this block
+            conn.info.pop(BULK_LOAD_INFO_KEY, None)
+            statements = [
+                sql.replace("CREATE INDEX", "CREATE INDEX IF NOT EXISTS", 1) for _, sql in indexes
+            ]
+            for statement in statements:
+                conn.exec_driver_sql(statement)
+            # Tables and partitions created during the load have none yet
+            existing = set(inspect(conn).get_table_names())
+            declared = [
+                statement
+                for table in TABLES if table in existing
+                for statement in index_statements(conn, table)
+            ]
+            for partition in list_partitions(conn).values():
+                declared += fact_index_statements(partition)
+            for statement in declared:
+                conn.exec_driver_sql(statement)
+            conn.exec_driver_sql("ANALYZE")
+            for name, value in original.items():
+                conn.exec_driver_sql(f"PRAGMA {name} = {value}")
+            logger.info(
+                "SQLite bulk load: built %d indexes, ran ANALYZE and restored PRAGMAs.",
+                len(statements) + len(declared),
+            )
+
+
+def _to_rows(df):
+    """
+    Convert a DataFrame to a list of tuples of plain Python values for executemany.
+
+    Works column by column, which is much cheaper than DataFrame.to_dict.
+    """
+    columns = []
+    for col in df.columns:
+        values = df[col]
+        if pd.api.types.is_datetime64_any_dtype(values):
+            values = values.dt.strftime(DATE_FORMAT)
+        values = values.astype(object)
+        columns.append(values.where(values.notna(), None).tolist())
+    return list(zip(*columns))
+
+
+_PLACEHOLDERS = {"qmark": "?", "format": "%s", "pyformat": "%s"}
+
+
+def _placeholder(dialect):
+    placeholder = _PLACEHOLDERS.get(dialect.paramstyle)
+    if placeholder is None:
+        raise ValueError(f"Unsupported DBAPI paramstyle for bulk writes: {dialect.paramstyle}")
+    return placeholder
+
+
+def upsert_rows(df, table, batch_size=None, engine=None, conn=None, target=None):
+    """
+    Write rows into an existing table with batched INSERT ... ON CONFLICT DO UPDATE.
+
+    table names the declared table whose columns and key are used; target,
+    if given, is the table actually written (e.g. a fact_orders partition).
+
+    Each batch is one prepared statement executed with the driver's
+    executemany inside its own transaction, or inside the caller's
+    transaction when conn is given. Rows whose values already match the
+    stored row are skipped by the DO UPDATE ... WHERE clause, so only new
+    or changed rows are written.
+
+    Returns:
+        The number of rows inserted or updated.
+    """
+    spec = TABLES[table]
+    key = spec["key"]
+    columns = spec["columns"]
+    table = target or table
+    batch_size = batch_size or LOAD_BATCH_SIZE
+    if conn is None:
+        engine = engine or get_engine()
+    dialect = (conn if conn is not None else engine).dialect
+
+    distinct = "IS DISTINCT FROM" if dialect.name == "postgresql" else "IS NOT"
+    placeholder = _placeholder(dialect)
+    attributes = [col for col in columns if col != key]
+    statement = f"""
+        INSERT INTO {table} ({", ".join(columns)})
+        VALUES ({", ".join(placeholder for _ in columns)})
+        ON CONFLICT ({key}) DO UPDATE SET
+            {", ".join(f"{col} = excluded.{col}" for col in attributes)}
+        WHERE {" OR ".join(f"{table}.{col} {distinct} excluded.{col}" for col in attributes)}
+    """
+
+    written = 0
+    for start in range(0, len(df), batch_size):
+        rows = _to_rows(df.iloc[start:start + batch_size][columns])
+        with _transaction(conn, engine) as batch_conn:
+            result = batch_conn.exec_driver_sql(statement, rows)
+            written += max(result.rowcount, 0)
+
+    logger.info("Upserted %d new or changed rows of %d into %s", written, len(df), table)
+    return written
+
+
+def row_hashes(df, columns):
+    """
+    Return a signed 64-bit hash per row over the given attribute columns.
+
+    Values are hashed as plain Python objects, so categorical batches and
+    rows read back from the database hash identically.
+    """
+    hashes = pd.util.hash_pandas_object(df[columns].astype(object), index=False)
+    return hashes.to_numpy(dtype=np.uint64).view(np.int64)
+
+
+def current_versions(conn, table, natural_keys, target=None):
+    """
+    Return {natural key: (surrogate key, row hash)} for the current versions
+    of the given members, looked up through the current-version index.
+
+    target, if given, is the table read instead of table (e.g. its staging copy).
+    """
+    spec = TABLES[table]
+    natural_key = spec["natural_key"]
+    query = text(f"""
+        SELECT {natural_key}, {spec["key"]}, row_hash FROM {target or table}
+        WHERE {natural_key} IN :keys AND valid_to IS NULL
+    """).bindparams(bindparam("keys", expanding=True))
+
+    versions = {}
+    for start in range(0, len(natural_keys), KEY_LOOKUP_BATCH_SIZE):
+        keys = natural_keys[start:start + KEY_LOOKUP_BATCH_SIZE]
+        for member, key, row_hash in conn.execute(query, {"keys": keys}):
+            versions[member] = (key, row_hash)
+    return versions
+
+
+def _insert_versions(conn, table, members, valid_from, target=None):
     """
-    from src.warehouse.db import get_engine
-    engine = get_engine()
-
-    df_to_load = df[[
-        "order_id",
-        "customer_id",
-        "product_id",
-        "order_date",
-        "quantity",
-        "unit_price",
-        "total_amount"
-    ]].copy()
-
-    df_to_load.to_sql(
-        "fact_orders",
-        engine,
-        if_exists="replace",
-        index=False
+    Insert members (natural key, attributes, row_hash) as new current
+    versions with consecutive surrogate keys.
+    """
+    if members.empty:
+        return
+    spec = TABLES[table]
+    key = spec["key"]
+    table = target or table
+    next_key = conn.execute(text(f"SELECT COALESCE(MAX({key}), 0) FROM {table}")).scalar_one() + 1
+    rows = members.assign(
+        **{key: np.arange(next_key, next_key + len(members))},
+        valid_from=valid_from.strftime(DATE_FORMAT),
+        valid_to=None,
+    )
+    placeholder = _placeholder(conn.dialect)
+    conn.exec_driver_sql(
+        f"INSERT INTO {table} ({', '.join(spec['columns'])}) "
+        f"VALUES ({', '.join(placeholder for _ in spec['columns'])})",
+        _to_rows(rows[spec["columns"]]),
     )
+
+
+def load_dimension_versions(df, table, as_of=None, conn=None, engine=None, target=None):
+    """
+    Load one SCD Type 2 dimension from the members in df.
+
+    Each member's attributes are hashed and compared with the hash of its
+    current version. Unchanged members are skipped; for changed members the
+    current version is closed (valid_to = as_of) and a new version with a
+    new surrogate key is inserted, as it is for new members. The work done
+    is proportional to the number of distinct members in df, not to the
+    size of the dimension.
+
+    target, if given, is the table written instead of table.
+
+    Returns:
+        The number of versions inserted.
+    """
+    spec = TABLES[table]
+    natural_key = spec["natural_key"]
+    as_of = as_of or datetime.utcnow()
+
+    members = df[[natural_key] + spec["attributes"]].dropna(subset=[natural_key])
+    members = members.drop_duplicates(natural_key, keep="last")
+    members = members.assign(row_hash=row_hashes(members, spec["attributes"]))
+
+    with _transaction(conn, engine) as conn:
+        stored = current_versions(conn, table, members[natural_key].tolist(), target)
+        stored_hashes = pd.Series(
+            {member: row_hash for member, (_, row_hash) in stored.items()}, dtype="Int64"
+        ).reindex(members[natural_key].to_numpy())
+        is_new = stored_hashes.isna().to_numpy()
+        is_changed = ~is_new & (
+            stored_hashes.fillna(0).to_numpy(dtype=np.int64) != members["row_hash"].to_numpy()
+        )
+
+        changed_members = members.loc[is_changed, natural_key].tolist()
+        if changed_members:
+            conn.execute(
+                text(f"""
+                    UPDATE {target or table} SET valid_to = :as_of
+                    WHERE {natural_key} = :member AND valid_to IS NULL
+                """),
+                [
+                    {"as_of": as_of.strftime(DATE_FORMAT), "member": member}
+                    for member in changed_members
+                ],
+            )
+        _insert_versions(
+            conn, table, members[is_new | is_changed], as_of, target
+        )
+
+    logger.info(
+        "Loaded %s: %d new and %d changed members of %d.",
+        target or table,
+        is_new.sum(),
+        len(changed_members),
+        len(members),
+    )
+    return int(is_new.sum()) + len(changed_members)
+
+
+def load_dimensions(
+    df, if_exists="replace", mode=None, conn=None, engine=None, as_of=None, tables=None
+):
+    """
+    Load dim_customers and dim_products from the transformed DataFrame.
+
+    Both dimensions are SCD Type 2 (see load_dimension_versions): only new
+    or changed members are written, and changes become new versions valid
+    from as_of (default: now, UTC). mode="replace" (default: LOAD_MODE from
+    config) with if_exists="replace" empties the dimensions first, so the
+    load starts a new history; otherwise versions are merged into the
+    existing history. mode="swap" merges versions into the staging copies
+    of the dimensions instead (see src.warehouse.staging).
+
+    tables limits the load to some of the dimensions (default: all), so
+    they can be loaded in parallel.
+
+    conn, if given, is used instead of a new connection (see sqlite_bulk_load);
+    otherwise connections come from engine (default: the shared engine).
+    """
+    mode = mode or LOAD_MODE
+    as_of = as_of or datetime.utcnow()
+    tables = list(tables or DIMENSIONS)
+
+    with _transaction(conn, engine) as conn:
+        replace = mode == "replace" and if_exists == "replace"
+        if replace:
+            for table in tables:
+                _ensure_table(conn, table)
+                conn.execute(text(f"DELETE FROM {table}"))
+        changed = [
+            table
+            for table in tables
+            if load_dimension_versions(
+                df,
+                table,
+                as_of=as_of,
+                conn=conn,
+                target=physical_table(table, staging=mode == "swap"),
+            )
+        ]
+        if mode != "swap" and (replace or changed):
+            bump_data_version(conn, tables if replace else changed)
+
+
+def attach_dimension_keys(df, conn=None, engine=None, staging=False):
+    """
+    Return df with customer_key and product_key set to the surrogate keys of
+    the current dimension versions (of the staging copies if staging=True).
+    """
+    keys = {}
+    with _transaction(conn, engine) as conn:
+        for table in DIMENSIONS:
+            spec = TABLES[table]
+            members = df[spec["natural_key"]].dropna().unique().tolist()
+            versions = current_versions(conn, table, members, physical_table(table, staging))
+            surrogate = {member: key for member, (key, _) in versions.items()}
+            keys[spec["key"]] = df[spec["natural_key"]].map(surrogate).astype("Int64")
+    return df.assign(**keys)
+
+
+def prepare_fact_rows(df, conn=None, engine=None, staging=False):
+    """
+    Return the fact_orders columns for df: surrogate keys of the current
+    dimension versions and the year_month of each order.
+    """
+    df = attach_dimension_keys(df, conn=conn, engine=engine, staging=staging)
+    df["year_month"] = order_months(df["order_date"])
+    return df[TABLES["fact_orders"]["columns"]]
+
+
+def _load_fact_partitions(df, replace=False, conn=None, engine=None):
+    """
+    Upsert fact rows into their month partitions, creating partitions as needed.
+
+    Only the partitions of months present in df are written. With
+    replace=True all existing partitions are dropped first. An order is
+    assumed to keep its order month; a changed order_date that moves it to
+    another month leaves the old row in place.
+    """
+    months = df["year_month"]
+    with _transaction(conn, engine) as conn:
+        partitions = list_partitions(conn)
+        if replace:
+            for table in partitions.values():
+                conn.execute(text(f"DROP TABLE {table}"))
+            clear_aggregates(conn)
+            partitions = {}
+
+        created = []
+        old = []
+        written = 0
+        for month, rows in df.groupby(months, sort=True):
+            name = partition_name(month)
+            if month not in partitions:
+                _ensure_partition(conn, name)
+                created.append(name)
+            else:
+                old.append(read_fact_rows(conn, rows["order_id"], name))
+            written += upsert_rows(rows, "fact_orders", conn=conn, target=name)
+        apply_fact_changes(conn, pd.concat(old) if old else None, df)
+        if replace or written:
+            bump_data_version(conn, FACT_VERSION_TABLES)
+
+        if replace or created:
+            _refresh_fact_view(conn)
+    logger.info(
+        "Loaded fact rows into %d month partitions (%d new).", months.nunique(), len(created)
+    )
+
+
+def load_fact_orders(
+    df, if_exists="replace", mode=None, conn=None, engine=None, partitioning=None
+):
+    """
+    Load transformed orders DataFrame into the fact_orders table.
+
+    Orders reference the current version of their customer and product
+    through surrogate keys, so load the dimensions first.
+
+    mode="upsert" (default: LOAD_MODE from config) writes only new or
+    changed orders into the declared table; mode="replace" uses to_sql;
+    mode="swap" upserts into fact_orders_staging. With partitioning="month" (default: FACT_PARTITIONING from config) rows
+    are upserted into the partitions of their order months only, and
+    replace drops all partitions first.
+    conn, if given, is used instead of a new connection from engine.
+
+    The report aggregates (see src.warehouse.aggregates) are updated in the
+    same transaction for the orders in df; in swap mode they are rebuilt
+    when the staging tables are swapped in.
+    """
+    mode = mode or LOAD_MODE
+    partitioning = partitioning or FACT_PARTITIONING
+
+    df_to_load = prepare_fact_rows(df, conn=conn, engine=engine, staging=mode == "swap")
+
+    if mode == "swap":
+        upsert_rows(
+            df_to_load,
+            "fact_orders",
+            engine=engine,
+            conn=conn,
+            target=physical_table("fact_orders", staging=True),
+        )
+        return
+
+    if partitioning == "month":
+        replace = mode == "replace" and if_exists == "replace"
+        _load_fact_partitions(df_to_load, replace=replace, conn=conn, engine=engine)
+        return
+
+    with _transaction(conn, engine) as conn:
+        if mode == "upsert":
+            old = read_fact_rows(conn, df_to_load["order_id"])
+            if upsert_rows(df_to_load, "fact_orders", conn=conn):
+                apply_fact_changes(conn, old, df_to_load)
+                bump_data_version(conn, FACT_VERSION_TABLES)
+            return
+
+        df_to_load.to_sql(
+            "fact_orders",
+            conn,
+            if_exists=if_exists,
+            index=False
+        )
+        if if_exists == "replace":
+            clear_aggregates(conn)
+        apply_fact_changes(conn, None, df_to_load)
+        bump_data_version(conn, FACT_VERSION_TABLES)
+
+
+def reload_fact_month(df, year_month, conn=None, engine=None, partitioning=None):
+    """
+    Replace all facts of one "YYYY-MM" month with the rows of df from that
+    month, e.g. to backfill late data.
+
+    In the partitioned layout only that month's partition is emptied and
+    rewritten; otherwise the month's rows are deleted by date range. The
+    month's report aggregates are then recomputed.
+
+    Returns:
+        The number of rows loaded.
+    """
+    partitioning = partitioning or FACT_PARTITIONING
+    rows = df[(order_months(df["order_date"]) == year_month).to_numpy()]
+    rows = prepare_fact_rows(rows, conn=conn, engine=engine)
+
+    with _transaction(conn, engine) as conn:
+        if partitioning == "month":
+            name = partition_name(year_month)
+            is_new = year_month not in list_partitions(conn)
+            _ensure_partition(conn, name)
+            conn.execute(text(f"DELETE FROM {name}"))
+            upsert_rows(rows, "fact_orders", conn=conn, target=name)
+            if is_new:
+                _refresh_fact_view(conn)
+        else:
+            first_day = pd.Timestamp(f"{year_month}-01")
+            params = date_bounds(first_day, first_day + pd.offsets.MonthEnd(0))
+            conn.execute(
+                text(
+                    "DELETE FROM fact_orders "
+                    "WHERE order_date >= :start_date AND order_date < :end_date"
+                ),
+                params,
+            )
+            upsert_rows(rows, "fact_orders", conn=conn)
+        rebuild_aggregates(conn, year_month)
+        bump_data_version(conn, ["fact_orders"])
+
+    logger.info("Reloaded %d fact rows for %s.", len(rows), year_month)
+    return len(rows)
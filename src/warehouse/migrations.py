@@ -0,0 +1,164 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable
+
+from sqlalchemy import Connection, inspect, text
+
+from src.warehouse.aggregates import rebuild_aggregates
+from src.warehouse.db import get_engine
+from src.warehouse.partitions import FACT_TABLE, list_partitions
+from src.warehouse.versions import bump_data_version
+from src.utils.logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+# Covering indexes on every fact table (or month partition): the report joins
+# read (surrogate key, total_amount) and the monthly report (year_month,
+# total_amount) straight from the index; order_date serves date ranges.
+FACT_INDEXES = {
+    "ix_fact_orders_product_revenue": "(product_key, total_amount)",
+    "ix_fact_orders_customer_revenue": "(customer_key, total_amount)",
+    "ix_fact_orders_year_month_revenue": "(year_month, total_amount)",
+    "ix_fact_orders_order_date": "(order_date)",
+}
+
+
+@dataclass(frozen=True)
+class Migration:
+    """
+    One versioned schema change; apply must be safe to run on any layout.
+    """
+
+    version: int
+    name: str
+    apply: Callable[[Connection], None]
+
+
+def fact_index_statements(table: str = FACT_TABLE) -> list[str]:
+    """
+    Return the CREATE INDEX statements of FACT_INDEXES for a fact table or partition.
+    """
+    return [
+        f"CREATE INDEX IF NOT EXISTS {name.replace(FACT_TABLE, table)} ON {table} {columns}"
+        for name, columns in FACT_INDEXES.items()
+    ]
+
+
+def fact_tables(conn) -> list[str]:
+    """
+    Return the tables holding fact rows: fact_orders, or its month partitions.
+    """
+    if FACT_TABLE in inspect(conn).get_table_names():
+        return [FACT_TABLE]
+    return list(list_partitions(conn).values())
+
+
+def _add_column(conn, table: str, column: str, column_type: str) -> None:
+    if column not in {col["name"] for col in inspect(conn).get_columns(table)}:
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}"))
+
+
+def _add_fact_surrogate_keys(conn) -> None:
+    # Facts loaded before SCD2 dimensions reference the current versions
+    for table in fact_tables(conn):
+        for key, dimension, natural_key in (
+            ("customer_key", "dim_customers", "customer_id"),
+            ("product_key", "dim_products", "product_id"),
+        ):
+            _add_column(conn, table, key, "INTEGER")
+            conn.execute(text(f"""
+                UPDATE {table} SET {key} = (
+                    SELECT d.{key} FROM {dimension} d
+                    WHERE d.{natural_key} = {table}.{natural_key} AND d.valid_to IS NULL
+                )
+                WHERE {key} IS NULL
+            """))
+
+
+def _add_year_month(conn) -> None:
+    for table in fact_tables(conn):
+        _add_column(conn, table, "year_month", "TEXT")
+        conn.execute(text(
+            f"UPDATE {table} SET year_month = substr(order_date, 1, 7) WHERE year_month IS NULL"
+        ))
+
+
+def _create_fact_indexes(conn) -> None:
+    for table in fact_tables(conn):
+        for statement in fact_index_statements(table):
+            conn.execute(text(statement))
+
+
+# Applied in order; never renumber or edit a released migration, add a new one
+MIGRATIONS = [
+    Migration(1, "fact_surrogate_keys", _add_fact_surrogate_keys),
+    Migration(2, "fact_year_month", _add_year_month),
+    Migration(3, "fact_covering_indexes", _create_fact_indexes),
+    Migration(4, "report_aggregates", rebuild_aggregates),
+]
+
+
+def applied_versions(conn) -> set[int]:
+    """
+    Return the migration versions recorded in schema_migrations.
+    """
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at TEXT NOT NULL
+        )
+    """))
+    return set(conn.execute(text("SELECT version FROM schema_migrations")).scalars())
+
+
+def analyze(conn) -> None:
+    """
+    Refresh query planner statistics.
+    """
+    conn.execute(text("ANALYZE"))
+
+
+def optimize(conn) -> None:
+    """
+    Cheap statistics refresh after a load: PRAGMA optimize on SQLite (which
+    only re-analyzes tables whose statistics are stale), ANALYZE elsewhere.
+    """
+    if conn.dialect.name == "sqlite":
+        conn.exec_driver_sql("PRAGMA optimize")
+    else:
+        analyze(conn)
+
+
+def apply_migrations(conn=None, engine=None, migrations=None) -> list[int]:
+    """
+    Apply the migrations not yet recorded in schema_migrations, in version order.
+
+    Each migration is recorded in the same transaction that applies it, so
+    running this again is a no-op. ANALYZE runs after any change so the
+    planner sees the new indexes.
+
+    Returns:
+        The versions applied by this call.
+    """
+    if conn is None:
+        with (engine or get_engine()).begin() as conn:
+            return apply_migrations(conn=conn, migrations=migrations)
+
+    done = applied_versions(conn)
+    applied = []
+    for migration in sorted(migrations or MIGRATIONS, key=lambda m: m.version):
+        if migration.version in done:
+            continue
+        logger.info("Applying schema migration %d: %s", migration.version, migration.name)
+        migration.apply(conn)
+        conn.execute(
+            text("INSERT INTO schema_migrations (version, name, applied_at) VALUES (:v, :n, :t)"),
+            {"v": migration.version, "n": migration.name, "t": datetime.utcnow().isoformat()},
+        )
+        applied.append(migration.version)
+
+    if applied:
+        analyze(conn)
+        bump_data_version(conn, ["schema_migrations"])
+    return applied
@@ -0,0 +1,93 @@
+import re
+from datetime import date
+
+import pandas as pd
+from sqlalchemy import inspect
+
+# Month partitions of fact_orders are tables named fact_orders_pYYYYMM; in the
+# partitioned layout fact_orders itself is a UNION ALL view over them.
+FACT_TABLE = "fact_orders"
+_PARTITION_RE = re.compile(rf"^{FACT_TABLE}_p(\d{{4}})(\d{{2}})$")
+
+
+def partition_name(year_month: str) -> str:
+    """
+    Return the partition table for a "YYYY-MM" month.
+    """
+    return f"{FACT_TABLE}_p{year_month.replace('-', '')}"
+
+
+def list_partitions(conn) -> dict[str, str]:
+    """
+    Return {"YYYY-MM": table name} for the existing fact partitions, by month.
+    """
+    partitions = {}
+    for table in inspect(conn).get_table_names():
+        match = _PARTITION_RE.match(table)
+        if match:
+            partitions[f"{match.group(1)}-{match.group(2)}"] = table
+    return dict(sorted(partitions.items()))
+
+
+def order_months(order_dates: pd.Series) -> pd.Series:
+    """
+    Return the "YYYY-MM" partition month of each order date.
+    """
+    return pd.to_datetime(order_dates).dt.strftime("%Y-%m")
+
+
+def month_of(value: date | str | pd.Timestamp) -> str:
+    """
+    Return the "YYYY-MM" month of a date, timestamp or "YYYY-MM[-DD]" string.
+    """
+    return pd.Timestamp(value).strftime("%Y-%m")
+
+
+def date_bounds(start_date=None, end_date=None) -> dict:
+    """
+    Return query parameters for an inclusive date range.
+
+    order_date is stored as text, so the range becomes
+    start_date <= order_date < end_date + 1 day on "YYYY-MM-DD" prefixes.
+    """
+    params = {}
+    if start_date is not None:
+        params["start_date"] = pd.Timestamp(start_date).strftime("%Y-%m-%d")
+    if end_date is not None:
+        params["end_date"] = (pd.Timestamp(end_date) + pd.Timedelta(days=1)).strftime("%Y-%m-%d")
+    return params
+
+
+def fact_source(conn, start_date=None, end_date=None) -> tuple[str, str, dict]:
+    """
+    Return (FROM source, WHERE clause, parameters) for reading fact_orders
+    within an optional inclusive date range.
+
+    In the partitioned layout the source is a UNION ALL over just the
+    partitions whose month overlaps the range, so other months are never
+    read. The WHERE clause filters order_date on the fact alias f.
+    """
+    params = date_bounds(start_date, end_date)
+    conditions = []
+    if "start_date" in params:
+        conditions.append("f.order_date >= :start_date")
+    if "end_date" in params:
+        conditions.append("f.order_date < :end_date")
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    partitions = list_partitions(conn)
+    if not partitions or not params:
+        return FACT_TABLE, where, params
+
+    first = month_of(start_date) if start_date is not None else None
+    last = month_of(end_date) if end_date is not None else None
+    selected = [
+        table
+        for month, table in partitions.items()
+        if (first is None or month >= first) and (last is None or month <= last)
+    ]
+    if not selected:
+        return f"(SELECT * FROM {FACT_TABLE} WHERE 1 = 0)", where, params
+    if len(selected) == 1:
+        return selected[0], where, params
+    return f"({' UNION ALL '.join(f'SELECT * FROM {table}' for table in selected)})", where, params
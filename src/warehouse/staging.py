@@ -0,0 +1,158 @@
+from sqlalchemy import inspect, text
+
+from src.warehouse.aggregates import AGGREGATES, build_aggregates
+from src.warehouse.db import get_engine
+from src.warehouse.load_to_db import (
+    DIMENSIONS,
+    STAGING_SUFFIX,
+    TABLES,
+    index_statements,
+    physical_table,
+)
+from src.warehouse.versions import bump_data_version
+from src.utils.logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+
+def prepare_staging(engine=None, copy_live=False) -> int:
+    """
+    Create empty staging copies of the warehouse tables and enable WAL.
+
+    Dimension staging tables get their current-version index, which the
+    SCD2 loads look members up by. Fact indexes are built just before the
+    swap, so loading into staging does not maintain them.
+
+    With copy_live=True the live rows are copied into staging first, so an
+    incremental run merges into the existing history instead of replacing it.
+
+    Returns:
+        The number of fact rows copied from the live table.
+    """
+    engine = engine or get_engine()
+    if engine.dialect.name == "sqlite":
+        # WAL lets readers keep using the live tables while staging is written
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            mode = conn.exec_driver_sql("PRAGMA journal_mode = WAL").scalar()
+            logger.info("SQLite journal mode: %s", mode)
+
+    copied = 0
+    with engine.begin() as conn:
+        for table in TABLES:
+            staging = physical_table(table, staging=True)
+            conn.execute(text(f"DROP TABLE IF EXISTS {staging}"))
+            conn.execute(text(TABLES[table]["ddl"].replace(table, staging)))
+            if table in DIMENSIONS:
+                for statement in index_statements(conn, table, staging=True):
+                    conn.execute(text(statement))
+            if copy_live:
+                columns = ", ".join(TABLES[table]["columns"])
+                conn.execute(text(
+                    f"INSERT INTO {staging} ({columns}) SELECT {columns} FROM {table}"
+                ))
+        if copy_live:
+            copied = conn.execute(
+                text(f"SELECT COUNT(*) FROM {physical_table('fact_orders', staging=True)}")
+            ).scalar_one()
+
+    logger.info("Prepared staging tables (%d live fact rows copied).", copied)
+    return copied
+
+
+def validate_staging(conn, min_fact_rows=0, max_fact_rows=None) -> dict:
+    """
+    Check row counts and foreign keys in the staging tables.
+
+    Raises:
+        ValueError if the fact row count is outside [min_fact_rows,
+        max_fact_rows], a dimension is empty while there are facts, or any
+        fact does not reference an existing dimension version.
+
+    Returns:
+        Row counts per staging table.
+    """
+    counts = {
+        table: conn.execute(
+            text(f"SELECT COUNT(*) FROM {physical_table(table, staging=True)}")
+        ).scalar_one()
+        for table in TABLES
+    }
+    problems = []
+
+    facts = counts["fact_orders"]
+    if facts < min_fact_rows or (max_fact_rows is not None and facts > max_fact_rows):
+        problems.append(
+            f"fact_orders has {facts} rows, expected {min_fact_rows}..{max_fact_rows}"
+        )
+
+    fact_staging = physical_table("fact_orders", staging=True)
+    for table in DIMENSIONS:
+        key = TABLES[table]["key"]
+        if facts and not counts[table]:
+            problems.append(f"{table} is empty")
+        orphans = conn.execute(text(f"""
+            SELECT COUNT(*) FROM {fact_staging} f
+            LEFT JOIN {physical_table(table, staging=True)} d ON f.{key} = d.{key}
+            WHERE d.{key} IS NULL
+        """)).scalar_one()
+        if orphans:
+            problems.append(f"{orphans} facts without a matching {key}")
+
+    if problems:
+        raise ValueError(f"Staging validation failed: {'; '.join(problems)}")
+    return counts
+
+
+def swap_staging(engine=None, min_fact_rows=0, max_fact_rows=None) -> dict:
+    """
+    Validate the staging tables and swap them into place.
+
+    The declared indexes and the report aggregates are built on the staging
+    tables first, while readers keep using the live ones. The swap itself
+    is one short transaction that only renames the live tables away,
+    renames the staging tables (and aggregates) to the live names and bumps
+    their data versions; the old tables are dropped after it commits.
+    Readers in WAL mode keep reading the previous tables until the swap
+    commits and never see a half-loaded warehouse.
+
+    Indexes keep their names across a rename, so the swapped-in tables
+    carry the staging index names until the next swap hands them back.
+
+    Returns:
+        Row counts of the swapped-in tables.
+    """
+    engine = engine or get_engine()
+    with engine.begin() as conn:
+        counts = validate_staging(conn, min_fact_rows, max_fact_rows)
+        # Leftovers of an interrupted swap would hold index names
+        for table in [*TABLES, *AGGREGATES]:
+            conn.execute(text(f"DROP TABLE IF EXISTS {table}_old"))
+        for table in TABLES:
+            for statement in index_statements(conn, table, staging=True):
+                conn.execute(text(statement))
+        build_aggregates(conn, STAGING_SUFFIX)
+
+    swapped = [*TABLES, *AGGREGATES]
+    with engine.begin() as conn:
+        if conn.dialect.name == "sqlite":
+            # Keep the foreign keys of other tables pointing at the live names
+            conn.exec_driver_sql("PRAGMA legacy_alter_table = ON")
+        try:
+            live_tables = set(inspect(conn).get_table_names())
+            for table in swapped:
+                if table in live_tables:
+                    conn.execute(text(f"ALTER TABLE {table} RENAME TO {table}_old"))
+                conn.execute(text(
+                    f"ALTER TABLE {physical_table(table, staging=True)} RENAME TO {table}"
+                ))
+            bump_data_version(conn, swapped)
+        finally:
+            if conn.dialect.name == "sqlite":
+                conn.exec_driver_sql("PRAGMA legacy_alter_table = OFF")
+
+    with engine.begin() as conn:
+        for table in swapped:
+            conn.execute(text(f"DROP TABLE IF EXISTS {table}_old"))
+
+    logger.info("Swapped staging tables into place: %s", counts)
+    return counts
@@ -0,0 +1,61 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import inspect, text
+
+# Per-table change counters: every load that changes a table's rows bumps its
+# version in the same transaction, so readers (e.g. the report cache) can tell
+# whether the warehouse changed without looking at the data.
+VERSIONS_TABLE = "warehouse_versions"
+# Random id a warehouse gets with its first counter. A recreated warehouse
+# starts its counters at 1 again; its new id tells it apart from the old one.
+DATABASE_ID_TABLE = "warehouse_database_id"
+# Key of the id in the versions returned by data_version
+DATABASE_ID_KEY = "database_id"
+
+
+def bump_data_version(conn, tables) -> None:
+    """
+    Increment the change counter of each table in tables.
+    """
+    conn.execute(text(f"""
+        CREATE TABLE IF NOT EXISTS {VERSIONS_TABLE} (
+            table_name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL,
+            updated_at TEXT NOT NULL
+        )
+    """))
+    conn.execute(text(f"CREATE TABLE IF NOT EXISTS {DATABASE_ID_TABLE} (database_id TEXT NOT NULL)"))
+    conn.execute(
+        text(f"""
+            INSERT INTO {DATABASE_ID_TABLE} (database_id)
+            SELECT :database_id WHERE NOT EXISTS (SELECT 1 FROM {DATABASE_ID_TABLE})
+        """),
+        {"database_id": uuid.uuid4().hex},
+    )
+    now = datetime.utcnow().isoformat()
+    conn.execute(
+        text(f"""
+            INSERT INTO {VERSIONS_TABLE} (table_name, version, updated_at)
+            VALUES (:table, 1, :now)
+            ON CONFLICT (table_name) DO UPDATE SET
+                version = {VERSIONS_TABLE}.version + 1,
+                updated_at = excluded.updated_at
+        """),
+        [{"table": table, "now": now} for table in tables],
+    )
+
+
+def data_version(conn) -> dict | None:
+    """
+    Return {table: version} for all tracked tables plus the warehouse's
+    id under DATABASE_ID_KEY, or None if the warehouse was never written
+    by the loader (no counters to go by).
+    """
+    if not inspect(conn).has_table(VERSIONS_TABLE):
+        return None
+    rows = conn.execute(text(f"SELECT table_name, version FROM {VERSIONS_TABLE}")).all()
+    database_id = None
+    if inspect(conn).has_table(DATABASE_ID_TABLE):
+        database_id = conn.execute(text(f"SELECT database_id FROM {DATABASE_ID_TABLE}")).scalar()
+    return {DATABASE_ID_KEY: database_id, **dict(sorted(rows))}
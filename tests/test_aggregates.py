@@ -0,0 +1,100 @@
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, text
+
+# Ensure project root is on sys.path
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.analytics.reports import revenue_by_country, revenue_by_month  # noqa: E402
+from src.warehouse.aggregates import check_aggregates  # noqa: E402
+from src.warehouse.load_to_db import (  # noqa: E402
+    create_schema,
+    load_dimensions,
+    load_fact_orders,
+    reload_fact_month,
+)
+
+
+@pytest.fixture
+def warehouse(monkeypatch, tmp_path):
+    url = f"sqlite:///{tmp_path / 'warehouse.db'}"
+    monkeypatch.setattr("src.warehouse.db.DB_URL", url)
+    return create_engine(url, future=True)
+
+
+def _orders(rows):
+    return pd.DataFrame([
+        {
+            "order_id": order_id,
+            "customer_id": 10,
+            "customer_name": "Alice",
+            "country": country,
+            "product_id": 100,
+            "product_name": "USB Cable",
+            "category": "Electronics",
+            "order_date": pd.Timestamp(order_date),
+            "quantity": 1,
+            "unit_price": amount,
+            "total_amount": amount,
+        }
+        for order_id, country, order_date, amount in rows
+    ])
+
+
+def _load(df, mode, partitioning=None, if_exists="append"):
+    load_dimensions(df, if_exists=if_exists, mode=mode)
+    load_fact_orders(df, if_exists=if_exists, mode=mode, partitioning=partitioning)
+
+
+def _assert_consistent(warehouse):
+    with warehouse.connect() as conn:
+        mismatches = check_aggregates(conn)
+    assert mismatches.empty, mismatches.to_dict("records")
+
+
+@pytest.mark.parametrize("partitioning", ["none", "month"])
+def test_aggregates_follow_batches_changes_and_month_reloads(warehouse, partitioning):
+    create_schema(partitioning=partitioning)
+    _load(
+        _orders([(1, "Germany", "2024-01-05", 10.0), (2, "Germany", "2024-01-20", 5.0)]),
+        mode="upsert",
+        partitioning=partitioning,
+    )
+    _assert_consistent(warehouse)
+
+    # Order 2 changes amount and, through a new customer version, country
+    _load(
+        _orders([(2, "France", "2024-01-20", 7.0), (3, "France", "2024-02-01", 4.0)]),
+        mode="upsert",
+        partitioning=partitioning,
+    )
+    _assert_consistent(warehouse)
+    by_country = revenue_by_country()
+    assert dict(zip(by_country["country"], by_country["revenue"])) == {
+        "Germany": 10.0, "France": 11.0,
+    }
+
+    reload_fact_month(
+        _orders([(1, "France", "2024-01-05", 8.0)]), "2024-01", partitioning=partitioning
+    )
+    _assert_consistent(warehouse)
+    by_month = revenue_by_month()
+    assert dict(zip(by_month["year_month"], by_month["revenue"])) == {
+        "2024-01": 8.0, "2024-02": 4.0,
+    }
+
+
+def test_replace_load_resets_aggregates(warehouse):
+    create_schema()
+    _load(_orders([(1, "Germany", "2024-01-05", 10.0)]), mode="upsert")
+    _load(_orders([(5, "Spain", "2024-03-05", 2.0)]), mode="replace", if_exists="replace")
+
+    _assert_consistent(warehouse)
+    with warehouse.connect() as conn:
+        rows = conn.execute(text("SELECT year_month, revenue FROM agg_revenue_month")).all()
+    assert rows == [("2024-03", 2.0)]
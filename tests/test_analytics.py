@@ -3,7 +3,7 @@ from pathlib import Path
 
 import pandas as pd
 import pytest
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, inspect, text
 
 # Ensure project root is on sys.path
 ROOT = Path(__file__).resolve().parents[1]
@@ -15,13 +15,15 @@ from src.analytics.reports import (  # noqa: E402
     revenue_by_month,
     revenue_by_country,
 )
+from src.warehouse.aggregates import check_aggregates, rebuild_aggregates  # noqa: E402
+from src.warehouse.partitions import fact_source  # noqa: E402
 
 
-@pytest.fixture
-def temp_engine():
+@pytest.fixture(params=["facts", "aggregates"])
+def temp_engine(request):
     """
     Create an in-memory SQLite engine with minimal schema and data
-    for analytics tests.
+    for analytics tests, with or without the report aggregates.
     """
     engine = create_engine("sqlite:///:memory:", future=True)
 
@@ -31,7 +33,8 @@ def temp_engine():
             text(
                 """
                 CREATE TABLE dim_products (
-                    product_id INTEGER PRIMARY KEY,
+                    product_key INTEGER PRIMARY KEY,
+                    product_id INTEGER,
                     product_name TEXT,
                     category TEXT
                 );
@@ -42,7 +45,8 @@ def temp_engine():
             text(
                 """
                 CREATE TABLE dim_customers (
-                    customer_id INTEGER PRIMARY KEY,
+                    customer_key INTEGER PRIMARY KEY,
+                    customer_id INTEGER,
                     customer_name TEXT,
                     country TEXT
                 );
@@ -56,7 +60,10 @@ def temp_engine():
                     order_id INTEGER PRIMARY KEY,
                     customer_id INTEGER,
                     product_id INTEGER,
+                    customer_key INTEGER,
+                    product_key INTEGER,
                     order_date TEXT,
+                    year_month TEXT,
                     quantity INTEGER,
                     unit_price REAL,
                     total_amount REAL
@@ -69,20 +76,20 @@ def temp_engine():
         conn.execute(
             text(
                 """
-                INSERT INTO dim_products (product_id, product_name, category)
+                INSERT INTO dim_products (product_key, product_id, product_name, category)
                 VALUES
-                (100, 'USB Cable', 'Electronics'),
-                (101, 'Wireless Mouse', 'Electronics');
+                (1, 100, 'USB Cable', 'Electronics'),
+                (2, 101, 'Wireless Mouse', 'Electronics');
                 """
             )
         )
         conn.execute(
             text(
                 """
-                INSERT INTO dim_customers (customer_id, customer_name, country)
+                INSERT INTO dim_customers (customer_key, customer_id, customer_name, country)
                 VALUES
-                (10, 'Alice', 'Germany'),
-                (11, 'Bob', 'France');
+                (1, 10, 'Alice', 'Germany'),
+                (2, 11, 'Bob', 'France');
                 """
             )
         )
@@ -92,15 +99,17 @@ def temp_engine():
             text(
                 """
                 INSERT INTO fact_orders
-                    (order_id, customer_id, product_id, order_date,
-                     quantity, unit_price, total_amount)
+                    (order_id, customer_id, product_id, customer_key, product_key,
+                     order_date, year_month, quantity, unit_price, total_amount)
                 VALUES
-                (1, 10, 100, '2024-01-01', 2, 5.0, 10.0),
-                (2, 11, 101, '2024-01-15', 1, 15.0, 15.0),
-                (3, 10, 100, '2024-02-01', 3, 5.0, 15.0);
+                (1, 10, 100, 1, 1, '2024-01-01', '2024-01', 2, 5.0, 10.0),
+                (2, 11, 101, 2, 2, '2024-01-15', '2024-01', 1, 15.0, 15.0),
+                (3, 10, 100, 1, 1, '2024-02-01', '2024-02', 3, 5.0, 15.0);
                 """
             )
         )
+        if request.param == "aggregates":
+            rebuild_aggregates(conn)
 
     return engine
 
@@ -132,3 +141,50 @@ def test_revenue_by_country(temp_engine):
     france_rev = float(df.loc[df["country"] == "France", "revenue"].iloc[0])
     assert germany_rev == 25.0
     assert france_rev == 15.0
+
+
+def test_reports_accept_an_inclusive_date_range(temp_engine):
+    df = revenue_by_country(engine=temp_engine, start_date="2024-01-15", end_date="2024-02-01")
+    assert dict(zip(df["country"], df["revenue"])) == {"France": 15.0, "Germany": 15.0}
+
+    df = top_products_by_revenue(engine=temp_engine, end_date="2024-01-31")
+    assert df.iloc[0]["revenue"] == 15.0
+    assert revenue_by_month(engine=temp_engine, start_date="2024-03-01").empty
+
+
+def test_fact_source_prunes_month_partitions():
+    engine = create_engine("sqlite:///:memory:", future=True)
+    with engine.begin() as conn:
+        for month in ("202401", "202402", "202403"):
+            conn.execute(text(f"CREATE TABLE fact_orders_p{month} (order_date TEXT)"))
+
+    source, where, params = fact_source(engine, "2024-02-10", "2024-03-05")
+    assert source == "(SELECT * FROM fact_orders_p202402 UNION ALL SELECT * FROM fact_orders_p202403)"
+    assert params == {"start_date": "2024-02-10", "end_date": "2024-03-06"}
+    assert "f.order_date >= :start_date" in where
+
+    source, _, _ = fact_source(engine, "2024-01-01", "2024-01-31")
+    assert source == "fact_orders_p202401"
+
+
+def test_whole_month_reports_read_aggregates(temp_engine):
+    aggregated = "agg_revenue_month" in inspect(temp_engine).get_table_names()
+    with temp_engine.begin() as conn:
+        if aggregated:
+            assert check_aggregates(conn).empty
+        # Facts no longer match the aggregates; whole-month reports must not notice
+        conn.execute(text("UPDATE fact_orders SET total_amount = 0"))
+
+    df = revenue_by_month(engine=temp_engine, start_date="2024-01-01", end_date="2024-01-31")
+    assert df["revenue"].tolist() == ([25.0] if aggregated else [0.0])
+    # A range that does not cover whole months always reads the facts
+    df = revenue_by_month(engine=temp_engine, start_date="2024-01-02", end_date="2024-01-31")
+    assert df["revenue"].tolist() == [0.0]
+
+    if aggregated:
+        with temp_engine.connect() as conn:
+            mismatches = check_aggregates(conn)
+        assert set(mismatches["aggregate"]) == {
+            "agg_revenue_month", "agg_revenue_product", "agg_revenue_country"
+        }
+        assert mismatches["revenue_expected"].eq(0.0).all()
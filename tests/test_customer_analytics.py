@@ -0,0 +1,167 @@
+import sys
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Ensure project root is on sys.path
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.analytics.customer_analytics import (  # noqa: E402
+    cohort_retention,
+    compact_orders,
+    rfm_scores,
+)
+from src.analytics.reports import (  # noqa: E402
+    customer_cohort_retention,
+    customer_rfm,
+    generate_all_reports,
+)
+from src.warehouse.load_to_db import (  # noqa: E402
+    create_schema,
+    load_dimensions,
+    load_fact_orders,
+)
+
+
+def _orders(n=500, seed=3):
+    rng = np.random.default_rng(seed)
+    customer_id = rng.integers(1, 60, n)
+    quantity = rng.integers(1, 4, n)
+    unit_price = rng.integers(100, 5000, n) / 100
+    return pd.DataFrame({
+        "order_id": np.arange(1, n + 1),
+        "customer_id": customer_id,
+        "customer_name": [f"Customer {c}" for c in customer_id],
+        "country": "Germany",
+        "product_id": 1,
+        "product_name": "USB Cable",
+        "category": "Electronics",
+        "order_date": pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 200, n), unit="D"),
+        "quantity": quantity,
+        "unit_price": unit_price,
+        "total_amount": quantity * unit_price,
+    })
+
+
+def test_rfm_scores_match_a_groupby():
+    df = _orders()
+    rfm = rfm_scores(compact_orders([df, df.iloc[:0]]), as_of="2024-08-01")
+
+    expected = df.groupby("customer_id").agg(
+        last_order_date=("order_date", "max"),
+        frequency=("order_id", "count"),
+        monetary=("total_amount", "sum"),
+    )
+    assert rfm["customer_id"].tolist() == expected.index.tolist()
+    assert rfm["frequency"].tolist() == expected["frequency"].tolist()
+    np.testing.assert_allclose(rfm["monetary"], expected["monetary"])
+    assert (pd.to_datetime(rfm["last_order_date"]) == expected["last_order_date"].to_numpy()).all()
+    assert rfm["recency_days"].tolist() == (
+        (pd.Timestamp("2024-08-01") - expected["last_order_date"]).dt.days.tolist()
+    )
+
+    # Scores are quintiles of the customer base that ties always share
+    assert set(rfm["r_score"]) == {1, 2, 3, 4, 5}
+    assert rfm.groupby("frequency")["f_score"].nunique().max() == 1
+    assert (rfm.sort_values("monetary")["m_score"].diff().dropna() >= 0).all()
+    assert rfm["rfm_score"].tolist() == (
+        rfm["r_score"].astype(int) * 100 + rfm["f_score"] * 10 + rfm["m_score"]
+    ).tolist()
+    champions = rfm[rfm["segment"] == "champions"]
+    assert (champions["r_score"] >= 4).all() and (champions["f_score"] >= 4).all()
+
+
+def test_cohort_retention_counts_returning_customers():
+    orders = compact_orders([pd.DataFrame({
+        "customer_id": [1, 1, 1, 2, 2, 3, 4],
+        "order_date": [
+            "2024-01-05", "2024-01-20", "2024-03-02",
+            "2024-01-31", "2024-02-01",
+            "2024-02-10",
+            "2024-03-15",
+        ],
+        "total_amount": [1.0] * 7,
+    })])
+    matrix = cohort_retention(orders)
+
+    assert matrix["cohort_month"].tolist() == ["2024-01", "2024-02", "2024-03"]
+    assert matrix["cohort_size"].tolist() == [2, 1, 1]
+    assert matrix.loc[0, ["month_0", "month_1", "month_2"]].tolist() == [1.0, 0.5, 0.5]
+    assert matrix.loc[1, ["month_0", "month_1"]].tolist() == [1.0, 0.0]
+    # Months a cohort has not reached yet are unknown, not zero
+    assert np.isnan(matrix.loc[1, "month_2"]) and np.isnan(matrix.loc[2, "month_1"])
+
+
+def test_cohort_retention_memory_grows_with_orders_not_customers_times_months():
+    rng = np.random.default_rng(5)
+    n = 100_000
+    orders = compact_orders([pd.DataFrame({
+        "customer_id": rng.integers(0, 100_000, n),
+        "order_date": pd.Timestamp("2005-01-01") + pd.to_timedelta(rng.integers(0, 7300, n), unit="D"),
+        "total_amount": 1.0,
+    })])
+
+    tracemalloc.start()
+    try:
+        matrix = cohort_retention(orders)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    # A months x customers array alone would take 240 * ~63,000 bytes
+    assert peak < 240 * orders["customer_id"].nunique() / 2
+
+    dates = pd.to_datetime(orders["order_day"], unit="D")
+    frame = pd.DataFrame({"customer": orders["customer_id"], "month": dates.dt.year * 12 + dates.dt.month})
+    frame["offset"] = frame["month"] - frame.groupby("customer")["month"].transform("min")
+    frame["cohort"] = frame["month"] - frame["offset"]
+    counts = frame.drop_duplicates(["customer", "offset"]).groupby(["cohort", "offset"]).size()
+    counts = counts.unstack(fill_value=0)
+    assert matrix["cohort_size"].tolist() == counts[0].tolist()
+    retention = matrix[[f"month_{k}" for k in counts.columns]].to_numpy()
+    expected = counts.div(counts[0], axis=0).to_numpy()
+    reached = ~np.isnan(retention)
+    np.testing.assert_allclose(retention[reached], expected[reached])
+    assert (expected[~reached] == 0).all()
+
+
+@pytest.fixture
+def warehouse(monkeypatch, tmp_path):
+    monkeypatch.setattr("src.warehouse.db.DB_URL", f"sqlite:///{tmp_path / 'warehouse.db'}")
+    monkeypatch.setattr("src.analytics.reports.REPORTS_DIR", tmp_path / "reports")
+    monkeypatch.setattr("src.analytics.cache.REPORT_CACHE_ENABLED", False)
+    df = _orders()
+    create_schema()
+    load_dimensions(df, mode="upsert")
+    load_fact_orders(df, mode="upsert")
+    return tmp_path, df
+
+
+def test_customer_reports_are_computed_from_the_warehouse(warehouse):
+    tmp_path, df = warehouse
+    orders = compact_orders([df])
+
+    rfm = customer_rfm(chunk_size=64)
+    expected = rfm_scores(orders, as_of=df["order_date"].max() + pd.Timedelta(days=1))
+    pd.testing.assert_frame_equal(rfm, expected)
+
+    ranged = customer_rfm(start_date="2024-02-01", end_date="2024-03-31")
+    in_range = df[(df["order_date"] >= "2024-02-01") & (df["order_date"] < "2024-04-01")]
+    assert ranged["frequency"].sum() == len(in_range)
+    assert ranged["recency_days"].min() >= 1
+
+    pd.testing.assert_frame_equal(customer_cohort_retention(), cohort_retention(orders))
+
+    timings = generate_all_reports(reports=["customer_rfm", "cohort_retention"])["report_timings"]
+    assert timings["customer_rfm"]["rows"] == df["customer_id"].nunique()
+    assert timings["cohort_retention"]["compute_seconds"] >= 0
+    written = pd.read_csv(tmp_path / "reports" / "customer_rfm.csv")
+    assert written["customer_id"].tolist() == rfm["customer_id"].tolist()
+
+    # Only run when asked for by name
+    defaults = generate_all_reports()["report_timings"]
+    assert "customer_rfm" not in defaults and "cohort_retention" not in defaults
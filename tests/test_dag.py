@@ -0,0 +1,145 @@
+import json
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+# Ensure project root is on sys.path
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.orchestration.dag import CheckpointStore, Stage, StageRunner  # noqa: E402
+from src.orchestration.pipeline import downstream_stages, run_pipeline  # noqa: E402
+
+
+def _source():
+    return 1
+
+
+def _other_source():
+    return 1
+
+
+def _double(value):
+    return value * 2
+
+
+def test_runner_runs_independent_stages_in_parallel_and_resumes(tmp_path):
+    barrier = threading.Barrier(2, timeout=5)
+    calls = []
+
+    def branch(value):
+        calls.append(value)
+        # Both branches must be running at once to get past the barrier
+        barrier.wait()
+        return value + 1
+
+    def stages(source=_source):
+        return [
+            Stage("source", source),
+            Stage("left", branch, inputs=("source",), code=(_double,)),
+            Stage("right", branch, inputs=("source",), code=(_double,), params={"side": "right"}),
+            Stage("total", lambda left, right: left + right, inputs=("left", "right"), code=(_source,)),
+        ]
+
+    store = CheckpointStore(tmp_path)
+    results = StageRunner(store, workers=2).run(stages())
+    assert results["total"].value == 4 and len(calls) == 2
+
+    resumed = StageRunner(store, resume=True).run(stages())
+    assert all(result.skipped for result in resumed.values())
+    assert resumed["total"].value == 4 and len(calls) == 2
+
+    # Rerunning a kind reruns only that kind; keys only depend on input keys
+    barrier.reset()
+    rerun = StageRunner(store, resume=True, rerun={"left", "right"}, workers=2).run(stages())
+    assert not rerun["left"].skipped and rerun["total"].skipped and len(calls) == 4
+
+    # Different code gives different keys, so nothing is reused
+    barrier.reset()
+    changed = StageRunner(CheckpointStore(tmp_path), resume=True, workers=2).run(stages(_other_source))
+    assert not any(result.skipped for result in changed.values())
+
+
+def test_downstream_stages():
+    assert downstream_stages("dims") == {"dims", "facts", "reports"}
+    assert downstream_stages("validate") == {"validate", "save", "dims", "facts", "reports"}
+    with pytest.raises(ValueError):
+        downstream_stages("load")
+
+
+@pytest.fixture
+def paths(monkeypatch, tmp_path):
+    monkeypatch.setattr("src.warehouse.db.DB_URL", f"sqlite:///{tmp_path / 'warehouse.db'}")
+    monkeypatch.setattr("src.orchestration.dag.CHECKPOINT_DIR", tmp_path / "checkpoints")
+    monkeypatch.setattr("src.orchestration.pipeline.LOGS_DIR", tmp_path)
+    monkeypatch.setattr(
+        "src.orchestration.pipeline.PROCESSED_DATA_PATH", tmp_path / "orders_clean.csv"
+    )
+    monkeypatch.setattr("src.orchestration.pipeline.QUARANTINE_PATH", tmp_path / "quarantine.csv")
+    monkeypatch.setattr(
+        "src.orchestration.pipeline.PROFILE_HISTORY_PATH", tmp_path / "profiles.jsonl"
+    )
+    return tmp_path
+
+
+def _stage_runs(tmp_path):
+    summary = json.loads((tmp_path / "run_summary.json").read_text())
+    runs = {}
+    for timing in summary["stages"]:
+        runs.setdefault(timing["kind"], set()).add(not timing["skipped"])
+    return summary, runs
+
+
+def test_failed_fact_load_resumes_without_reingesting(monkeypatch, paths):
+    from sqlalchemy import create_engine, text
+
+    def failing_fact_load(df, **kwargs):
+        raise RuntimeError("warehouse went away")
+
+    with monkeypatch.context() as patch:
+        patch.setattr("src.orchestration.pipeline.load_fact_orders", failing_fact_load)
+        with pytest.raises(RuntimeError):
+            run_pipeline(checkpoints=True)
+    failed, _ = _stage_runs(paths)
+    assert failed["status"] == "failed"
+
+    def no_transform(*args, **kwargs):
+        raise AssertionError("resumed run transformed again")
+
+    monkeypatch.setattr("src.orchestration.pipeline.transform_orders", no_transform)
+    monkeypatch.setattr("src.orchestration.pipeline.load_raw_files", no_transform)
+    run_pipeline(resume=True)
+    summary, runs = _stage_runs(paths)
+
+    assert summary["status"] == "success"
+    assert runs["ingest"] == runs["transform"] == runs["validate"] == runs["save"] == {False}
+    # The dimensions were loaded before the failure and are still there
+    assert runs["dims"] == {False} and runs["facts"] == {True}
+    engine = create_engine(f"sqlite:///{paths / 'warehouse.db'}", future=True)
+    with engine.connect() as conn:
+        fact_rows = conn.execute(text("SELECT COUNT(*) FROM fact_orders")).scalar_one()
+    assert fact_rows == summary["loaded_rows"] == summary["clean_rows"] - summary["quarantined_rows"]
+
+    run_pipeline(from_stage="dims")
+    _, runs = _stage_runs(paths)
+    assert runs["transform"] == {False} and runs["dims"] == runs["facts"] == {True}
+
+
+def test_resumed_chunked_run_does_not_read_the_input(monkeypatch, paths):
+    run_pipeline(chunk_size=7, checkpoints=True)
+    first, _ = _stage_runs(paths)
+
+    def no_read(*args, **kwargs):
+        raise AssertionError("resumed run read the input again")
+
+    monkeypatch.setattr("src.orchestration.pipeline.iter_raw_files", no_read)
+    run_pipeline(chunk_size=7, resume=True)
+    summary, runs = _stage_runs(paths)
+
+    for kind in ("ingest", "transform", "validate", "save", "dims", "facts"):
+        assert runs[kind] == {False}
+    for key in ("raw_rows", "clean_rows", "quarantined_rows", "chunks", "data_quality"):
+        assert summary[key] == first[key]
@@ -8,7 +8,18 @@ if str(ROOT) not in sys.path:
 
 import pandas as pd
 import pytest
-from src.transformations.data_quality import validate_orders
+from src.transformations.data_quality import (
+    DriftRule,
+    OrdersProfile,
+    allowed_values,
+    check_drift,
+    evaluate_rules,
+    matches,
+    not_null,
+    references,
+    unique,
+    validate_orders,
+)
 
 def test_validate_orders_passes_on_good_data():
     df = pd.DataFrame([
@@ -41,3 +52,75 @@ def test_validate_orders_fails_on_negative_quantity():
 
     with pytest.raises(ValueError):
         validate_orders(df)
+
+def test_evaluate_rules_quarantines_failing_rows():
+    df = pd.DataFrame({
+        "order_id": [1, 2, 2, None],
+        "country": ["Germany", "Atlantis", "France", "Spain"],
+        "product_id": [100, 101, 999, 100],
+    })
+    rules = [
+        not_null("order_id"),
+        unique("order_id"),
+        allowed_values("country", ["Germany", "France", "Spain"]),
+        matches("country", r"[A-Z][a-z]+"),
+        references("product_id", lambda: {100, 101}),
+    ]
+
+    valid, quarantined, report = evaluate_rules(df, rules)
+
+    assert list(valid["order_id"]) == [1]
+    assert list(quarantined["failed_rules"]) == [
+        "country_allowed_values",
+        "order_id_unique;product_id_references",
+        "order_id_not_null",
+    ]
+    assert report["failed_rows"] == 3
+    assert report["rules"]["country_matches"]["failed"] == 0
+
+def test_validate_orders_tolerates_errors_below_threshold():
+    rows = [
+        {
+            "order_id": i,
+            "customer_id": 10,
+            "product_id": 100,
+            "order_date": "2024-01-01",
+            "quantity": 2 if i else -1,
+            "unit_price": 5.0,
+            "total_amount": 10.0 if i else -5.0,
+        }
+        for i in range(10)
+    ]
+    df = pd.DataFrame(rows)
+
+    valid, quarantined = validate_orders(df, max_error_rate=0.2)
+
+    assert len(valid) == 9
+    assert list(quarantined["failed_rules"]) == ["quantity_positive"]
+
+def test_orders_profile_merge_matches_single_pass_and_flags_drift():
+    df = pd.DataFrame({
+        "order_id": range(100),
+        "unit_price": [10.0] * 50 + [20.0] * 50,
+        "quantity": [1] * 100,
+        "total_amount": [10.0] * 50 + [20.0] * 50,
+        "country": ["Germany", None] * 50,
+    })
+
+    whole = OrdersProfile()
+    whole.update(df)
+    first, second = OrdersProfile(), OrdersProfile()
+    first.update(df.iloc[:30])
+    second.update(df.iloc[30:])
+    first.merge(second)
+
+    summary = first.summary()
+    assert summary == whole.summary()
+    assert summary["columns"]["order_id"]["distinct"] == 100
+    assert summary["columns"]["country"]["null_rate"] == 0.5
+    assert summary["columns"]["unit_price"]["max"] == 20.0
+
+    history = [{"columns": {"unit_price": {"quantiles": {"p50": 5.0}}}}] * 3
+    violations = check_drift(summary, history, [DriftRule("unit_price.quantiles.p50")])
+    assert [v["metric"] for v in violations] == ["unit_price.quantiles.p50"]
+    assert check_drift(summary, [], [DriftRule("unit_price.quantiles.p50")]) == []
@@ -0,0 +1,51 @@
+import sys
+from pathlib import Path
+
+import pytest
+from sqlalchemy import text
+
+# Ensure project root is on sys.path
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.config import SQLITE_CONNECT_PRAGMAS  # noqa: E402
+from src.warehouse.db import dispose_engines, get_engine  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def clean_registry():
+    dispose_engines()
+    yield
+    dispose_engines()
+
+
+def test_get_engine_reuses_one_engine_per_url(monkeypatch, tmp_path):
+    url = f"sqlite:///{tmp_path / 'a.db'}"
+    monkeypatch.setattr("src.warehouse.db.DB_URL", url)
+
+    engine = get_engine()
+    assert get_engine() is engine
+    assert get_engine(url) is engine
+    assert get_engine(f"sqlite:///{tmp_path / 'b.db'}") is not engine
+    assert engine.pool.size() == 5
+
+    dispose_engines()
+    assert get_engine() is not engine
+
+
+def test_sqlite_connections_get_connect_pragmas(tmp_path):
+    engine = get_engine(f"sqlite:///{tmp_path / 'a.db'}")
+    with engine.connect() as conn:
+        for name, value in SQLITE_CONNECT_PRAGMAS.items():
+            actual = conn.execute(text(f"PRAGMA {name}")).scalar()
+            if name == "temp_store":
+                assert actual == 2  # MEMORY
+            else:
+                assert actual == value
+
+
+def test_in_memory_sqlite_engine_is_supported():
+    engine = get_engine("sqlite:///:memory:")
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT 1")).scalar_one() == 1
@@ -0,0 +1,134 @@
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Ensure project root is on sys.path
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.analytics import reports as sql_reports  # noqa: E402
+from src.analytics.frame_reports import FrameReports, group_sum  # noqa: E402
+from src.orchestration.pipeline import run_pipeline  # noqa: E402
+from src.warehouse.load_to_db import (  # noqa: E402
+    create_schema,
+    load_dimensions,
+    load_fact_orders,
+)
+
+
+def _orders(n=400, seed=7):
+    rng = np.random.default_rng(seed)
+    product_ids = rng.integers(1, 15, n)
+    customer_ids = rng.integers(1, 25, n)
+    quantity = rng.integers(1, 5, n)
+    unit_price = rng.integers(100, 10000, n) / 100
+    df = pd.DataFrame({
+        "order_id": np.arange(1, n + 1),
+        "customer_id": customer_ids,
+        "customer_name": [f"Customer {c}" for c in customer_ids],
+        "country": [["Germany", "France", "Spain"][c % 3] for c in customer_ids],
+        "product_id": product_ids,
+        "product_name": [f"Product {p}" for p in product_ids],
+        "category": [["Books", "Electronics"][p % 2] for p in product_ids],
+        "order_date": pd.Timestamp("2024-01-01")
+        + pd.to_timedelta(rng.integers(0, 180, n), unit="D"),
+        "quantity": quantity,
+        "unit_price": unit_price,
+        "total_amount": quantity * unit_price,
+    })
+    # Members whose attributes change within the batch report under the last value
+    df.loc[df.index[-5:], "product_name"] = "Renamed"
+    last_order = df.index[df["customer_id"] == 3][-1]
+    df.loc[df["customer_id"] == 3, "country"] = "Spain"
+    df.loc[last_order, ["country", "order_date"]] = ["Italy", pd.Timestamp("2024-03-01")]
+    return df
+
+
+def _assert_same_report(sql, frame, keys):
+    assert list(frame.columns) == list(sql.columns)
+    assert len(frame) == len(sql)
+    sql = sql.sort_values(keys).reset_index(drop=True)
+    frame = frame.sort_values(keys).reset_index(drop=True)
+    pd.testing.assert_frame_equal(frame[keys], sql[keys], check_dtype=False)
+    np.testing.assert_allclose(frame["revenue"], sql["revenue"], rtol=1e-9)
+
+
+def test_group_sum_skips_missing_keys():
+    keys = pd.DataFrame({"a": ["x", "y", "x", None], "b": [1, 1, 1, 2]})
+    result = group_sum(keys, np.array([1.0, 2.0, 3.0, 4.0]))
+    assert result.to_dict("records") == [
+        {"a": "x", "b": 1, "revenue": 4.0},
+        {"a": "y", "b": 1, "revenue": 2.0},
+    ]
+
+
+@pytest.mark.parametrize("start_date,end_date", [(None, None), ("2024-02-10", "2024-04-30")])
+def test_frame_reports_match_sql_reports(monkeypatch, tmp_path, start_date, end_date):
+    monkeypatch.setattr("src.warehouse.db.DB_URL", f"sqlite:///{tmp_path / 'warehouse.db'}")
+    monkeypatch.setattr("src.analytics.cache.REPORT_CACHE_ENABLED", False)
+    df = _orders()
+    create_schema()
+
+    reports = FrameReports(start_date, end_date)
+    # Dimension changes between batches become new SCD2 versions, so each
+    # batch reports under the attributes it was loaded with
+    for batch in np.array_split(np.arange(len(df)), 3):
+        load_dimensions(df.iloc[batch], mode="upsert")
+        load_fact_orders(df.iloc[batch], mode="upsert")
+        reports.update(df.iloc[batch])
+    results = reports.results(limit=100)
+
+    dates = {"start_date": start_date, "end_date": end_date}
+    _assert_same_report(
+        sql_reports.top_products_by_revenue(limit=100, **dates),
+        results["top_products_by_revenue"],
+        ["product_name", "category"],
+    )
+    _assert_same_report(
+        sql_reports.revenue_by_month(**dates), results["revenue_by_month"], ["year_month"]
+    )
+    _assert_same_report(
+        sql_reports.revenue_by_country(**dates), results["revenue_by_country"], ["country"]
+    )
+    assert "Italy" in set(results["revenue_by_country"]["country"])
+
+
+def test_dry_run_writes_the_reports_of_a_full_run(monkeypatch, tmp_path):
+    monkeypatch.setattr("src.warehouse.db.DB_URL", f"sqlite:///{tmp_path / 'warehouse.db'}")
+    monkeypatch.setattr("src.orchestration.pipeline.LOGS_DIR", tmp_path)
+    monkeypatch.setattr(
+        "src.orchestration.pipeline.PROCESSED_DATA_PATH", tmp_path / "orders_clean.csv"
+    )
+    monkeypatch.setattr("src.orchestration.pipeline.QUARANTINE_PATH", tmp_path / "quarantine.csv")
+    monkeypatch.setattr(
+        "src.orchestration.pipeline.PROFILE_HISTORY_PATH", tmp_path / "profiles.jsonl"
+    )
+    monkeypatch.setattr("src.orchestration.dag.CHECKPOINT_DIR", tmp_path / "checkpoints")
+    monkeypatch.setattr("src.analytics.cache.REPORT_CACHE_ENABLED", False)
+    monkeypatch.setattr("src.analytics.reports.REPORTS_DIR", tmp_path / "sql")
+    monkeypatch.setattr("src.analytics.frame_reports.REPORTS_DIR", tmp_path / "memory")
+
+    run_pipeline(generate_reports=True, analytics_backend="sql")
+    run_pipeline(dry_run=True, generate_reports=True, chunk_size=7)
+    summary = json.loads((tmp_path / "run_summary.json").read_text())
+
+    assert set(summary["report_timings"]) == {
+        "top_products_by_revenue",
+        "revenue_by_month",
+        "revenue_by_country",
+    }
+    for name, keys in [
+        ("top_products_by_revenue", ["product_name", "category"]),
+        ("revenue_by_month", ["year_month"]),
+        ("revenue_by_country", ["country"]),
+    ]:
+        _assert_same_report(
+            pd.read_csv(tmp_path / "sql" / f"{name}.csv"),
+            pd.read_csv(tmp_path / "memory" / f"{name}.csv"),
+            keys,
+        )
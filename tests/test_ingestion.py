@@ -0,0 +1,45 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# Ensure project root is on sys.path
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.ingestion.ingest_orders import RAW_SCHEMA, load_raw_orders  # noqa: E402
+
+HEADER = "order_id,customer_id,customer_name,country,product_id,product_name,category,order_date,quantity,unit_price\n"
+
+
+def test_load_raw_orders_applies_declared_schema():
+    df = load_raw_orders()
+
+    assert {col: str(dtype) for col, dtype in df.dtypes.items()} == RAW_SCHEMA
+
+
+def test_load_raw_orders_fails_on_unexpected_column(tmp_path):
+    path = tmp_path / "orders.csv"
+    path.write_text(
+        HEADER.replace("\n", ",discount\n")
+        + "1,10,Alice,Germany,100,USB Cable,Electronics,2024-01-01,2,5.0,0.1\n"
+    )
+
+    with pytest.raises(ValueError, match="schema drift"):
+        load_raw_orders(path)
+
+
+@pytest.mark.parametrize(
+    "row",
+    [
+        "1,10,Alice,Germany,100,USB Cable,Electronics,01/02/2024,2,5.0\n",
+        "1,10,Alice,Germany,100,USB Cable,Electronics,2024-01-01,70000,5.0\n",
+    ],
+)
+def test_load_raw_orders_fails_on_bad_values(tmp_path, row):
+    path = tmp_path / "orders.csv"
+    path.write_text(HEADER + row)
+
+    with pytest.raises(ValueError):
+        load_raw_orders(path)
@@ -0,0 +1,84 @@
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+# Ensure project root is on sys.path
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.utils.io_utils import (  # noqa: E402
+    iter_table,
+    read_processed,
+    read_table,
+    write_processed,
+)
+
+pytest.importorskip("pyarrow")
+
+
+def _orders():
+    return pd.DataFrame([
+        {
+            "order_id": 1,
+            "customer_id": 10,
+            "product_id": 100,
+            "order_date": pd.Timestamp("2024-01-01"),
+            "quantity": 2,
+            "unit_price": 5.0,
+            "total_amount": 10.0,
+            "order_year": 2024,
+            "order_month": 1,
+        },
+        {
+            "order_id": 2,
+            "customer_id": 11,
+            "product_id": 101,
+            "order_date": pd.Timestamp("2024-02-01"),
+            "quantity": 1,
+            "unit_price": 15.0,
+            "total_amount": 15.0,
+            "order_year": 2024,
+            "order_month": 2,
+        },
+    ])
+
+
+def test_write_processed_parquet_is_partitioned_and_appends(tmp_path):
+    out = tmp_path / "orders_clean"
+    df = _orders()
+
+    write_processed(df.iloc[:1], out, "parquet", part=1)
+    write_processed(df.iloc[1:], out, "parquet", append=True, part=2)
+
+    assert (out / "order_year=2024" / "order_month=1").is_dir()
+    assert (out / "order_year=2024" / "order_month=2").is_dir()
+
+    result = read_processed(out, "parquet").sort_values("order_id")
+    assert list(result["order_id"]) == [1, 2]
+    assert list(result["order_month"]) == [1, 2]
+
+    # A non-append write replaces the previous dataset
+    write_processed(df.iloc[:1], out, "parquet")
+    assert list(read_processed(out, "parquet")["order_id"]) == [1]
+
+
+@pytest.mark.parametrize("name", ["orders.parquet", "orders.arrow"])
+def test_read_and_iter_columnar_input(tmp_path, name):
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+
+    df = _orders()
+    path = tmp_path / name
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    if name.endswith(".parquet"):
+        pq.write_table(table, path)
+    else:
+        feather.write_feather(table, path)
+
+    assert list(read_table(path)["order_id"]) == [1, 2]
+    chunks = list(iter_table(path, chunk_size=1))
+    assert [len(c) for c in chunks] == [1, 1]
@@ -0,0 +1,253 @@
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, inspect, text
+
+# Ensure project root is on sys.path
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.warehouse.load_to_db import (  # noqa: E402
+    create_schema,
+    load_dimensions,
+    load_fact_orders,
+    prepare_fact_rows,
+    reload_fact_month,
+    sqlite_bulk_load,
+    upsert_rows,
+)
+
+
+@pytest.fixture
+def warehouse(monkeypatch, tmp_path):
+    url = f"sqlite:///{tmp_path / 'warehouse.db'}"
+    monkeypatch.setattr("src.warehouse.db.DB_URL", url)
+    return create_engine(url, future=True)
+
+
+def _orders():
+    return pd.DataFrame([
+        {
+            "order_id": 1,
+            "customer_id": 10,
+            "customer_name": "Alice",
+            "country": "Germany",
+            "product_id": 100,
+            "product_name": "USB Cable",
+            "category": "Electronics",
+            "order_date": pd.Timestamp("2024-01-01"),
+            "quantity": 2,
+            "unit_price": 5.0,
+            "total_amount": 10.0,
+        },
+        {
+            "order_id": 2,
+            "customer_id": 11,
+            "customer_name": "Bob",
+            "country": "France",
+            "product_id": 100,
+            "product_name": "USB Cable",
+            "category": "Electronics",
+            "order_date": pd.Timestamp("2024-01-15"),
+            "quantity": 1,
+            "unit_price": 5.0,
+            "total_amount": 5.0,
+        },
+    ])
+
+
+def test_upsert_writes_only_new_or_changed_rows_and_keeps_primary_key(warehouse):
+    create_schema()
+    df = _orders()
+    load_dimensions(df, mode="upsert")
+    load_fact_orders(df, mode="upsert")
+
+    df = prepare_fact_rows(df)
+    assert upsert_rows(df, "fact_orders", batch_size=1) == 0
+
+    df.loc[1, "quantity"] = 3
+    df.loc[1, "total_amount"] = 15.0
+    assert upsert_rows(df, "fact_orders", batch_size=1) == 1
+
+    with warehouse.connect() as conn:
+        rows = conn.execute(
+            text("SELECT order_id, quantity, total_amount FROM fact_orders ORDER BY order_id")
+        ).all()
+    assert rows == [(1, 2, 10.0), (2, 3, 15.0)]
+    assert inspect(warehouse).get_pk_constraint("fact_orders")["constrained_columns"] == ["order_id"]
+
+
+def test_create_schema_restores_primary_key_after_replace_load(warehouse):
+    df = _orders()
+    load_dimensions(df, mode="replace")
+    load_fact_orders(df, mode="replace")
+    assert not inspect(warehouse).get_pk_constraint("fact_orders")["constrained_columns"]
+
+    create_schema()
+
+    inspector = inspect(warehouse)
+    assert inspector.get_pk_constraint("fact_orders")["constrained_columns"] == ["order_id"]
+    assert inspector.get_pk_constraint("dim_customers")["constrained_columns"] == ["customer_key"]
+    with warehouse.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM fact_orders")).scalar_one() == 2
+
+
+def test_dimensions_keep_scd2_history_and_skip_unchanged_members(warehouse):
+    create_schema()
+    df = _orders()
+    load_dimensions(df, mode="upsert", as_of=pd.Timestamp("2024-02-01"))
+    load_fact_orders(df, mode="upsert")
+
+    # Bob moves to Spain; Alice is unchanged
+    moved = df.copy()
+    moved.loc[1, "country"] = "Spain"
+    moved.loc[1, "order_id"] = 3
+    load_dimensions(moved, mode="upsert", as_of=pd.Timestamp("2024-03-01"))
+    load_fact_orders(moved.iloc[[1]], mode="upsert")
+
+    with warehouse.connect() as conn:
+        versions = conn.execute(text(
+            "SELECT customer_key, customer_id, country, valid_from, valid_to "
+            "FROM dim_customers ORDER BY customer_key"
+        )).all()
+        facts = conn.execute(text(
+            "SELECT f.order_id, c.country FROM fact_orders f "
+            "JOIN dim_customers c ON f.customer_key = c.customer_key ORDER BY f.order_id"
+        )).all()
+    assert versions == [
+        (1, 10, "Germany", "2024-02-01 00:00:00.000000", None),
+        (2, 11, "France", "2024-02-01 00:00:00.000000", "2024-03-01 00:00:00.000000"),
+        (3, 11, "Spain", "2024-03-01 00:00:00.000000", None),
+    ]
+    # Earlier orders keep the version that was current when they were loaded
+    assert facts == [(1, "Germany"), (2, "France"), (3, "Spain")]
+
+
+def test_create_schema_upgrades_dimensions_without_versions(warehouse):
+    with warehouse.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE dim_customers (customer_id INTEGER PRIMARY KEY, "
+            "customer_name TEXT, country TEXT)"
+        ))
+        conn.execute(text("INSERT INTO dim_customers VALUES (10, 'Alice', 'Germany')"))
+
+    create_schema()
+    load_dimensions(_orders(), mode="upsert")
+
+    with warehouse.connect() as conn:
+        rows = conn.execute(text(
+            "SELECT customer_key, customer_id, valid_to FROM dim_customers ORDER BY customer_key"
+        )).all()
+    assert rows == [(1, 10, None), (2, 11, None)]
+
+
+def test_month_partitioned_facts_load_only_affected_partitions(warehouse):
+    create_schema(partitioning="month")
+    df = _orders()
+    load_dimensions(df, mode="upsert")
+    load_fact_orders(df, mode="upsert", partitioning="month")
+
+    late = df.iloc[[0]].assign(order_id=3, order_date=pd.Timestamp("2024-02-03"))
+    load_fact_orders(late, mode="upsert", partitioning="month")
+
+    inspector = inspect(warehouse)
+    assert "fact_orders" in inspector.get_view_names()
+    assert {"fact_orders_p202401", "fact_orders_p202402"} <= set(inspector.get_table_names())
+    with warehouse.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM fact_orders_p202401")).scalar_one() == 2
+        assert conn.execute(text("SELECT COUNT(*) FROM fact_orders")).scalar_one() == 3
+
+    # Backfill January with a single corrected order
+    corrected = df.iloc[[1]].assign(quantity=4, total_amount=20.0)
+    assert reload_fact_month(corrected, "2024-01", partitioning="month") == 1
+    with warehouse.connect() as conn:
+        rows = conn.execute(text(
+            "SELECT order_id, total_amount FROM fact_orders ORDER BY order_id"
+        )).all()
+    assert rows == [(2, 20.0), (3, 10.0)]
+
+
+def test_create_schema_switches_fact_layout_without_losing_rows(warehouse):
+    create_schema()
+    df = _orders().assign(order_date=[pd.Timestamp("2024-01-01"), pd.Timestamp("2024-03-01")])
+    load_dimensions(df, mode="upsert")
+    load_fact_orders(df, mode="upsert")
+
+    create_schema(partitioning="month")
+    assert set(inspect(warehouse).get_table_names()) >= {
+        "fact_orders_p202401",
+        "fact_orders_p202403",
+    }
+
+    create_schema(partitioning="none")
+    inspector = inspect(warehouse)
+    assert "fact_orders" in inspector.get_table_names()
+    assert not [t for t in inspector.get_table_names() if t.startswith("fact_orders_p")]
+    with warehouse.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM fact_orders")).scalar_one() == 2
+
+
+def test_sqlite_bulk_load_restores_indexes_and_pragmas(warehouse):
+    create_schema()
+    with warehouse.begin() as conn:
+        conn.execute(text("CREATE INDEX ix_fact_customer ON fact_orders(customer_id)"))
+        journal_mode = conn.execute(text("PRAGMA journal_mode")).scalar()
+
+    df = _orders()
+    with sqlite_bulk_load() as conn:
+        assert conn.exec_driver_sql("PRAGMA synchronous").scalar() == 0
+        assert "ix_fact_customer" not in {
+            index["name"] for index in inspect(conn).get_indexes("fact_orders")
+        }
+        load_dimensions(df, mode="upsert", conn=conn)
+        load_fact_orders(df, mode="upsert", conn=conn)
+
+    with warehouse.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM fact_orders")).scalar_one() == 2
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == journal_mode
+    assert "ix_fact_customer" in {
+        index["name"] for index in inspect(warehouse).get_indexes("fact_orders")
+    }
+
+
+@pytest.mark.parametrize("partitioning", ["none", "month"])
+def test_sqlite_bulk_load_builds_secondary_indexes_only_at_the_end(warehouse, partitioning):
+    def secondary_indexes(conn):
+        return {
+            index["name"]
+            for table in inspect(conn).get_table_names()
+            if table.startswith("fact_orders")
+            for index in inspect(conn).get_indexes(table)
+            if not index["unique"]
+        }
+
+    df = _orders()
+    with sqlite_bulk_load() as conn:
+        # The schema stage of a pipeline run creates the tables on this connection
+        create_schema(conn=conn, partitioning=partitioning)
+        load_dimensions(df, mode="upsert", conn=conn)
+        load_fact_orders(df, mode="upsert", conn=conn, partitioning=partitioning)
+        assert secondary_indexes(conn) == set()
+
+    fact_table = "fact_orders_p202401" if partitioning == "month" else "fact_orders"
+    assert secondary_indexes(warehouse) == {
+        f"ix_{fact_table}_{suffix}"
+        for suffix in ("product_revenue", "customer_revenue", "year_month_revenue", "order_date")
+    }
+    with warehouse.connect() as conn:
+        create_schema(conn=conn, partitioning=partitioning)
+        assert len(secondary_indexes(conn)) == 4
+
+
+def test_sqlite_bulk_load_rolls_back_on_error(warehouse):
+    create_schema()
+    with pytest.raises(RuntimeError):
+        with sqlite_bulk_load() as conn:
+            load_fact_orders(_orders(), mode="upsert", conn=conn)
+            raise RuntimeError("boom")
+
+    with warehouse.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM fact_orders")).scalar_one() == 0
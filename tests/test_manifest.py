@@ -0,0 +1,58 @@
+import os
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+# Ensure project root is on sys.path
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.ingestion.manifest import IngestManifest, discover_raw_files  # noqa: E402
+
+HEADER = "order_id,customer_id,customer_name,country,product_id,product_name,category,order_date,quantity,unit_price\n"
+
+
+def _write_orders(path, rows):
+    path.write_text(HEADER + "".join(rows), encoding="utf-8")
+
+
+def test_discover_raw_files_from_directory_and_glob(tmp_path):
+    _write_orders(tmp_path / "orders_01.csv", [])
+    _write_orders(tmp_path / "orders_02.csv", [])
+    (tmp_path / "notes.txt").write_text("not data", encoding="utf-8")
+
+    assert [p.name for p in discover_raw_files(tmp_path)] == ["orders_01.csv", "orders_02.csv"]
+    assert [p.name for p in discover_raw_files(tmp_path / "*_02.csv")] == ["orders_02.csv"]
+
+
+def test_manifest_only_returns_new_or_changed_files(tmp_path):
+    first = tmp_path / "orders_01.csv"
+    _write_orders(first, ["1,10,Alice,Germany,100,USB Cable,Electronics,2024-01-01,2,5.0\n"])
+
+    manifest = IngestManifest(tmp_path / "manifest.json")
+    assert manifest.pending_files([first]) == [first]
+    manifest.record_file(first)
+    manifest.save()
+
+    manifest = IngestManifest.load(tmp_path / "manifest.json")
+    second = tmp_path / "orders_02.csv"
+    _write_orders(second, ["2,11,Bob,France,101,Wireless Mouse,Electronics,2024-01-02,1,15.0\n"])
+    assert manifest.pending_files([first, second]) == [second]
+
+    # Touching a file without changing its content does not make it pending
+    os.utime(first, (0, 0))
+    assert manifest.pending_files([first]) == []
+
+
+def test_manifest_high_water_mark_filters_old_rows(tmp_path):
+    manifest = IngestManifest(tmp_path / "manifest.json")
+    manifest.advance_high_water_mark(5, pd.Timestamp("2024-01-05"))
+    manifest.advance_high_water_mark(3, pd.Timestamp("2024-01-03"))
+
+    assert manifest.high_water_mark["order_id"] == 5
+    assert manifest.high_water_mark["order_date"].startswith("2024-01-05")
+
+    df = pd.DataFrame({"order_id": [4, 5, 6, 7]})
+    assert list(manifest.filter_new_rows(df)["order_id"]) == [6, 7]
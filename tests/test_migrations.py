@@ -0,0 +1,76 @@
+import sys
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, inspect, text
+
+# Ensure project root is on sys.path
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.warehouse.load_to_db import create_schema  # noqa: E402
+from src.warehouse.migrations import (  # noqa: E402
+    FACT_INDEXES,
+    MIGRATIONS,
+    apply_migrations,
+)
+
+
+@pytest.fixture
+def warehouse(monkeypatch, tmp_path):
+    url = f"sqlite:///{tmp_path / 'warehouse.db'}"
+    monkeypatch.setattr("src.warehouse.db.DB_URL", url)
+    return create_engine(url, future=True)
+
+
+def test_create_schema_migrates_legacy_fact_table(warehouse):
+    with warehouse.begin() as conn:
+        conn.execute(text("""
+            CREATE TABLE fact_orders (
+                order_id INTEGER PRIMARY KEY, customer_id INTEGER, product_id INTEGER,
+                order_date TEXT, quantity INTEGER, unit_price REAL, total_amount REAL
+            )
+        """))
+        conn.execute(text(
+            "INSERT INTO fact_orders VALUES (1, 10, 100, '2024-01-05 00:00:00.000000', 1, 5.0, 5.0)"
+        ))
+
+    create_schema()
+
+    inspector = inspect(warehouse)
+    assert set(FACT_INDEXES) <= {index["name"] for index in inspector.get_indexes("fact_orders")}
+    with warehouse.connect() as conn:
+        assert conn.execute(text("SELECT year_month FROM fact_orders")).scalar_one() == "2024-01"
+        versions = conn.execute(text("SELECT version FROM schema_migrations")).scalars().all()
+        # ANALYZE ran, so the planner has statistics for the new indexes
+        assert conn.execute(text("SELECT COUNT(*) FROM sqlite_stat1")).scalar_one() > 0
+    assert sorted(versions) == [migration.version for migration in MIGRATIONS]
+
+    assert apply_migrations() == []
+
+
+def test_monthly_report_reads_covering_index(warehouse):
+    create_schema()
+    with warehouse.connect() as conn:
+        plan = conn.execute(text(
+            "EXPLAIN QUERY PLAN SELECT f.year_month, SUM(f.total_amount) "
+            "FROM fact_orders f GROUP BY f.year_month"
+        )).all()
+    assert "COVERING INDEX ix_fact_orders_year_month_revenue" in plan[0][-1]
+
+
+def test_migrations_apply_to_every_month_partition(warehouse):
+    create_schema(partitioning="month")
+    with warehouse.begin() as conn:
+        conn.execute(text("DELETE FROM schema_migrations"))
+        conn.execute(text("""
+            CREATE TABLE fact_orders_p202401 (
+                order_id INTEGER PRIMARY KEY, customer_id INTEGER, product_id INTEGER,
+                order_date TEXT, quantity INTEGER, unit_price REAL, total_amount REAL
+            )
+        """))
+
+    assert apply_migrations() == [migration.version for migration in MIGRATIONS]
+    indexes = {index["name"] for index in inspect(warehouse).get_indexes("fact_orders_p202401")}
+    assert "ix_fact_orders_p202401_year_month_revenue" in indexes
@@ -1,6 +1,9 @@
+import argparse
+import json
 import sys
 from pathlib import Path
 
+import pandas as pd
 import pytest
 
 # Ensure project root is on sys.path
@@ -9,9 +12,11 @@ if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
 from src.orchestration.pipeline import run_pipeline  # noqa: E402
+from src.run_analytics import run_memory_reports  # noqa: E402
 
 
-def test_run_pipeline_dry_run_skips_db(monkeypatch):
+def test_run_pipeline_dry_run_skips_db(monkeypatch, tmp_path):
+    monkeypatch.setattr("src.orchestration.pipeline.LOGS_DIR", tmp_path)
     calls = {
         "create_schema": 0,
         "load_dimensions": 0,
@@ -42,3 +47,175 @@ def test_run_pipeline_dry_run_skips_db(monkeypatch):
     assert calls["create_schema"] == 0
     assert calls["load_dimensions"] == 0
     assert calls["load_fact_orders"] == 0
+
+
+def test_run_pipeline_chunked_matches_full_load(monkeypatch, tmp_path):
+    monkeypatch.setattr("src.orchestration.pipeline.LOGS_DIR", tmp_path)
+
+    run_pipeline(dry_run=True)
+    full = json.loads((tmp_path / "run_summary.json").read_text())
+
+    run_pipeline(dry_run=True, chunk_size=7)
+    chunked = json.loads((tmp_path / "run_summary.json").read_text())
+
+    assert chunked["chunks"] > 1
+    assert chunked["raw_rows"] == full["raw_rows"]
+    assert chunked["clean_rows"] == full["clean_rows"]
+    assert chunked["quarantined_rows"] == full["quarantined_rows"]
+    assert {
+        name: stats["failed"] for name, stats in chunked["data_quality"]["rules"].items()
+    } == {name: stats["failed"] for name, stats in full["data_quality"]["rules"].items()}
+
+
+def test_run_pipeline_incremental_loads_only_new_files(monkeypatch, tmp_path):
+    from sqlalchemy import create_engine, text
+
+    db_path = tmp_path / "warehouse.db"
+    monkeypatch.setattr("src.warehouse.db.DB_URL", f"sqlite:///{db_path}")
+    monkeypatch.setattr("src.orchestration.pipeline.LOGS_DIR", tmp_path)
+    monkeypatch.setattr(
+        "src.orchestration.pipeline.PROCESSED_DATA_PATH", tmp_path / "orders_clean.csv"
+    )
+    monkeypatch.setattr(
+        "src.ingestion.manifest.INGEST_MANIFEST_PATH", tmp_path / "manifest.json"
+    )
+    monkeypatch.setattr(
+        "src.orchestration.pipeline.QUARANTINE_PATH", tmp_path / "quarantine.csv"
+    )
+    monkeypatch.setattr(
+        "src.orchestration.pipeline.PROFILE_HISTORY_PATH", tmp_path / "profiles.jsonl"
+    )
+    monkeypatch.setattr("src.orchestration.dag.CHECKPOINT_DIR", tmp_path / "checkpoints")
+
+    landing = tmp_path / "landing"
+    landing.mkdir()
+    raw_lines = (ROOT / "data" / "raw" / "orders_raw.csv").read_text().splitlines()
+    header, rows = raw_lines[0], raw_lines[1:]
+    (landing / "orders_01.csv").write_text("\n".join([header] + rows[:20]) + "\n")
+
+    run_pipeline(source=landing, incremental=True)
+    first = json.loads((tmp_path / "run_summary.json").read_text())
+
+    (landing / "orders_02.csv").write_text("\n".join([header] + rows[20:]) + "\n")
+    run_pipeline(source=landing, incremental=True)
+    second = json.loads((tmp_path / "run_summary.json").read_text())
+
+    run_pipeline(source=landing, incremental=True)
+    third = json.loads((tmp_path / "run_summary.json").read_text())
+
+    assert len(first["files"]) == 1
+    assert [Path(p).name for p in second["files"]] == ["orders_02.csv"]
+    assert third["files"] == [] and third["raw_rows"] == 0
+
+    engine = create_engine(f"sqlite:///{db_path}", future=True)
+    with engine.connect() as conn:
+        fact_rows = conn.execute(text("SELECT COUNT(*) FROM fact_orders")).scalar_one()
+        customers = conn.execute(text("SELECT COUNT(*) FROM dim_customers")).scalar_one()
+    assert fact_rows == first["clean_rows"] + second["clean_rows"]
+    assert len((tmp_path / "profiles.jsonl").read_text().splitlines()) == 2
+    assert customers == 8
+
+
+def test_run_pipeline_parallel_workers_dedup_across_files(monkeypatch, tmp_path):
+    monkeypatch.setattr("src.orchestration.pipeline.LOGS_DIR", tmp_path)
+
+    run_pipeline(dry_run=True)
+    serial = json.loads((tmp_path / "run_summary.json").read_text())
+
+    landing = tmp_path / "landing"
+    landing.mkdir()
+    raw_lines = (ROOT / "data" / "raw" / "orders_raw.csv").read_text().splitlines()
+    header, rows = raw_lines[0], [line for line in raw_lines[1:] if line]
+    # Overlapping slices, so some order_ids appear in both files
+    (landing / "orders_01.csv").write_text("\n".join([header] + rows[:25]) + "\n")
+    (landing / "orders_02.csv").write_text("\n".join([header] + rows[15:]) + "\n")
+
+    run_pipeline(dry_run=True, source=landing, workers=2)
+    parallel = json.loads((tmp_path / "run_summary.json").read_text())
+
+    assert parallel["clean_rows"] == serial["clean_rows"]
+    assert parallel["data_quality"]["rules"]["order_id_unique"]["failed"] == 0
+    assert [t["raw_rows"] for t in parallel["worker_timings"]] == [25, len(rows) - 15]
+
+
+@pytest.fixture
+def incremental_run(monkeypatch, tmp_path):
+    """
+    Point the warehouse, logs, manifest and processed layer at tmp_path and
+    return a function writing raw files to tmp_path/landing.
+    """
+    monkeypatch.setattr("src.warehouse.db.DB_URL", f"sqlite:///{tmp_path / 'warehouse.db'}")
+    monkeypatch.setattr("src.orchestration.pipeline.LOGS_DIR", tmp_path)
+    monkeypatch.setattr("src.orchestration.pipeline.PROCESSED_DATA_PATH", tmp_path / "orders_clean.csv")
+    monkeypatch.setattr("src.orchestration.pipeline.PROCESSED_PARQUET_PATH", tmp_path / "orders_clean")
+    monkeypatch.setattr("src.ingestion.manifest.INGEST_MANIFEST_PATH", tmp_path / "manifest.json")
+    monkeypatch.setattr("src.orchestration.pipeline.QUARANTINE_PATH", tmp_path / "quarantine.csv")
+    monkeypatch.setattr("src.orchestration.pipeline.PROFILE_HISTORY_PATH", tmp_path / "profiles.jsonl")
+    monkeypatch.setattr("src.orchestration.dag.CHECKPOINT_DIR", tmp_path / "checkpoints")
+    landing = tmp_path / "landing"
+    landing.mkdir()
+    header = (ROOT / "data" / "raw" / "orders_raw.csv").read_text().splitlines()[0]
+
+    def write(name, order_ids, order_date="2024-03-05", unit_price=10.0):
+        rows = [
+            f"{order_id},1,Ana,Spain,101,Laptop,Electronics,{order_date},1,{unit_price}"
+            for order_id in order_ids
+        ]
+        (landing / name).write_text("\n".join([header] + rows) + "\n")
+
+    write.landing = landing
+    return write
+
+
+def test_incremental_parquet_runs_keep_earlier_files(incremental_run, tmp_path):
+    from src.utils.io_utils import read_processed
+
+    incremental_run("orders_01.csv", [10, 11])
+    run_pipeline(source=incremental_run.landing, incremental=True, processed_format="parquet")
+    incremental_run("orders_02.csv", [12])
+    run_pipeline(source=incremental_run.landing, incremental=True, processed_format="parquet")
+
+    month = tmp_path / "orders_clean" / "order_year=2024" / "order_month=3"
+    assert len(list(month.glob("*.parquet"))) == 2
+    processed = read_processed(tmp_path / "orders_clean", "parquet")
+    assert sorted(processed["order_id"]) == [10, 11, 12]
+
+
+def test_incremental_runs_load_late_and_corrected_orders(incremental_run, tmp_path):
+    from sqlalchemy import create_engine, text
+
+    incremental_run("orders_01.csv", [10, 11])
+    run_pipeline(source=incremental_run.landing, incremental=True)
+    # A late order below the high-water mark, and a corrected file
+    incremental_run("orders_02.csv", [5])
+    incremental_run("orders_01.csv", [10, 11], unit_price=12.5)
+    run_pipeline(source=incremental_run.landing, incremental=True)
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'warehouse.db'}", future=True)
+    with engine.connect() as conn:
+        rows = conn.execute(text("SELECT order_id, unit_price FROM fact_orders ORDER BY order_id")).all()
+    assert [tuple(row) for row in rows] == [(5, 10.0), (10, 12.5), (11, 12.5)]
+
+    # Opt in to dropping rows below the high-water mark
+    incremental_run("orders_03.csv", [7, 12])
+    run_pipeline(source=incremental_run.landing, incremental=True, skip_old_orders=True)
+    with engine.connect() as conn:
+        order_ids = conn.execute(text("SELECT order_id FROM fact_orders ORDER BY order_id")).scalars().all()
+    assert order_ids == [5, 10, 11, 12]
+
+
+@pytest.mark.parametrize("fmt", ["csv", "parquet"])
+def test_memory_reports_count_a_resent_order_once(monkeypatch, incremental_run, tmp_path, fmt):
+    monkeypatch.setattr("src.run_analytics.PROCESSED_DATA_FORMAT", fmt)
+    monkeypatch.setattr("src.analytics.frame_reports.REPORTS_DIR", tmp_path / "reports")
+    incremental_run("orders_01.csv", [10, 11])
+    run_pipeline(source=incremental_run.landing, incremental=True, processed_format=fmt)
+    # The same orders again, corrected; the warehouse keeps the second version
+    incremental_run("orders_01.csv", [10, 11], unit_price=12.5)
+    run_pipeline(source=incremental_run.landing, incremental=True, processed_format=fmt)
+
+    args = argparse.Namespace(reports=None, start_date=None, end_date=None, limit=10, format="csv")
+    run_memory_reports(args)
+    months = pd.read_csv(tmp_path / "reports" / "revenue_by_month.csv")
+    assert months.to_dict("records") == [{"year_month": "2024-03", "revenue": 25.0}]
+
@@ -0,0 +1,49 @@
+import json
+import pstats
+import sys
+import tracemalloc
+from pathlib import Path
+
+# Ensure project root is on sys.path
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.orchestration.pipeline import run_pipeline  # noqa: E402
+from src.utils.profiling import StageProfiler  # noqa: E402
+
+
+def _allocate(n):
+    return [str(i) for i in range(n)]
+
+
+def test_profiler_writes_cpu_and_allocation_profiles(tmp_path):
+    profiler = StageProfiler(tmp_path, label="test", memory=True, top=5)
+    assert tracemalloc.is_tracing()
+
+    assert len(profiler.call("allocate", _allocate, 50_000)) == 50_000
+    profiler.close()
+    assert not tracemalloc.is_tracing()
+
+    stats = pstats.Stats(str(profiler.directory / "allocate.prof"))
+    assert any(function == "_allocate" for _, _, function in stats.stats)
+    assert "_allocate" in (profiler.directory / "allocate.txt").read_text()
+    allocations = (profiler.directory / "allocate.alloc.txt").read_text().splitlines()
+    assert allocations[0].startswith("allocate: peak traced memory")
+    assert "test_profiling.py" in allocations[2]
+    assert len(allocations) <= 2 + 5
+
+
+def test_profiled_pipeline_writes_one_profile_per_stage(monkeypatch, tmp_path):
+    monkeypatch.setattr("src.orchestration.pipeline.LOGS_DIR", tmp_path)
+    monkeypatch.setattr("src.utils.profiling.PROFILE_DIR", tmp_path / "profiles")
+
+    run_pipeline(dry_run=True, chunk_size=20, profile=True)
+
+    summary = json.loads((tmp_path / "run_summary.json").read_text())
+    profile_dir = Path(summary["profile_dir"])
+    assert profile_dir.parent == tmp_path / "profiles"
+    profiled = {path.stem for path in profile_dir.glob("*.prof")}
+    assert profiled == {stage["stage"] for stage in summary["stages"]}
+    assert {"ingest_00000", "transform_00000", "validate_00000", "drift"} <= profiled
+    assert not list(profile_dir.glob("*.alloc.txt"))
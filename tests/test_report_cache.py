@@ -0,0 +1,101 @@
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+# Ensure project root is on sys.path
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.analytics.cache import ReportCache  # noqa: E402
+from src.analytics.reports import generate_all_reports  # noqa: E402
+from src.warehouse.load_to_db import (  # noqa: E402
+    create_schema,
+    load_dimensions,
+    load_fact_orders,
+)
+
+
+@pytest.fixture
+def warehouse(monkeypatch, tmp_path):
+    monkeypatch.setattr("src.warehouse.db.DB_URL", f"sqlite:///{tmp_path / 'warehouse.db'}")
+    monkeypatch.setattr("src.analytics.reports.REPORTS_DIR", tmp_path / "reports")
+    create_schema()
+    return tmp_path
+
+
+def _load(amount):
+    df = pd.DataFrame([{
+        "order_id": 1,
+        "customer_id": 10,
+        "customer_name": "Alice",
+        "country": "Germany",
+        "product_id": 100,
+        "product_name": "USB Cable",
+        "category": "Electronics",
+        "order_date": pd.Timestamp("2024-01-05"),
+        "quantity": 1,
+        "unit_price": amount,
+        "total_amount": amount,
+    }])
+    load_dimensions(df, mode="upsert")
+    load_fact_orders(df, mode="upsert")
+
+
+def test_cache_evicts_least_recently_used_and_persists_on_disk(tmp_path):
+    cache = ReportCache(tmp_path, max_entries=2)
+    cache.put("a", pd.DataFrame({"x": [1]}))
+    cache.put("b", pd.DataFrame({"x": [2]}))
+    assert cache.get("a")["x"].tolist() == [1]
+    cache.put("c", pd.DataFrame({"x": [3]}))
+
+    reopened = ReportCache(tmp_path, max_entries=2)
+    assert reopened.get("b") is None
+    assert reopened.get("a")["x"].tolist() == [1]
+    assert reopened.get("c")["x"].tolist() == [3]
+    assert (reopened.hits, reopened.misses) == (2, 1)
+    assert cache.stats()["evictions"] == 1
+
+    small = ReportCache(tmp_path / "small", max_bytes=1)
+    small.put("big", pd.DataFrame({"x": range(100)}))
+    assert small.stats()["entries"] == 0
+
+
+def test_reports_are_served_from_cache_until_the_warehouse_changes(warehouse):
+    cache = ReportCache(warehouse / "cache")
+    _load(10.0)
+
+    assert generate_all_reports(cache=cache)["report_cache"]["misses"] == 3
+    csv_path = warehouse / "reports" / "revenue_by_month.csv"
+    written_at = csv_path.stat().st_mtime_ns
+
+    stats = generate_all_reports(cache=ReportCache(warehouse / "cache"))["report_cache"]
+    assert (stats["hits"], stats["misses"]) == (3, 0)
+    assert csv_path.stat().st_mtime_ns == written_at
+
+    # Reloading identical data does not change the data version
+    _load(10.0)
+    assert generate_all_reports(cache=cache)["report_cache"]["misses"] == 0
+
+    _load(12.5)
+    assert generate_all_reports(cache=cache)["report_cache"]["misses"] == 3
+    assert pd.read_csv(csv_path)["revenue"].tolist() == [12.5]
+
+
+def test_recreated_warehouse_does_not_match_old_cache_entries(warehouse):
+    from src.analytics.reports import revenue_by_month
+    from src.warehouse.db import dispose_engines
+
+    cache = ReportCache(warehouse / "cache")
+    _load(10.0)
+    assert revenue_by_month(cache=cache)["revenue"].tolist() == [10.0]
+
+    dispose_engines()
+    (warehouse / "warehouse.db").unlink()
+    create_schema()
+    _load(999.0)
+
+    assert revenue_by_month(cache=cache)["revenue"].tolist() == [999.0]
+    assert cache.misses == 2
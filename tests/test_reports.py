@@ -0,0 +1,131 @@
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+# Ensure project root is on sys.path
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.analytics import reports  # noqa: E402
+from src.analytics.reports import (  # noqa: E402
+    generate_all_reports,
+    iter_report,
+    order_details_query,
+    register_report,
+)
+from src.utils.io_utils import ChunkedTableWriter  # noqa: E402
+from src.warehouse.db import get_engine, read_only_connection  # noqa: E402
+from src.warehouse.load_to_db import (  # noqa: E402
+    create_schema,
+    load_dimensions,
+    load_fact_orders,
+)
+
+
+@pytest.fixture
+def warehouse(monkeypatch, tmp_path):
+    monkeypatch.setattr("src.warehouse.db.DB_URL", f"sqlite:///{tmp_path / 'warehouse.db'}")
+    monkeypatch.setattr("src.analytics.reports.REPORTS_DIR", tmp_path / "reports")
+    monkeypatch.setattr("src.analytics.reports.REPORTS", dict(reports.REPORTS))
+    monkeypatch.setattr("src.analytics.cache.REPORT_CACHE_ENABLED", False)
+    create_schema()
+    return tmp_path
+
+
+def test_read_only_connection_rejects_writes(warehouse):
+    with pytest.raises(OperationalError, match="readonly"):
+        with read_only_connection() as conn:
+            conn.execute(text("DELETE FROM dim_customers"))
+
+    # The pooled connection is writable again afterwards
+    with get_engine().begin() as conn:
+        conn.execute(text("DELETE FROM dim_customers"))
+
+
+def test_registered_reports_run_concurrently_with_timings(warehouse):
+    def slow_build(engine, limit=None, start_date=None, end_date=None):
+        time.sleep(0.3)
+        return "SELECT COUNT(*) AS orders FROM fact_orders", {}
+
+    register_report("slow_a")(slow_build)
+    register_report("slow_b")(slow_build)
+
+    started = time.perf_counter()
+    result = generate_all_reports(reports=["slow_a", "slow_b"], workers=2)
+    assert time.perf_counter() - started < 0.55
+
+    assert set(result["report_timings"]) == {"slow_a", "slow_b"}
+    timing = result["report_timings"]["slow_a"]
+    assert timing["rows"] == 1
+    assert {"query_seconds", "fetch_seconds", "write_seconds"} <= set(timing)
+    assert pd.read_csv(warehouse / "reports" / "slow_b.csv")["orders"].tolist() == [0]
+
+
+def test_generate_all_reports_writes_every_registered_report(warehouse):
+    result = generate_all_reports()
+    assert list(result["report_timings"]) == [
+        "top_products_by_revenue", "revenue_by_month", "revenue_by_country",
+    ]
+    for name in result["report_timings"]:
+        assert (warehouse / "reports" / f"{name}.csv").exists()
+
+
+def _load_orders(count):
+    df = pd.DataFrame({
+        "order_id": range(1, count + 1),
+        "customer_id": 10,
+        "customer_name": "Alice",
+        "country": "Germany",
+        "product_id": 100,
+        "product_name": "USB Cable",
+        "category": "Electronics",
+        "order_date": pd.date_range("2024-01-01", periods=count, freq="D"),
+        "quantity": 1,
+        "unit_price": 5.0,
+        "total_amount": 5.0,
+    })
+    load_dimensions(df, mode="upsert")
+    load_fact_orders(df, mode="upsert")
+
+
+def test_iter_report_streams_in_chunks(warehouse):
+    _load_orders(5)
+    query, params = order_details_query(get_engine())
+    chunks = list(iter_report(get_engine(), query, params, chunk_size=2))
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+
+    query, params = order_details_query(get_engine(), start_date="2025-01-01")
+    chunks = list(iter_report(get_engine(), query, params, chunk_size=2))
+    assert len(chunks) == 1 and chunks[0].empty
+    assert "order_id" in chunks[0].columns
+
+
+@pytest.mark.parametrize("fmt", ["csv", "parquet"])
+def test_streamed_exports_write_every_chunk(warehouse, fmt):
+    _load_orders(5)
+    result = generate_all_reports(
+        reports=["order_details"], fmt=fmt, chunk_size=2, start_date="2024-01-02"
+    )
+    assert result["report_timings"]["order_details"]["rows"] == 4
+
+    path = warehouse / "reports" / f"order_details.{fmt}"
+    df = pd.read_csv(path) if fmt == "csv" else pd.read_parquet(path)
+    assert sorted(df["order_id"]) == [2, 3, 4, 5]
+    assert df["country"].eq("Germany").all()
+
+
+def test_failed_export_keeps_the_previous_file(tmp_path):
+    path = tmp_path / "export.csv"
+    path.write_text("old\n")
+    with pytest.raises(RuntimeError):
+        with ChunkedTableWriter(path, "csv") as writer:
+            writer.write(pd.DataFrame({"x": [1]}))
+            raise RuntimeError("query failed")
+    assert path.read_text() == "old\n"
+    assert list(tmp_path.iterdir()) == [path]
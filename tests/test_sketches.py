@@ -0,0 +1,49 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Ensure project root is on sys.path
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.utils.sketches import HyperLogLog, KLLSketch  # noqa: E402
+
+
+def test_hyperloglog_estimate_is_close_and_mergeable():
+    rng = np.random.default_rng(42)
+    values = pd.Series(rng.integers(0, 50_000, size=200_000))
+
+    left, right = HyperLogLog(), HyperLogLog()
+    left.update(values[:100_000])
+    right.update(values[100_000:])
+    left.merge(right)
+
+    exact = values.nunique()
+    assert abs(left.estimate() - exact) / exact < 0.03
+
+
+def test_hyperloglog_is_exact_for_small_cardinalities():
+    sketch = HyperLogLog()
+    sketch.update(pd.Series(["Germany", "France", "Italy", "Germany", None]))
+
+    assert sketch.estimate() == 3
+
+
+def test_kll_quantiles_are_close_after_merge():
+    rng = np.random.default_rng(7)
+    values = rng.lognormal(mean=3, sigma=1, size=200_000)
+
+    left, right = KLLSketch(), KLLSketch(seed=1)
+    for start in range(0, 100_000, 10_000):
+        left.update(values[start:start + 10_000])
+    right.update(values[100_000:])
+    left.merge(right)
+
+    ordered = np.sort(values)
+    for q, estimate in zip([0.1, 0.5, 0.9], left.quantiles([0.1, 0.5, 0.9])):
+        rank = np.searchsorted(ordered, estimate) / len(ordered)
+        assert abs(rank - q) < 0.02
+    assert sum(len(level) for level in left.levels) < 1_000
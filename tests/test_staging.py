@@ -0,0 +1,150 @@
+import sqlite3
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+from sqlalchemy import event, inspect, text
+
+# Ensure project root is on sys.path
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.warehouse.aggregates import AGGREGATES, check_aggregates  # noqa: E402
+from src.warehouse.db import get_engine  # noqa: E402
+from src.warehouse.load_to_db import (  # noqa: E402
+    TABLES,
+    create_schema,
+    load_dimensions,
+    load_fact_orders,
+)
+from src.warehouse.staging import prepare_staging, swap_staging  # noqa: E402
+
+
+@pytest.fixture
+def db_path(monkeypatch, tmp_path):
+    path = tmp_path / "warehouse.db"
+    monkeypatch.setattr("src.warehouse.db.DB_URL", f"sqlite:///{path}")
+    return path
+
+
+def _orders(order_ids):
+    return pd.DataFrame({
+        "order_id": order_ids,
+        "customer_id": [10 + i % 2 for i in order_ids],
+        "customer_name": ["Alice" if i % 2 == 0 else "Bob" for i in order_ids],
+        "country": ["Germany" if i % 2 == 0 else "France" for i in order_ids],
+        "product_id": 100,
+        "product_name": "USB Cable",
+        "category": "Electronics",
+        "order_date": pd.Timestamp("2024-01-01"),
+        "quantity": 1,
+        "unit_price": 5.0,
+        "total_amount": 5.0,
+    })
+
+
+def _count(conn, table="fact_orders"):
+    return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def _assert_live_tables_complete(engine):
+    with engine.connect() as conn:
+        names = set(conn.execute(text(
+            "SELECT name FROM sqlite_master WHERE type = 'table'"
+        )).scalars())
+        assert not [name for name in names if "staging" in name or name.endswith("_old")]
+        assert set(AGGREGATES) <= names
+        inspector = inspect(conn)
+        for table, spec in TABLES.items():
+            assert len(inspector.get_indexes(table)) == len(spec["indexes"])
+        assert check_aggregates(conn).empty
+
+
+def test_swap_replaces_live_tables_while_a_reader_keeps_its_snapshot(db_path):
+    create_schema()
+    load_dimensions(_orders([1, 2]), mode="upsert")
+    load_fact_orders(_orders([1, 2]), mode="upsert")
+
+    prepare_staging()
+    df = _orders([1, 2, 3, 4, 5])
+    load_dimensions(df, mode="swap")
+    load_fact_orders(df, mode="swap")
+
+    reader = sqlite3.connect(db_path, isolation_level=None, timeout=0.1)
+    reader.execute("BEGIN")
+    assert _count(reader) == 2
+
+    # The reader's open transaction does not block the swap under WAL
+    counts = swap_staging(min_fact_rows=5, max_fact_rows=5)
+    assert counts["fact_orders"] == 5
+    assert _count(reader) == 2
+    reader.execute("COMMIT")
+    assert _count(reader) == 5
+    reader.close()
+
+    _assert_live_tables_complete(get_engine())
+
+
+def test_swap_transaction_only_renames_and_repeated_swaps_keep_indexes(db_path):
+    create_schema()
+    engine = get_engine()
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    for order_ids in ([1, 2, 3], [1, 2, 3, 4], [5]):
+        prepare_staging(copy_live=True)
+        df = _orders(order_ids)
+        load_dimensions(df, mode="swap")
+        load_fact_orders(df, mode="swap")
+        statements.clear()
+        swap_staging()
+
+        start = next(i for i, sql in enumerate(statements) if "RENAME TO" in sql)
+        end = statements.index("PRAGMA legacy_alter_table = OFF")
+        swap = statements[start:end]
+        assert all("RENAME TO" in sql or "warehouse_" in sql for sql in swap)
+        _assert_live_tables_complete(engine)
+
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM fact_orders")).scalar_one() == 5
+        assert conn.execute(text("SELECT order_count FROM agg_revenue_month")).scalar_one() == 5
+
+    # A schema check after the swaps adds no second copy of any index
+    create_schema()
+    _assert_live_tables_complete(engine)
+
+
+def test_swap_rejects_staging_with_orphan_facts_and_keeps_live_tables(db_path):
+    create_schema()
+    load_dimensions(_orders([1]), mode="upsert")
+    load_fact_orders(_orders([1]), mode="upsert")
+
+    prepare_staging()
+    load_fact_orders(_orders([1, 2]), mode="swap")  # dimensions were never staged
+
+    with pytest.raises(ValueError, match="Staging validation failed"):
+        swap_staging(min_fact_rows=2, max_fact_rows=2)
+
+    reader = sqlite3.connect(db_path)
+    assert _count(reader) == 1
+    assert _count(reader, "fact_orders_staging") == 2
+    reader.close()
+
+
+def test_incremental_staging_starts_from_live_rows(db_path):
+    create_schema()
+    load_dimensions(_orders([1, 2]), mode="upsert")
+    load_fact_orders(_orders([1, 2]), mode="upsert")
+
+    assert prepare_staging(copy_live=True) == 2
+    df = _orders([3])
+    load_dimensions(df, mode="swap")
+    load_fact_orders(df, mode="swap")
+    swap_staging(min_fact_rows=2, max_fact_rows=3)
+
+    reader = sqlite3.connect(db_path)
+    assert _count(reader) == 3
+    assert _count(reader, "dim_customers") == 2
+    reader.close()
@@ -0,0 +1,58 @@
+import json
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+# Ensure project root is on sys.path
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import benchmarks.synthetic_orders as synthetic  # noqa: E402
+from benchmarks.synthetic_orders import OrderGenerator, write_orders  # noqa: E402
+from src.ingestion.ingest_orders import apply_raw_schema, load_raw_orders  # noqa: E402
+from src.orchestration.pipeline import run_pipeline  # noqa: E402
+
+
+def test_generator_is_deterministic_and_independent_of_blocks(monkeypatch):
+    monkeypatch.setattr(synthetic, "BLOCK_ROWS", 1000)
+    generator = OrderGenerator(5000, seed=3)
+    df = generator.orders()
+
+    assert df.equals(OrderGenerator(5000, seed=3).orders())
+    assert not df.equals(OrderGenerator(5000, seed=4).orders())
+    assert generator.orders(990, 2010).equals(df.iloc[990:2010].reset_index(drop=True))
+    chunks = list(generator.iter_orders(500, 3500))
+    assert len(chunks) == 4
+    assert pd.concat(chunks, ignore_index=True).equals(df.iloc[500:3500].reset_index(drop=True))
+
+
+def test_orders_are_skewed_and_carry_injected_errors():
+    df = OrderGenerator(50_000, seed=1).orders()
+    apply_raw_schema(df)
+
+    assert 0.005 < df.duplicated().mean() < 0.015
+    assert 0 < df["customer_id"].isna().mean() < 0.002
+    assert 0 < df["order_date"].isna().mean() < 0.002
+    assert 0 < (df["quantity"] <= 0).mean() < 0.002
+    orders_per_customer = df["customer_id"].value_counts()
+    assert orders_per_customer.iloc[0] > 20 * orders_per_customer.median()
+    assert df["country"].value_counts().iloc[0] > 0.2 * len(df)
+    # Later orders are more frequent than earlier ones
+    dates = df["order_date"].dropna()
+    assert (dates >= dates.min() + (dates.max() - dates.min()) / 2).mean() > 0.6
+
+
+def test_pipeline_runs_on_written_files(monkeypatch, tmp_path):
+    monkeypatch.setattr("src.orchestration.pipeline.LOGS_DIR", tmp_path)
+    paths = write_orders(tmp_path / "raw", 3000, files=3, seed=2)
+
+    assert [path.name for path in paths] == ["orders_0001.csv", "orders_0002.csv", "orders_0003.csv"]
+    assert len(load_raw_orders(paths[0])) == 1000
+    run_pipeline(dry_run=True, source=tmp_path / "raw")
+
+    summary = json.loads((tmp_path / "run_summary.json").read_text())
+    assert summary["status"] == "success"
+    assert summary["raw_rows"] == 3000
+    assert 2900 < summary["clean_rows"] < 3000
@@ -0,0 +1,94 @@
+import json
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+# Ensure project root is on sys.path
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.orchestration.pipeline import run_pipeline  # noqa: E402
+from src.orchestration.telemetry import (  # noqa: E402
+    find_regressions,
+    load_run_history,
+    measured,
+    summarize_stages,
+)
+
+
+def test_measured_reports_time_rows_and_memory():
+    df = pd.DataFrame({"order_id": range(1000), "country": ["Germany"] * 1000})
+
+    result, metrics = measured(lambda frames: {"df": frames.head(10)}, df)
+
+    assert len(result["df"]) == 10
+    assert metrics["rows"] == 1000
+    assert metrics["frame_bytes"] == df.memory_usage().sum()
+    assert metrics["seconds"] >= metrics["cpu_seconds"] >= 0
+    assert metrics["peak_rss_bytes"] > 0
+
+    # Only a deep measurement counts the strings of object columns
+    df = df.astype({"country": object})
+    _, shallow_metrics = measured(lambda frames: None, df)
+    _, deep_metrics = measured(lambda frames: None, df, deep=True)
+    assert deep_metrics["frame_bytes"] == df.memory_usage(deep=True).sum() > shallow_metrics["frame_bytes"]
+
+
+def test_summarize_stages_totals_the_stages_that_ran():
+    totals = summarize_stages([
+        {"kind": "facts", "skipped": False, "seconds": 1.0, "cpu_seconds": 0.5, "rows": 100, "frame_bytes": 10},
+        {"kind": "facts", "skipped": False, "seconds": 3.0, "cpu_seconds": 1.5, "rows": 300, "frame_bytes": 30},
+        {"kind": "facts", "skipped": True},
+        {"kind": "ingest", "skipped": True},
+    ])
+
+    assert totals["facts"]["runs"] == 2 and totals["facts"]["skipped"] == 1
+    assert totals["facts"]["wall_seconds"] == 4.0 and totals["facts"]["rows_per_second"] == 100.0
+    assert totals["facts"]["frame_bytes"] == 30
+    assert totals["ingest"]["runs"] == 0 and totals["ingest"]["rows_per_second"] is None
+
+
+def _run(facts_seconds, transform_seconds=0.01, chunk_size=None, status="success"):
+    return {
+        "status": status,
+        "dry_run": False,
+        "chunk_size": chunk_size,
+        "workers": 1,
+        "load_mode": "upsert",
+        "stage_totals": summarize_stages([
+            {"kind": "facts", "seconds": facts_seconds, "rows": 1000},
+            {"kind": "transform", "seconds": transform_seconds, "rows": 1000},
+        ]),
+    }
+
+
+def test_find_regressions_against_the_rolling_median():
+    history = [_run(1.0), _run(1.2), _run(0.9), _run(9.0, chunk_size=7), _run(9.0, status="failed")]
+    assert find_regressions(history + [_run(1.1)]) == []
+
+    # 10x slower, but only 0.1s: too small to judge
+    regressions = find_regressions(history + [_run(2.0, transform_seconds=0.1)], min_seconds=0.5)
+    assert {(r["stage"], r["metric"]) for r in regressions} == {
+        ("facts", "wall_seconds"),
+        ("facts", "rows_per_second"),
+    }
+    assert regressions[0]["median"] == 1.0 and regressions[0]["runs"] == 3
+
+
+def test_runs_append_stage_metrics_to_the_history(monkeypatch, tmp_path):
+    monkeypatch.setattr("src.orchestration.pipeline.LOGS_DIR", tmp_path)
+
+    run_pipeline(dry_run=True, chunk_size=7)
+    run_pipeline(dry_run=True, chunk_size=7)
+
+    summary = json.loads((tmp_path / "run_summary.json").read_text())
+    history = load_run_history(tmp_path / "run_history.jsonl")
+    assert len(history) == 2
+    assert history[-1]["stage_totals"] == summary["stage_totals"]
+    transform = summary["stage_totals"]["transform"]
+    assert transform["runs"] == summary["chunks"]
+    assert transform["rows"] == summary["raw_rows"]
+    assert transform["rows_per_second"] > 0 and transform["peak_rss_bytes"] > 0
+    assert {"drift", "ingest", "validate"} <= set(summary["stage_totals"])
@@ -1,5 +1,5 @@
 import pandas as pd
-from src.transformations.transform_orders import transform_orders
+from src.transformations.transform_orders import SeenOrderIds, drop_seen_order_ids, transform_orders
 
 def test_transform_orders_creates_total_amount():
     df = pd.DataFrame([
@@ -41,3 +41,52 @@ def test_transform_orders_drops_duplicates():
     result = transform_orders(df)
 
     assert len(result) == 1
+
+def test_transform_orders_drops_duplicates_across_chunks():
+    chunk_1 = pd.DataFrame([
+        {
+            "order_id": 1,
+            "customer_id": 10,
+            "product_id": 100,
+            "order_date": "2024-01-01",
+            "quantity": 2,
+            "unit_price": 5.0,
+        }
+    ])
+    chunk_2 = pd.DataFrame([
+        {
+            "order_id": 1,  # duplicate of a row in the previous chunk
+            "customer_id": 10,
+            "product_id": 100,
+            "order_date": "2024-01-01",
+            "quantity": 3,
+            "unit_price": 5.0,
+        },
+        {
+            "order_id": 2,
+            "customer_id": 11,
+            "product_id": 101,
+            "order_date": "2024-01-02",
+            "quantity": 1,
+            "unit_price": 15.0,
+        },
+    ])
+
+    seen_order_ids = SeenOrderIds()
+    result_1 = transform_orders(chunk_1, seen_order_ids=seen_order_ids)
+    result_2 = transform_orders(chunk_2, seen_order_ids=seen_order_ids)
+
+    assert list(result_1["order_id"]) == [1]
+    assert list(result_2["order_id"]) == [2]
+
+def test_seen_order_ids_match_a_set():
+    seen = SeenOrderIds()
+    seen.update(pd.Series([5, 3, None, 5], dtype="Int64"))
+    seen.update(pd.Series([1, 3, 9], dtype="Int64"))
+
+    assert list(seen.ids) == [1, 3, 5, 9]
+    df = pd.DataFrame({"order_id": pd.array([9, None, 2, 3, 10, 0], dtype="Int64")})
+    expected = drop_seen_order_ids(df, {1, 3, 5, 9})
+    assert drop_seen_order_ids(df, seen).equals(expected)
+    assert list(expected["order_id"].fillna(-1)) == [-1, 2, 10, 0]
+    assert not SeenOrderIds().contains(df["order_id"]).any()
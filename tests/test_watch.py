@@ -0,0 +1,150 @@
+import json
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+# Ensure project root is on sys.path
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.orchestration.watch import RawFileWatcher  # noqa: E402
+
+
+@pytest.fixture
+def landing(monkeypatch, tmp_path):
+    monkeypatch.setattr("src.warehouse.db.DB_URL", f"sqlite:///{tmp_path / 'warehouse.db'}")
+    monkeypatch.setattr("src.orchestration.pipeline.LOGS_DIR", tmp_path)
+    monkeypatch.setattr("src.orchestration.pipeline.PROCESSED_DATA_PATH", tmp_path / "orders_clean.csv")
+    monkeypatch.setattr("src.orchestration.pipeline.QUARANTINE_PATH", tmp_path / "quarantine.csv")
+    monkeypatch.setattr("src.orchestration.pipeline.PROFILE_HISTORY_PATH", tmp_path / "profiles.jsonl")
+    monkeypatch.setattr("src.ingestion.manifest.INGEST_MANIFEST_PATH", tmp_path / "manifest.json")
+    monkeypatch.setattr("src.orchestration.dag.CHECKPOINT_DIR", tmp_path / "checkpoints")
+    landing = tmp_path / "landing"
+    landing.mkdir()
+    return landing
+
+
+def _write_orders(landing: Path, name: str, start: int, stop: int) -> Path:
+    lines = (ROOT / "data" / "raw" / "orders_raw.csv").read_text().splitlines()
+    path = landing / name
+    path.write_text("\n".join([lines[0]] + lines[1:][start:stop]) + "\n")
+    return path
+
+
+def test_files_are_batched_by_latency_and_size(monkeypatch, landing):
+    runs = []
+    outcomes = iter([RuntimeError("database is locked"), None, None])
+
+    def fake_run_pipeline(source, **options):
+        runs.append(([path.name for path in source], options["resume"], options["checkpoints"]))
+        error = next(outcomes)
+        if error:
+            raise error
+
+    monkeypatch.setattr("src.orchestration.watch.run_pipeline", fake_run_pipeline)
+    watcher = RawFileWatcher(landing, max_latency=10, max_files=2, retry_seconds=10)
+
+    _write_orders(landing, "orders_01.csv", 0, 10)
+    assert watcher.poll(now=0) == []  # not settled yet
+    assert watcher.poll(now=1) == []  # settled, waiting for more
+    assert watcher.poll(now=11) == [landing / "orders_01.csv"]
+
+    # A failed batch is retried after retry_seconds, without checkpoints
+    # unless they are on
+    assert not watcher.run_batch([landing / "orders_01.csv"], now=11)
+    assert watcher.poll(now=12) == []
+    assert watcher.run_batch(watcher.poll(now=21), now=21)
+
+    # Files are not loaded twice; a full batch goes without waiting
+    for number in (2, 3, 4):
+        _write_orders(landing, f"orders_0{number}.csv", 10 * number, 10 * number + 10)
+    assert watcher.poll(now=22) == []
+    batch = watcher.poll(now=23)
+    assert watcher.run_batch(batch, now=23)
+
+    assert runs == [
+        (["orders_01.csv"], False, False),
+        (["orders_01.csv"], False, False),
+        (["orders_02.csv", "orders_03.csv"], False, False),
+    ]
+    assert watcher.poll(now=24) == []
+    assert watcher.poll(now=33) == [landing / "orders_04.csv"]
+    assert watcher.batches == 2 and watcher.failures == 1
+
+
+def test_bad_file_is_retried_alone_with_backoff_then_moved_aside(monkeypatch, landing):
+    runs = []
+
+    def fake_run_pipeline(source, **options):
+        names = [path.name for path in source]
+        runs.append((names, options["resume"]))
+        if "orders_02.csv" in names:
+            raise ValueError("malformed file")
+
+    monkeypatch.setattr("src.orchestration.watch.run_pipeline", fake_run_pipeline)
+    watcher = RawFileWatcher(
+        landing, max_latency=0, retry_seconds=10, max_failures=3, checkpoints=True
+    )
+    for number in (1, 2, 3):
+        _write_orders(landing, f"orders_0{number}.csv", 10 * number, 10 * number + 10)
+    watcher.poll(now=0)
+    assert not watcher.run_batch(watcher.poll(now=1), now=1)
+
+    # Each file of the failed batch is retried alone; the good ones load
+    assert watcher.poll(now=10) == []
+    assert watcher.run_batch(watcher.poll(now=11), now=11)
+    assert not watcher.run_batch(watcher.poll(now=11), now=11)
+    assert watcher.run_batch(watcher.poll(now=11), now=11)
+    # The bad file waits twice as long after its second failure
+    assert watcher.poll(now=30) == []
+    assert not watcher.run_batch(watcher.poll(now=31), now=31)
+
+    assert runs == [
+        (["orders_01.csv", "orders_02.csv", "orders_03.csv"], False),
+        (["orders_01.csv"], True),
+        (["orders_02.csv"], False),
+        (["orders_03.csv"], True),
+        (["orders_02.csv"], False),
+    ]
+    assert watcher.moved == [landing / "failed" / "orders_02.csv"]
+    assert (landing / "failed" / "orders_02.csv").exists()
+    assert not (landing / "orders_02.csv").exists()
+    assert watcher.poll(now=1000) == []
+    assert watcher.batches == 2 and watcher.failures == 3
+
+
+def test_watcher_loads_each_file_once_until_stopped(landing, tmp_path):
+    from sqlalchemy import create_engine, text
+
+    _write_orders(landing, "orders_01.csv", 0, 20)
+    stop = threading.Event()
+    watcher = RawFileWatcher(landing, poll_seconds=0.05, max_latency=0)
+    thread = threading.Thread(target=watcher.run, args=(stop,))
+    thread.start()
+    try:
+        for _ in range(200):
+            if watcher.batches == 1 and not (landing / "orders_02.csv").exists():
+                _write_orders(landing, "orders_02.csv", 20, None)
+            if watcher.batches == 2:
+                break
+            stop.wait(0.05)
+    finally:
+        stop.set()
+        thread.join()
+
+    assert watcher.batches == 2 and watcher.failures == 0
+    summary = json.loads((tmp_path / "run_summary.json").read_text())
+    assert [Path(p).name for p in summary["files"]] == ["orders_02.csv"]
+
+    # A restarted watcher finds both files in the manifest
+    restarted = RawFileWatcher(landing, max_latency=0)
+    assert restarted.poll(now=0) == [] and restarted.poll(now=1) == []
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'warehouse.db'}", future=True)
+    with engine.connect() as conn:
+        fact_rows = conn.execute(text("SELECT COUNT(*) FROM fact_orders")).scalar_one()
+        order_ids = conn.execute(text("SELECT COUNT(DISTINCT order_id) FROM fact_orders")).scalar_one()
+    assert fact_rows == order_ids > 20